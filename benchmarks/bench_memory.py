@@ -0,0 +1,172 @@
+"""
+구절 파이프라인 메모리 벤치마크
+
+선택 범위를 늘려 가며(250 / 1000 / 4000절) 구절 해석 -> 본문 조회 -> 슬라이드 나누기 -> 슬라이드 내용
+단계의 최대 메모리를 측정합니다.
+  list       : 예전 방식. get_verses로 본문 목록을 만들고, 나눈 슬라이드와 슬라이드 내용도 목록으로 모음
+  stream     : iter_verses(VerseRecord) -> _paginate -> _slide_texts 를 한 장씩 흘려 보냄
+  create_ppt : VerseSelection으로 스트리밍 저장(streaming=True, 캐시 없음)까지 실제로 생성
+
+  python -m benchmarks.bench_memory
+  python -m benchmarks.bench_memory --sizes small large --modes stream
+
+프로그램 폴더(main.py 위치)에서 실행하세요. 성경 데이터는 bench_pipeline과 같은 규칙으로 고릅니다.
+list/stream은 파이썬 객체의 최대 메모리(tracemalloc), create_ppt는 프로세스 최대 메모리(RSS)를 보고하고,
+각 경우는 별도 프로세스에서 실행합니다. stream의 최대 메모리가 가장 작은 범위보다 FLAT_RATIO배 넘게
+커지면(선택 범위에 비례해 늘어나면) 종료 코드 1을 반환합니다.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+from benchmarks.bench_pipeline import BUNDLED_BIBLE_JSON, _peak_rss_mb, make_synthetic_bible, selection_for
+
+SIZES = {"small": 250, "medium": 1000, "large": 4000}
+MODES = ("list", "stream", "create_ppt")
+
+# stream 최대 메모리가 가장 작은 범위의 이 배수 + NOISE_FLOOR_KB 이하면 일정하다고 본다
+FLAT_RATIO = 1.5
+NOISE_FLOOR_KB = 256
+
+
+def selection_covering(store, index, n_verses, version="개역개정"):
+    """첫 책부터 정확히 n_verses 절을 덮는 범위 문자열 (모자라면 다음 책까지 '창1-; 출1-; ...')"""
+    parts = []
+    remaining = n_verses
+    for book in store.books(version):
+        count = sum(len(index.verses_between(book, chapter, 1, index.last_verse(book, chapter)))
+                    for chapter in index.chapters(book))
+        if remaining > count:
+            parts.append(f"{book}1-")
+            remaining -= count
+        else:
+            parts.append(selection_for(index, book, remaining))
+            return "; ".join(parts)
+    raise ValueError(f"성경 데이터의 절 수가 {n_verses}보다 적습니다.")
+
+
+def run_case(bible_json, bible_bin, mode, n_verses, max_chars=100):
+    """한 경우를 실행하고 구절/슬라이드 수, 최대 메모리, 시간을 반환"""
+    from core.bible_store import open_bible_store
+    from core.reference import get_verse_index
+    from core import ppt_generator as gen
+
+    store = open_bible_store(bible_json, bible_bin)
+    selection = selection_covering(store, get_verse_index(store, "개역개정"), n_verses)
+    template_path = os.path.join("templates", "base_template1.pptx")
+    if mode == "create_ppt":
+        gen.get_prepared_template(template_path)  # 템플릿 준비는 선택 범위와 상관없으므로 미리
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    selections = gen.parse_selection(selection, store, "개역개정")
+    if mode == "list":
+        verses = gen.get_verses(store, "개역개정", selections)
+        pages = list(gen._paginate(verses, max_chars))
+        slides = [gen._slide_texts(*page) for page in pages]
+        n_found, n_slides = len(verses), len(slides)
+    elif mode == "stream":
+        n_found = n_slides = 0
+
+        def counted(records):
+            nonlocal n_found
+            for record in records:
+                n_found += 1
+                yield record
+
+        for page in gen._paginate(counted(gen.iter_verses(store, "개역개정", selections)), max_chars):
+            gen._slide_texts(*page)
+            n_slides += 1
+    else:
+        verses = gen.VerseSelection(store, "개역개정", selections)
+        out_path = os.path.join(tempfile.gettempdir(), f"b2p_bench_mem_{os.getpid()}.pptx")
+        try:
+            built = gen.create_ppt(verses, out_path, template_path, max_chars=max_chars, streaming=True,
+                                   use_cache=False)
+        finally:
+            if os.path.exists(out_path):
+                os.remove(out_path)
+        n_found, n_slides = len(verses), built["slides"]
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"verses": n_found, "slides": n_slides, "traced_peak_kb": peak / 1024,
+            "peak_rss_mb": _peak_rss_mb(), "seconds": seconds}
+
+
+def check_flat(results):
+    """stream 최대 메모리가 선택 범위에 비례해 늘었으면 (가장 작은 범위, 가장 큰 범위) 결과, 아니면 None"""
+    stream = sorted((r for r in results.values() if r["mode"] == "stream"), key=lambda r: r["verses"])
+    if len(stream) < 2:
+        return None
+    smallest, largest = stream[0], stream[-1]
+    if largest["traced_peak_kb"] > smallest["traced_peak_kb"] * FLAT_RATIO + NOISE_FLOOR_KB:
+        return smallest, largest
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="구절 파이프라인 메모리 벤치마크")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--synthetic", action="store_true", help="가상 성경 데이터 사용")
+    parser.add_argument("--json", help="결과를 JSON 파일로도 저장")
+    # 내부용: 한 경우만 실행하고 결과 JSON을 표준출력으로
+    parser.add_argument("--run-case", nargs=4, metavar=("JSON", "BIN", "MODE", "VERSES"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        bible_json, bible_bin, mode, n_verses = args.run_case
+        print(json.dumps(run_case(bible_json, bible_bin, mode, int(n_verses))))
+        return 0
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if not args.synthetic and os.path.exists(BUNDLED_BIBLE_JSON):
+            bible_json = os.path.abspath(BUNDLED_BIBLE_JSON)
+            print(f"성경 데이터: {bible_json}")
+        else:
+            bible_json = os.path.join(work_dir, "bible_data.json")
+            make_synthetic_bible(bible_json)
+            print("성경 데이터: 가상 데이터 (고정 시드)")
+        bible_bin = os.path.join(work_dir, "bible_data.bin")
+
+        results = {}
+        for mode in args.modes:
+            for size in args.sizes:
+                name = f"{mode}-{size}"
+                cmd = [sys.executable, "-m", "benchmarks.bench_memory", "--run-case", bible_json, bible_bin,
+                       mode, str(SIZES[size])]
+                proc = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8")
+                if proc.returncode != 0:
+                    print(f"{name}: 실행 실패\n{proc.stderr}")
+                    return 2
+                results[name] = dict(json.loads(proc.stdout.strip().splitlines()[-1]), mode=mode)
+                _print_result(name, results[name])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    grown = check_flat(results)
+    if grown:
+        smallest, largest = grown
+        print(f"메모리 증가: stream {smallest['verses']}절 {smallest['traced_peak_kb']:.0f}KB -> "
+              f"{largest['verses']}절 {largest['traced_peak_kb']:.0f}KB")
+        return 1
+    return 0
+
+
+def _print_result(name, result):
+    rss = f"{result['peak_rss_mb']:.0f}MB" if result["peak_rss_mb"] is not None else "-"
+    per_verse = result["traced_peak_kb"] * 1024 / max(result["verses"], 1)
+    print(f"{name:<18} 구절 {result['verses']:>5} 슬라이드 {result['slides']:>5} | "
+          f"파이썬 최대 {result['traced_peak_kb']:>8.0f}KB (구절당 {per_verse:>6.0f}B) | "
+          f"최대메모리 {rss} | {result['seconds']:.2f}초")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
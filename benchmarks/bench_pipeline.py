@@ -0,0 +1,270 @@
+"""
+PPT 생성 파이프라인 벤치마크
+
+단계별 소요 시간(parse_selection, get_verses, 템플릿 준비, 분할, _create_slide, 저장, 예전 방식 clone_slide),
+최대 메모리, 결과 파일 크기를 측정하고, 저장된 기준값(baseline.json)보다 느려진 단계가 있으면 실패합니다.
+한 번 잰 값은 흔들림이 크므로 경우마다 --repeat 번 실행해서 단계별 중앙값과 흔들림 폭(최대-최소)을 쓰고,
+기준값의 흔들림 폭만큼은 느려져도 허용합니다.
+
+  python -m benchmarks.bench_pipeline                 # 전체 실행 + 기준값과 비교
+  python -m benchmarks.bench_pipeline --save-baseline # 현재 결과를 기준값으로 저장
+  python -m benchmarks.bench_pipeline --sizes small medium --templates 1
+  python -m benchmarks.bench_pipeline --repeat 5      # 경우마다 5번 실행
+
+프로그램 폴더(main.py 위치)에서 실행하세요. data/cache/bible_data.json 이 있으면 그 데이터를,
+없으면(또는 --synthetic) 고정 시드로 만든 가상 성경 데이터를 사용합니다.
+각 경우는 별도 프로세스에서 실행해서 최대 메모리(RSS)가 서로 섞이지 않게 합니다.
+"""
+import os
+import sys
+import json
+import io
+import time
+import random
+import statistics
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+BUNDLED_BIBLE_JSON = os.path.join("data", "cache", "bible_data.json")
+
+SIZES = {"small": 10, "medium": 200, "huge": 2400}
+# 예전 방식 clone_slide는 슬라이드 수의 제곱에 비례해 느려지므로 이 장수까지만 측정
+CLONE_SAMPLE = 200
+STAGES = ("parse_selection", "get_verses", "prepare_template", "paginate", "create_slide", "save",
+          "clone_slide")
+
+# 기준값 중앙값보다 이 비율 + 기준값의 흔들림 폭 이상 느려지고, 차이가 NOISE_FLOOR초 이상이면 실패
+DEFAULT_TOLERANCE = 0.5
+NOISE_FLOOR = 0.05
+DEFAULT_REPEAT = 3
+
+_SYNTHETIC_BOOKS = ["창세기", "출애굽기", "레위기", "민수기", "신명기", "시편", "잠언", "이사야",
+                    "마태복음", "마가복음", "누가복음", "요한복음", "사도행전", "로마서", "요한계시록"]
+
+
+def make_synthetic_bible(path, seed=2024):
+    """고정 시드로 가상 성경 JSON 생성 (시편은 150장)"""
+    rng = random.Random(seed)
+
+    def word():
+        return "".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(rng.randint(1, 4)))
+
+    books = {}
+    for book in _SYNTHETIC_BOOKS:
+        n_chapters = 150 if book == "시편" else rng.randint(5, 40)
+        books[book] = {
+            str(c): {str(v): " ".join(word() for _ in range(rng.randint(4, 45)))
+                     for v in range(1, rng.randint(6, 30) + 1)}
+            for c in range(1, n_chapters + 1)
+        }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"개역개정": books}, f, ensure_ascii=False)
+
+
+def make_background_image(path, width=1920, height=1080):
+    """배경 이미지로 쓸 가상 사진 (JPEG, 그라데이션 + 잡음)"""
+    from PIL import Image
+    # 픽셀 목록을 파이썬으로 만들면 이 프로세스 메모리가 커지고, 그 최대값이 측정용 하위 프로세스에 그대로 남는다
+    red = Image.linear_gradient("L").resize((width, height))
+    green = red.transpose(Image.Transpose.ROTATE_90).resize((width, height))
+    blue = Image.effect_noise((width, height), 64)
+    Image.merge("RGB", (red, green, blue)).save(path, quality=90)
+
+
+def selection_for(index, book, n_verses):
+    """book 1장 1절부터 정확히 n_verses 절을 덮는 장 넘김 범위 문자열"""
+    remaining = n_verses
+    for chapter in index.chapters(book):
+        last = index.last_verse(book, chapter)
+        count = len(index.verses_between(book, chapter, 1, last))
+        if remaining <= count:
+            end_verse = index.verses_between(book, chapter, 1, last)[remaining - 1]
+            return f"{book}1:1-{chapter}:{end_verse}"
+        remaining -= count
+    raise ValueError(f"{book}의 절 수가 {n_verses}보다 적습니다.")
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트, 리눅스는 KB 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(bible_json, bible_bin, template_num, n_verses, bg_image, max_chars=100):
+    """한 경우를 실행하고 단계별 시간(초), 최대 메모리(MB), 파일 크기(바이트)를 반환"""
+    from core.bible_store import open_bible_store
+    from core.reference import get_verse_index
+    from core import ppt_generator as gen
+    from pptx import Presentation
+
+    store = open_bible_store(bible_json, bible_bin)
+    selection = selection_for(get_verse_index(store, "개역개정"), "시편", n_verses)
+    template_path = os.path.join("templates", f"base_template{template_num}.pptx")
+    timings = {}
+
+    def timed(stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    selections = timed("parse_selection", gen.parse_selection, selection, store, "개역개정")
+    verses = timed("get_verses", gen.get_verses, store, "개역개정", selections)
+    prepared = timed("prepare_template", gen.get_prepared_template, template_path, bg_image)
+    prs, prototype = prepared.open()
+    pages = timed("paginate", lambda: list(gen._paginate(verses, max_chars)))
+
+    def create_all():
+        for book, chapter, verse, text in pages:
+            gen._create_slide(prs, prototype, book, chapter, verse, text)
+
+    timed("create_slide", create_all)
+    out_path = os.path.join(tempfile.gettempdir(), f"b2p_bench_{os.getpid()}.pptx")
+    try:
+        timed("save", prs.save, out_path)
+        output_size = os.path.getsize(out_path)
+    finally:
+        if os.path.exists(out_path):
+            os.remove(out_path)
+    peak_rss_mb = _peak_rss_mb()
+
+    # 예전 방식(도형별 deepcopy) 복제 비용 비교용. 최대 메모리에 섞이지 않도록 저장 뒤에
+    # 준비된 템플릿 슬라이드를 최대 CLONE_SAMPLE 장 복제해 본다.
+    del prs
+    legacy = Presentation(io.BytesIO(prepared.blob))
+    template_slide = legacy.slides[0]
+    clone_count = min(len(pages), CLONE_SAMPLE)
+    timed("clone_slide", lambda: [gen.clone_slide(legacy, template_slide) for _ in range(clone_count)])
+    return {"verses": len(verses), "slides": len(pages), "clone_slides": clone_count, "timings": timings,
+            "peak_rss_mb": peak_rss_mb, "output_bytes": output_size}
+
+
+def _case_name(size, template_num, with_bg):
+    return f"{size}-t{template_num}-{'bg' if with_bg else 'nobg'}"
+
+
+def summarize(runs):
+    """같은 경우를 여러 번 실행한 결과 -> 단계별 중앙값 결과 (+ "spread": 단계별 최대-최소, "runs": 횟수)"""
+    result = dict(runs[0])
+    stages = runs[0]["timings"]
+    result["timings"] = {stage: statistics.median(run["timings"][stage] for run in runs) for stage in stages}
+    result["spread"] = {stage: max(run["timings"][stage] for run in runs) - min(run["timings"][stage] for run in runs)
+                        for stage in stages}
+    rss = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+    result["peak_rss_mb"] = statistics.median(rss) if rss else None
+    result["runs"] = len(runs)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """기준값보다 느려진 (경우, 단계, 현재, 기준) 목록"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for stage, seconds in result["timings"].items():
+            base_seconds = base["timings"].get(stage)
+            if base_seconds is None:
+                continue
+            limit = base_seconds * (1 + tolerance) + base.get("spread", {}).get(stage, 0.0)
+            if seconds > limit and seconds - base_seconds > NOISE_FLOOR:
+                regressions.append((name, stage, seconds, base_seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PPT 생성 파이프라인 벤치마크")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--templates", nargs="+", default=["1", "2", "3"])
+    parser.add_argument("--synthetic", action="store_true", help="가상 성경 데이터 사용")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="경우마다 실행할 횟수 (중앙값 사용)")
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 baseline.json에 저장")
+    parser.add_argument("--json", help="결과를 JSON 파일로도 저장")
+    # 내부용: 한 경우만 실행하고 결과 JSON을 표준출력으로
+    parser.add_argument("--run-case", nargs=5, metavar=("JSON", "BIN", "TEMPLATE", "VERSES", "BG"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        bible_json, bible_bin, template_num, n_verses, bg = args.run_case
+        result = run_case(bible_json, bible_bin, template_num, int(n_verses), bg if bg != "-" else None)
+        print(json.dumps(result))
+        return 0
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if not args.synthetic and os.path.exists(BUNDLED_BIBLE_JSON):
+            bible_json = os.path.abspath(BUNDLED_BIBLE_JSON)
+            print(f"성경 데이터: {bible_json}")
+        else:
+            bible_json = os.path.join(work_dir, "bible_data.json")
+            make_synthetic_bible(bible_json)
+            print("성경 데이터: 가상 데이터 (고정 시드)")
+        bible_bin = os.path.join(work_dir, "bible_data.bin")
+        bg_image = os.path.join(work_dir, "background.jpg")
+        make_background_image(bg_image)
+
+        results = {}
+        for size in args.sizes:
+            for template_num in args.templates:
+                for with_bg in (False, True):
+                    name = _case_name(size, template_num, with_bg)
+                    cmd = [sys.executable, "-m", "benchmarks.bench_pipeline", "--run-case", bible_json, bible_bin,
+                           template_num, str(SIZES[size]), bg_image if with_bg else "-"]
+                    runs = []
+                    for _ in range(max(1, args.repeat)):
+                        proc = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8")
+                        if proc.returncode != 0:
+                            print(f"{name}: 실행 실패\n{proc.stderr}")
+                            return 2
+                        # create_ppt 등의 안내 출력 뒤 마지막 줄이 결과 JSON
+                        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+                    results[name] = summarize(runs)
+                    _print_result(name, results[name])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"기준값 저장: {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("기준값 파일이 없어 비교를 건너뜁니다. (--save-baseline 으로 저장)")
+        return 0
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for name, stage, seconds, base_seconds in regressions:
+        print(f"느려짐: {name} / {stage}: {seconds:.3f}초 (기준 {base_seconds:.3f}초)")
+    if regressions:
+        return 1
+    print("모든 단계가 기준값 이내입니다.")
+    return 0
+
+
+def _print_result(name, result):
+    stages = " ".join(f"{stage}={result['timings'][stage] * 1000:.0f}ms" for stage in STAGES)
+    rss = f"{result['peak_rss_mb']:.0f}MB" if result["peak_rss_mb"] is not None else "-"
+    print(f"{name:<18} 구절 {result['verses']:>5} 슬라이드 {result['slides']:>5} "
+          f"(clone_slide {result['clone_slides']}장, {result.get('runs', 1)}회 중앙값) | {stages} | "
+          f"최대메모리 {rss} 파일 {result['output_bytes'] / 1024:.0f}KB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+프로그램 시작 시간 측정
+
+  python -m benchmarks.bench_startup            # 5회 측정 후 중앙값
+  python -m benchmarks.bench_startup --runs 10
+
+프로그램 폴더(main.py 위치)에서 실행하세요. 매번 새 프로세스로
+  1) GUI 모듈(ui.gui)과 PPT 모듈(core.ppt_generator)을 불러오는 시간
+  2) main.py --startup-timing --exit-when-ready 의 '창 표시', '성경 데이터 준비' 시각 (화면이 있을 때만)
+을 측정합니다. 창 표시 전에 불러오는 것은 ui.gui 뿐이고, core.ppt_generator(python-pptx)는
+성경 데이터를 불러온 뒤 백그라운드에서 불러옵니다.
+"""
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+
+_MARK = re.compile(r"\[시작 시간\] (.+): ([0-9.]+)초")
+
+_IMPORT_CODE = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def time_import(module):
+    """새 프로세스에서 module을 불러오는 데 걸린 시간(초)"""
+    out = subprocess.run([sys.executable, "-c", _IMPORT_CODE.format(module=module)],
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def time_gui_startup():
+    """main.py 시작 시각표 {단계: 초}. 화면이 없어 창을 띄울 수 없으면 None"""
+    proc = subprocess.run([sys.executable, "main.py", "--startup-timing", "--exit-when-ready"],
+                          capture_output=True, text=True, encoding="utf-8", timeout=120)
+    if proc.returncode != 0:
+        return None
+    return {label: float(seconds) for label, seconds in _MARK.findall(proc.stdout)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="프로그램 시작 시간 측정")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for module in ("ui.gui", "core.ppt_generator"):
+        samples = [time_import(module) for _ in range(args.runs)]
+        print(f"import {module:<20} 중앙값 {statistics.median(samples):.3f}초")
+
+    runs = [time_gui_startup() for _ in range(args.runs)]
+    runs = [r for r in runs if r]
+    if not runs:
+        print("창을 띄울 수 없어(화면 없음) GUI 시작 시간은 건너뜁니다.")
+        return 0
+    for label in runs[0]:
+        samples = [r[label] for r in runs if label in r]
+        print(f"{label:<12} 중앙값 {statistics.median(samples):.3f}초 (최소 {min(samples):.3f}, 최대 {max(samples):.3f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+배경 이미지 최적화
+
+휴대폰 사진(수천만 화소, 수십 MB)을 그대로 넣으면 PPT가 커지고 느려지므로,
+슬라이드 크기 x DPI 픽셀로 줄이고 다시 압축한 이미지를 data/cache/backgrounds/ 에 저장해 두고 쓴다.
+캐시 키는 (원본 경로, 수정시각, 크기, 슬라이드 크기, DPI)라서 같은 배경으로 다시 만들 때는 바로 재사용한다.
+
+- 사진 방향(EXIF)은 미리 적용하고, 투명한 부분이 있으면 PNG, 아니면 JPEG로 저장
+- 줄이고 다시 압축한 결과가 원본보다 크면 원본을 그대로 복사해 둔다
+"""
+import os
+import shutil
+import hashlib
+import threading
+
+BG_CACHE_DIR = os.path.join("data", "cache", "backgrounds")
+DEFAULT_BG_DPI = 150  # 0이면 원본 그대로 사용
+JPEG_QUALITY = 85
+BG_CACHE_MAX_FILES = 30  # 오래 안 쓴 것부터 지움
+
+EMU_PER_INCH = 914400
+_CACHE_FORMAT = 1  # 처리 방식이 바뀌면 올려서 예전 캐시를 무시
+
+
+def target_size(slide_width, slide_height, dpi):
+    """슬라이드(EMU)를 dpi로 채우는 픽셀 크기"""
+    return (max(1, round(slide_width / EMU_PER_INCH * dpi)),
+            max(1, round(slide_height / EMU_PER_INCH * dpi)))
+
+
+def _cache_key(src_path, st, slide_width, slide_height, dpi):
+    raw = f"{_CACHE_FORMAT}\x1f{os.path.normcase(src_path)}\x1f{st.st_mtime_ns}\x1f{st.st_size}" \
+          f"\x1f{slide_width}\x1f{slide_height}\x1f{dpi}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def _find_cached(key):
+    for name in os.listdir(BG_CACHE_DIR):
+        if os.path.splitext(name)[0] == key:
+            return os.path.join(BG_CACHE_DIR, name)
+    return None
+
+
+def _has_alpha(image):
+    return image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+
+
+def _prune(keep_path):
+    """캐시 파일이 BG_CACHE_MAX_FILES개를 넘으면 오래 안 쓴 것부터 지운다"""
+    paths = [os.path.join(BG_CACHE_DIR, name) for name in os.listdir(BG_CACHE_DIR) if not name.endswith(".tmp")]
+    if len(paths) <= BG_CACHE_MAX_FILES:
+        return
+    paths.sort(key=lambda p: os.stat(p).st_mtime)
+    for path in paths[:len(paths) - BG_CACHE_MAX_FILES]:
+        if path != keep_path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _tmp_path(path):
+    """임시 파일 이름 (미리보기 스레드와 생성 스레드가 같은 배경을 동시에 만들어도 겹치지 않도록)"""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def optimized_background(src_path, slide_width, slide_height, dpi=DEFAULT_BG_DPI):
+    """
+    PPT에 넣을 배경 이미지 경로. 처음에는 줄이고 다시 압축해서 캐시에 저장하고,
+    이후로는 캐시 파일을 바로 반환한다. dpi가 0이거나 처리할 수 없는 이미지면 원본 경로.
+    """
+    if not dpi or not src_path:
+        return src_path
+    src_path = os.path.abspath(src_path)
+    try:
+        st = os.stat(src_path)
+    except OSError:
+        return src_path
+    os.makedirs(BG_CACHE_DIR, exist_ok=True)
+    key = _cache_key(src_path, st, slide_width, slide_height, dpi)
+    cached = _find_cached(key)
+    if cached is not None:
+        os.utime(cached)  # 최근 사용 표시
+        return cached
+
+    from PIL import Image, ImageOps
+    tmp_path = None
+    try:
+        with Image.open(src_path) as image:
+            size = target_size(slide_width, slide_height, dpi)
+            image.draft("RGB", size)  # JPEG는 디코딩할 때부터 줄여서 읽는다
+            image = ImageOps.exif_transpose(image)
+            # PowerPoint가 어차피 슬라이드 크기로 늘리므로 가로/세로를 각각 목표 크기 이하로
+            new_size = (min(image.width, size[0]), min(image.height, size[1]))
+            if new_size != image.size:
+                image = image.resize(new_size, Image.LANCZOS)
+            if _has_alpha(image):
+                ext, save_args = ".png", {"format": "PNG", "optimize": True}
+                image = image.convert("RGBA")
+            else:
+                ext, save_args = ".jpg", {"format": "JPEG", "quality": JPEG_QUALITY, "optimize": True}
+                image = image.convert("RGB")
+            cached = os.path.join(BG_CACHE_DIR, key + ext)
+            tmp_path = _tmp_path(cached)
+            image.save(tmp_path, **save_args)
+
+        if os.path.getsize(tmp_path) >= st.st_size:
+            # 이미 작은 이미지: 다시 압축하면 화질만 나빠지므로 원본을 그대로 둔다
+            os.remove(tmp_path)
+            cached = os.path.join(BG_CACHE_DIR, key + os.path.splitext(src_path)[1].lower())
+            tmp_path = _tmp_path(cached)
+            shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, cached)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        print(f"경고: 배경 이미지를 최적화하지 못해 원본을 사용합니다 ({src_path}): {e}")
+        return src_path
+    finally:
+        # 저장하다 실패하면 반쯤 쓰인 임시 파일이 캐시 폴더에 남지 않도록
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _prune(cached)
+    return cached
@@ -0,0 +1,492 @@
+"""
+성경 데이터 바이너리 저장소
+
+원본은 data/cache/bible_data.json 과 data/translations/*.json (추가 역본, 같은 형식)이고,
+이 모듈은 그 JSON들을 색인된 바이너리 파일(bible_data.bin) 하나로 합친 뒤 mmap으로 열어
+요청한 구절만 읽습니다. 원본이 바뀌면(수정시각/크기) 바이너리를 자동으로 다시 만듭니다.
+역본별 색인은 그 역본을 처음 조회할 때 만들므로, 쓰지 않는 역본은 메모리에 올라오지 않습니다.
+
+파일 구조 (리틀엔디언)
+  헤더        : magic, 포맷버전, 역본 수, 원본 mtime_ns, 원본 크기, 절 테이블 위치, 본문 위치
+  역본 목록   : [이름(str16), 책 테이블 위치(u32)] * 역본 수
+  책 테이블   : 책 수(u16), [이름(str16), 장 수(u16), [장(u16), 절 수(u16), 첫 절 번호(u32)] * 장 수] * 책 수
+  절 테이블   : [절(u16), 본문 오프셋(u32), 본문 길이(u32)] * 전체 절 수
+  본문        : UTF-8 텍스트를 이어붙인 덩어리
+
+다시 만들 때는 같은 폴더의 임시 파일(이름이 겹치지 않음)에 쓴 뒤 교체하므로, GUI와 생성 서버가 동시에
+다시 만들어도 서로의 파일을 덮어쓰지 않는다. 이미 열려 있는 예전 저장소는 닫지 않고 그대로 두므로
+(GUI, 검색 색인, 작업 스레드, VerseRecord가 아직 쓰고 있을 수 있음) 더 이상 쓰는 곳이 없을 때 정리된다.
+
+빌드: python -m core.bible_store
+"""
+import os
+import glob
+import json
+import mmap
+import struct
+import tempfile
+import threading
+
+BIBLE_DATA_PATH = os.path.join("data", "cache", "bible_data.json")
+BIBLE_STORE_PATH = os.path.join("data", "cache", "bible_data.bin")
+# 추가 역본 JSON 폴더. 형식은 bible_data.json과 같고 책 이름은 개역개정 이름(창세기 등)을 쓴다
+TRANSLATIONS_DIR = os.path.join("data", "translations")
+
+MAGIC = b"B2PB"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHHqqII")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_CHAPTER = struct.Struct("<HHI")
+_VERSE = struct.Struct("<HII")
+
+# 경로별로 열어둔 저장소 (UI를 다시 그려도 같은 저장소를 재사용)
+_open_stores = {}
+
+# 책 이름 <-> 번호 (VerseRecord는 책 이름 대신 번호만 가진다)
+_book_ids = {}
+_book_names = []
+_book_lock = threading.Lock()
+
+
+def _pack_str(s):
+    b = s.encode("utf-8")
+    return _U16.pack(len(b)) + b
+
+
+def _sorted_numeric(mapping):
+    """'1', '2', ... 형태의 키를 숫자 순으로 정렬 (숫자가 아닌 키는 무시)"""
+    items = []
+    for key, value in mapping.items():
+        try:
+            items.append((int(key), value))
+        except ValueError:
+            continue
+    items.sort(key=lambda kv: kv[0])
+    return items
+
+
+def source_files(json_path, translations_dir=None):
+    """저장소를 만들 원본 JSON 목록: 기본 성경 데이터 + 추가 역본 폴더의 *.json (이름순)"""
+    paths = [json_path] if os.path.exists(json_path) else []
+    if translations_dir and os.path.isdir(translations_dir):
+        paths += [os.path.join(translations_dir, name) for name in sorted(os.listdir(translations_dir))
+                  if name.lower().endswith(".json")]
+    return paths
+
+
+def _source_stamp(paths):
+    """원본 파일들의 (가장 늦은 수정시각, 전체 크기). 파일이 바뀌거나 추가/삭제되면 달라진다."""
+    stats = [os.stat(path) for path in paths]
+    return max(st.st_mtime_ns for st in stats), sum(st.st_size for st in stats)
+
+
+def build_bible_store(json_paths, bin_path):
+    """
+    JSON 성경 데이터(파일 하나 또는 목록)를 바이너리 저장소 하나로 변환.
+    파일은 하나씩 읽고 버리므로 역본을 여러 개 넣어도 한 번에 JSON 하나 분량만 메모리에 올린다.
+    같은 역본 이름이 여러 파일에 있으면 앞의 것을 쓴다.
+    반환: 만든 저장소를 열 경로 (보통 bin_path, 예전 파일을 교체할 수 없었으면 옆에 만든 새 파일)
+    """
+    if isinstance(json_paths, str):
+        json_paths = [json_paths]
+    mtime_ns, size = _source_stamp(json_paths)
+
+    versions = []
+    book_tables = []
+    verse_table = bytearray()
+    text_blob = bytearray()
+    n_entries = 0
+    for json_path in json_paths:
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for version, books in data.items():
+            if version in versions:
+                print(f"경고: '{version}' 역본이 여러 파일에 있어 {json_path} 의 것은 무시합니다.")
+                continue
+            versions.append(version)
+            table = bytearray(_U16.pack(len(books)))
+            for book, chapters in books.items():
+                chapter_items = _sorted_numeric(chapters)
+                table += _pack_str(book)
+                table += _U16.pack(len(chapter_items))
+                for chapter, verses in chapter_items:
+                    verse_items = _sorted_numeric(verses)
+                    table += _CHAPTER.pack(chapter, len(verse_items), n_entries)
+                    for verse, text in verse_items:
+                        encoded = text.encode("utf-8")
+                        verse_table += _VERSE.pack(verse, len(text_blob), len(encoded))
+                        text_blob += encoded
+                        n_entries += 1
+            book_tables.append(bytes(table))
+        del data
+
+    directory_size = sum(_U16.size + len(v.encode("utf-8")) + _U32.size for v in versions)
+    offset = _HEADER.size + directory_size
+    directory = bytearray()
+    for version, table in zip(versions, book_tables):
+        directory += _pack_str(version) + _U32.pack(offset)
+        offset += len(table)
+    verse_offset = offset
+    text_offset = verse_offset + len(verse_table)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(versions), mtime_ns, size,
+                          verse_offset, text_offset)
+
+    # 임시 파일에 쓴 뒤 교체 (중간에 꺼져도 깨진 파일이 남지 않도록)
+    tmp_path = _new_store_file(bin_path)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(directory)
+            for table in book_tables:
+                f.write(table)
+            f.write(verse_table)
+            f.write(text_blob)
+        return _install_store_file(tmp_path, bin_path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+
+
+def _side_prefix(bin_path):
+    return "." + os.path.basename(bin_path) + "."
+
+
+def _new_store_file(bin_path):
+    """bin_path와 같은 폴더에 다른 프로세스/스레드와 겹치지 않는 새 파일을 만들어 경로 반환"""
+    out_dir = os.path.dirname(bin_path) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=_side_prefix(bin_path), suffix=".tmp", dir=out_dir)
+    os.close(fd)
+    return tmp_path
+
+
+def _install_store_file(tmp_path, bin_path):
+    """
+    새로 만든 저장소 파일을 bin_path로 교체하고 열 경로를 반환.
+    Windows에서 다른 곳이 예전 파일을 mmap으로 열고 있어 교체할 수 없으면 새 파일을 그 자리에 두고
+    그 경로를 반환한다 (다음 실행 때 다시 만들면서 교체하고, 남은 파일은 그때 지운다).
+    """
+    try:
+        os.replace(tmp_path, bin_path)
+    except PermissionError:
+        return tmp_path
+    for path in glob.glob(os.path.join(glob.escape(os.path.dirname(bin_path) or "."),
+                                       glob.escape(_side_prefix(bin_path)) + "*.tmp")):
+        _remove_quietly(path)  # 아직 쓰는 중이면(열려 있거나 다른 프로세스가 쓰는 중) 지우지 못해도 그만
+    return bin_path
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _read_source_stamp(bin_path):
+    """바이너리 헤더에 기록된 원본 JSON들의 (mtime_ns, 크기)"""
+    with open(bin_path, "rb") as f:
+        raw = f.read(_HEADER.size)
+    if len(raw) < _HEADER.size:
+        return None
+    magic, fmt, _, mtime_ns, size, _, _ = _HEADER.unpack(raw)
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        return None
+    return mtime_ns, size
+
+
+def is_store_stale(json_path, bin_path, translations_dir=None):
+    """JSON(추가 역본 포함)이 바이너리를 만든 이후 바뀌었는지 확인"""
+    if not os.path.exists(json_path):
+        # 원본이 없으면 있는 바이너리를 그대로 사용
+        return not os.path.exists(bin_path)
+    if not os.path.exists(bin_path):
+        return True
+    return _read_source_stamp(bin_path) != _source_stamp(source_files(json_path, translations_dir))
+
+
+class VerseSource:
+    """
+    구절 제공자. PPT 생성/구절 해석/검색은 이 메서드들만 사용하므로,
+    다른 형식의 성경 데이터도 이 클래스를 상속해서 get_text 등을 구현하면 그대로 쓸 수 있다.
+    """
+
+    path = None
+    source_mtime_ns = 0  # 원본이 바뀌면 달라지는 값 (색인 캐시 무효화용)
+
+    def versions(self):
+        raise NotImplementedError
+
+    def books(self, version):
+        raise NotImplementedError
+
+    def chapters(self, version, book):
+        raise NotImplementedError
+
+    def verse_numbers(self, version, book, chapter):
+        raise NotImplementedError
+
+    def get_text(self, version, book, chapter, verse):
+        raise NotImplementedError
+
+    def get_parallel(self, versions, book, chapter, verses):
+        """
+        같은 장의 여러 절을 여러 역본으로 한 번에 조회.
+        반환: 절마다 (역본1 본문, 역본2 본문, ...) 튜플의 목록 (없는 본문은 None)
+        """
+        return [tuple(self.get_text(version, book, chapter, verse) for version in versions)
+                for verse in verses]
+
+
+def book_id(book):
+    """책 이름의 번호 (처음 보는 이름이면 새 번호를 매긴다)"""
+    number = _book_ids.get(book)
+    if number is None:
+        with _book_lock:
+            number = _book_ids.get(book)
+            if number is None:
+                number = len(_book_names)
+                _book_names.append(book)
+                _book_ids[book] = number
+    return number
+
+
+_RECORD_FIELDS = ("book", "chapter", "verse", "text")  # record[i]가 돌려주는 속성 (본문은 text일 때만 읽음)
+
+
+class VerseRecord:
+    """
+    구절 하나 (책 번호, 장, 절). 본문은 들고 있지 않고 text를 읽을 때마다 저장소에서 가져온다.
+    (책, 장, 절, 본문) 튜플처럼 풀어서 쓸 수 있다: book, chapter, verse, text = record
+    역본이 두 개 이상이면 text는 (역본1 본문, 역본2 본문, ...) 튜플 (없는 본문은 빈 문자열).
+    """
+
+    __slots__ = ("book_id", "chapter", "verse", "source", "versions")
+
+    def __init__(self, source, versions, book, chapter, verse):
+        self.source = source
+        self.versions = versions  # 역본 이름 튜플 (같은 요청의 구절끼리 공유)
+        self.book_id = book_id(book)
+        self.chapter = chapter
+        self.verse = verse
+
+    @property
+    def book(self):
+        return _book_names[self.book_id]
+
+    @property
+    def text(self):
+        book = _book_names[self.book_id]
+        if len(self.versions) == 1:
+            return self.source.get_text(self.versions[0], book, self.chapter, self.verse)
+        return tuple(self.source.get_text(version, book, self.chapter, self.verse) or ""
+                     for version in self.versions)
+
+    def __iter__(self):
+        return iter((_book_names[self.book_id], self.chapter, self.verse, self.text))
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(getattr(self, name) for name in _RECORD_FIELDS[i])
+        return getattr(self, _RECORD_FIELDS[i])
+
+    def __repr__(self):
+        return f"VerseRecord({self.book!r}, {self.chapter}, {self.verse})"
+
+
+class BibleStore(VerseSource):
+    """mmap으로 연 성경 저장소. 구절을 요청할 때만 해당 본문을 디코딩한다."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        (magic, fmt, n_versions, self.source_mtime_ns, self.source_size,
+         self._verse_base, self._text_base) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"성경 저장소 형식이 올바르지 않습니다: {path}")
+
+        # 역본 이름 -> 책 테이블 위치
+        self._version_offsets = {}
+        pos = _HEADER.size
+        for _ in range(n_versions):
+            name, pos = self._read_str(pos)
+            self._version_offsets[name] = _U32.unpack_from(self._mm, pos)[0]
+            pos += _U32.size
+        # 역본 이름 -> {책: {장: (첫 절 번호, 절 수)}} (처음 조회할 때 생성)
+        self._indexes = {}
+
+    @property
+    def closed(self):
+        return self._mm is None
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_str(self, pos):
+        (length,) = _U16.unpack_from(self._mm, pos)
+        start = pos + _U16.size
+        return self._mm[start:start + length].decode("utf-8"), start + length
+
+    def _index(self, version):
+        index = self._indexes.get(version)
+        if index is not None:
+            return index
+        pos = self._version_offsets.get(version)
+        if pos is None:
+            return None
+        index = {}
+        (n_books,) = _U16.unpack_from(self._mm, pos)
+        pos += _U16.size
+        for _ in range(n_books):
+            book, pos = self._read_str(pos)
+            (n_chapters,) = _U16.unpack_from(self._mm, pos)
+            pos += _U16.size
+            chapters = {}
+            for _ in range(n_chapters):
+                chapter, n_verses, first = _CHAPTER.unpack_from(self._mm, pos)
+                pos += _CHAPTER.size
+                chapters[chapter] = (first, n_verses)
+            index[book] = chapters
+        self._indexes[version] = index
+        return index
+
+    def _entry(self, i):
+        return _VERSE.unpack_from(self._mm, self._verse_base + i * _VERSE.size)
+
+    def _find_entry(self, first, count, verse):
+        """장 안에서 절 번호로 절 테이블 항목을 찾는다 (보통 1절부터 연속이므로 바로 찾음)"""
+        guess = verse - 1
+        if 0 <= guess < count:
+            entry = self._entry(first + guess)
+            if entry[0] == verse:
+                return entry
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._entry(first + mid)
+            if entry[0] < verse:
+                lo = mid + 1
+            elif entry[0] > verse:
+                hi = mid
+            else:
+                return entry
+        return None
+
+    def _text(self, entry):
+        start = self._text_base + entry[1]
+        return self._mm[start:start + entry[2]].decode("utf-8")
+
+    def versions(self):
+        return list(self._version_offsets)
+
+    def books(self, version):
+        index = self._index(version)
+        return list(index) if index else []
+
+    def chapters(self, version, book):
+        index = self._index(version) or {}
+        return sorted(index.get(book, {}))
+
+    def verse_numbers(self, version, book, chapter):
+        """해당 장에 실제로 존재하는 절 번호 목록"""
+        index = self._index(version) or {}
+        loc = index.get(book, {}).get(int(chapter))
+        if loc is None:
+            return []
+        first, count = loc
+        return [self._entry(first + i)[0] for i in range(count)]
+
+    def get_text(self, version, book, chapter, verse):
+        """구절 본문을 반환. 없으면 None"""
+        index = self._index(version)
+        if index is None:
+            return None
+        loc = index.get(book, {}).get(int(chapter))
+        if loc is None:
+            return None
+        entry = self._find_entry(loc[0], loc[1], int(verse))
+        if entry is None:
+            return None
+        return self._text(entry)
+
+    def get_parallel(self, versions, book, chapter, verses):
+        """역본마다 장 위치를 한 번만 찾고, 절들은 그 장 안에서 바로 읽는다"""
+        chapter = int(chapter)
+        locs = []
+        for version in versions:
+            index = self._index(version)
+            locs.append(index.get(book, {}).get(chapter) if index else None)
+        rows = []
+        for verse in verses:
+            row = []
+            for loc in locs:
+                entry = self._find_entry(loc[0], loc[1], int(verse)) if loc is not None else None
+                row.append(self._text(entry) if entry is not None else None)
+            rows.append(tuple(row))
+        return rows
+
+
+def open_bible_store(json_path, bin_path, translations_dir=None):
+    """
+    필요하면 바이너리를 (다시) 만든 뒤 저장소를 연다. 같은 경로는 한 번만 연다.
+    translations_dir의 *.json 역본도 함께 넣는다.
+    원본이 바뀌어 다시 만들면 새 저장소를 열어 돌려주고, 예전 저장소는 닫지 않는다
+    (이미 받아 간 곳에서는 예전 내용 그대로 계속 읽을 수 있고, 쓰는 곳이 없어지면 정리된다).
+    """
+    store = _open_stores.get(bin_path)
+    if store is not None and not store.closed:
+        stamp = _current_stamp(json_path, translations_dir)
+        if stamp is None or stamp == (store.source_mtime_ns, store.source_size):
+            return store
+    path = bin_path
+    if is_store_stale(json_path, bin_path, translations_dir):
+        path = build_bible_store(source_files(json_path, translations_dir), bin_path)
+    store = BibleStore(path)
+    _open_stores[bin_path] = store
+    return store
+
+
+def _current_stamp(json_path, translations_dir):
+    """원본 JSON들의 (mtime_ns, 크기). 원본이 없으면 None (있는 바이너리를 그대로 씀)"""
+    if not os.path.exists(json_path):
+        return None
+    return _source_stamp(source_files(json_path, translations_dir))
+
+
+def load_bible_data():
+    """성경 저장소(BibleStore)를 연다. JSON이 바뀌었으면 바이너리를 다시 만든다."""
+    return open_bible_store(BIBLE_DATA_PATH, BIBLE_STORE_PATH, TRANSLATIONS_DIR)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="성경 JSON을 바이너리 저장소로 변환합니다.")
+    parser.add_argument("--json", default=BIBLE_DATA_PATH)
+    parser.add_argument("--translations", default=TRANSLATIONS_DIR, help="추가 역본 JSON 폴더")
+    parser.add_argument("--out", default=BIBLE_STORE_PATH)
+    args = parser.parse_args()
+    built_path = build_bible_store(source_files(args.json, args.translations), args.out)
+    with BibleStore(built_path) as built:
+        print(f"성경 저장소 생성 완료: {args.out} (역본: {', '.join(built.versions())})")
@@ -0,0 +1,161 @@
+"""
+성경 책 이름 찾기 (자동 완성, 오타 교정)
+
+정식 이름, 약칭, 흔히 쓰는 다른 이름(books.BOOK_ALIASES)을 한글 자모 단위로 풀어서 트라이에 넣어 둔다.
+- 자모 단위라서 입력 중인 글자('욯' -> 요한, '고' -> 골로새서/고린도전서)도 앞부분으로 찾는다
+- 트라이의 각 노드에 순위를 매긴 후보 책 목록을 미리 계산해 두므로, 자동 완성은 입력 길이만큼만 따라간다
+- 정확히 맞는 이름이 없으면 자모 단위 편집 거리로 가까운 책을 찾는다 ('요한볶음' -> 요한복음)
+
+python-pptx 등 무거운 모듈 없이 GUI 시작 시 바로 쓸 수 있다.
+"""
+from core.books import BIBLE_BOOK_ABBR, BOOK_ALIASES
+
+# 두벌식 자판에서 누르는 순서대로 푼 자모 (겹모음/겹받침은 나눠서 입력 중인 글자와 앞부분이 맞도록)
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = ("ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ", "ㅜㅓ", "ㅜㅔ",
+              "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ")
+_JONGSEONG = ("", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ", "ㄹㅍ",
+              "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+
+COMPLETE_LIMIT = 8  # 자동 완성 후보 수
+_NODE_LIMIT = 16  # 트라이 노드마다 보관할 후보 수
+MIN_CORRECT_KEYS = 4  # 이보다 짧은 이름(한 글자 약칭 등)은 오타 교정하지 않고 후보만 알려준다
+
+
+def jamo_keys(text):
+    """한글 음절을 자모로 푼 문자열 ('요한' -> 'ㅇㅛㅎㅏㄴ'). 한글이 아닌 글자는 그대로"""
+    keys = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_FIRST <= code <= _HANGUL_LAST:
+            code -= _HANGUL_FIRST
+            keys.append(_CHOSEONG[code // 588] + _JUNGSEONG[code % 588 // 28] + _JONGSEONG[code % 28])
+        else:
+            keys.append(ch)
+    return "".join(keys)
+
+
+def edit_distance(a, b, limit):
+    """a와 b의 편집 거리. limit를 넘는 것이 확실해지면 limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class _Node:
+    __slots__ = ("children", "ranked")
+
+    def __init__(self):
+        self.children = {}
+        self.ranked = {}  # 만드는 동안: 책 -> 점수, 다 만든 뒤: 순위대로 정렬한 책 목록
+
+
+class BookResolver:
+    """
+    책 이름 색인.
+      resolve(name)   : 정확히 맞는 이름(정식/약칭/다른 이름)의 정식 이름, 없으면 None
+      complete(text)  : text로 시작하는 책 (순위순)
+      suggest(name)   : 오타로 보이는 이름과 가까운 책 [(정식 이름, 거리), ...]
+      correct(name)   : 가까운 책이 하나뿐이면 그 책 (오타 교정), 아니면 None
+    """
+
+    def __init__(self, book_abbr=BIBLE_BOOK_ABBR, aliases=BOOK_ALIASES):
+        self.books = list(dict.fromkeys(book_abbr.values()))  # 성경 순서
+        self.abbr_of = {book: abbr for abbr, book in book_abbr.items()}
+        self._order = {book: i for i, book in enumerate(self.books)}
+        self._names = {book: book for book in self.books}
+        self._names.update(book_abbr)
+        for alias, book in aliases.items():
+            self._names.setdefault(alias, book)
+        self._keys = {name: jamo_keys(name) for name in self._names}
+        self._root = _Node()
+        for name, keys in self._keys.items():
+            self._insert(keys, self._names[name])
+        self._finish(self._root)
+
+    def _insert(self, keys, book):
+        # 점수: (입력이 이름과 정확히 같으면 0, 앞부분만 같으면 1, 성경 순서) - 작을수록 앞
+        node = self._root
+        for depth, key in enumerate(keys, 1):
+            node = node.children.setdefault(key, _Node())
+            score = (0 if depth == len(keys) else 1, self._order[book])
+            if score < node.ranked.get(book, (2, 0)):
+                node.ranked[book] = score
+
+    def _finish(self, root):
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            node.ranked = sorted(node.ranked, key=node.ranked.get)[:_NODE_LIMIT]
+            stack.extend(node.children.values())
+
+    def names(self):
+        """인식하는 모든 이름 (정식 이름, 약칭, 다른 이름)"""
+        return list(self._names)
+
+    def resolve(self, name):
+        return self._names.get(name)
+
+    def complete(self, text, limit=COMPLETE_LIMIT):
+        """text(입력 중인 글자 포함)로 시작하는 이름이 있는 책들 (text와 똑같은 이름이 먼저, 그다음 성경 순서)"""
+        keys = jamo_keys(text.strip())
+        if not keys:
+            return []
+        node = self._root
+        for key in keys:
+            node = node.children.get(key)
+            if node is None:
+                return []
+        return node.ranked[:limit]
+
+    def search(self, text):
+        """목록 검색용: 앞부분이 맞는 책(순위순), 그다음 이름 중간에 text가 들어 있는 책(성경 순서)"""
+        text = text.strip()
+        if not text:
+            return list(self.books)
+        found = self.complete(text, limit=len(self.books))
+        seen = set(found)
+        return found + [book for book in self.books if book not in seen and text in book]
+
+    def suggest(self, name, limit=3):
+        """자모 편집 거리가 가까운 책 [(정식 이름, 거리), ...] (거리, 성경 순서대로)"""
+        keys = jamo_keys(name.strip())
+        if not keys:
+            return []
+        max_distance = 1 if len(keys) <= 4 else 2 if len(keys) <= 9 else 3
+        best = {}
+        for other, other_keys in self._keys.items():
+            distance = edit_distance(keys, other_keys, max_distance)
+            book = self._names[other]
+            if distance <= max_distance and distance < best.get(book, max_distance + 1):
+                best[book] = distance
+        return sorted(best.items(), key=lambda item: (item[1], self._order[item[0]]))[:limit]
+
+    def correct(self, name):
+        """오타 교정: 가장 가까운 책이 하나뿐일 때만 그 책 (짧은 이름은 교정하지 않음)"""
+        if len(jamo_keys(name.strip())) < MIN_CORRECT_KEYS:
+            return None
+        suggestions = self.suggest(name, limit=2)
+        if not suggestions or (len(suggestions) > 1 and suggestions[1][1] == suggestions[0][1]):
+            return None
+        return suggestions[0][0]
+
+
+_resolver = None
+
+
+def get_book_resolver():
+    """기본 책 이름 색인 (처음 부를 때 한 번 만든다)"""
+    global _resolver
+    if _resolver is None:
+        _resolver = BookResolver()
+    return _resolver
@@ -0,0 +1,222 @@
+"""
+명령줄(헤드리스) PPT 생성기
+
+GUI 없이 여러 개의 PPT를 한 번에 만듭니다. 성경 데이터와 템플릿은 한 번만 읽습니다.
+
+  python -m core.cli jobs.json
+  python -m core.cli --selection "시23:1-6" --template 1 --output 시23.pptx
+  python -m core.cli jobs.json --workers 0   # CPU 코어 수만큼 병렬 생성
+  python -m core.cli --selection "요3:16" --parallel KJV --output 요3.pptx   # 개역개정/KJV 나란히
+  python -m core.cli --selection "시23" --output 시23.pdf   # PDF로 (.png: 슬라이드별 PNG, .html: 슬라이드쇼)
+
+jobs.json 예시:
+  [
+    {"selection": "창1:1-3,2:1-2; 왕상3:1-5", "template": 1, "output": "주일.pptx", "max_chars": 100},
+    {"selection": "시23:1-6", "template": 3, "output": "수요.pptx"}
+  ]
+max_chars, bg_image 를 생략하면 data/settings.json 의 템플릿 설정을 따릅니다.
+"fit": true 면 본문 상자 크기에 맞춰 나누고, "pack": true 면 짧은 연속 구절을 한 슬라이드에 묶습니다.
+"stream": true 면 슬라이드를 만드는 즉시 파일에 기록해서 책 전체 같은 큰 PPT도 메모리를 적게 씁니다.
+"bg_dpi": 배경 이미지를 줄일 해상도 (생략하면 설정값, 0이면 원본 그대로)
+"cache": false 면 전에 만든 같은 PPT가 있어도 다시 만듭니다 (생략하면 설정값).
+"version": 역본, "parallel": 나란히 넣을 두 번째 역본 (예: "KJV", ""면 사용 안 함; 생략하면 설정값)
+output 확장자가 .pdf/.png/.html 이면 PPT 대신 그 형식으로 내보냅니다 (.png는 시23_001.png 처럼 슬라이드마다 한 장).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from core.ppt_generator import load_bible_data, build_deck, build_decks_parallel
+from core.settings import load_settings
+from core.deck_cache import DECK_CACHE_DIR
+from core.export import export_format
+
+TEMPLATE_DIR = "templates"
+
+# 작업 값의 형식: 정수 값의 (최소, 최대), 참/거짓 값, 문자열 값
+_INT_KEYS = {"max_chars": (1, None), "bg_dpi": (0, 1200)}
+_BOOL_KEYS = ("fit", "pack", "stream", "incremental", "cache")
+_STR_KEYS = ("selection", "output", "bg_image", "version", "parallel")
+
+
+def load_manifest(path):
+    """작업 목록 파일을 읽는다. 리스트 또는 {"jobs": [...]} 형식"""
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    jobs = manifest.get("jobs", []) if isinstance(manifest, dict) else manifest
+    checked = []
+    for i, job in enumerate(jobs, 1):
+        if not isinstance(job, dict):
+            raise ValueError(f"{i}번째 작업이 JSON 객체가 아닙니다.")
+        for key in ("selection", "output"):
+            if not job.get(key):
+                raise ValueError(f"{i}번째 작업에 '{key}' 값이 없습니다.")
+        try:
+            checked.append(check_job(job))
+        except ValueError as e:
+            raise ValueError(f"{i}번째 작업: {e}")
+    return checked
+
+
+def check_job(job):
+    """
+    작업 값의 형식을 확인한 사본을 반환. 숫자 문자열("100")은 정수로 바꾸고,
+    참/거짓 값은 true/false만 받는다 ("false" 같은 문자열은 오류). 잘못된 값은 ValueError
+    """
+    job = dict(job)
+    if str(job.get("template", 1)) not in ("1", "2", "3"):
+        raise ValueError("'template'은 1~3 중 하나여야 합니다.")
+    for key, (low, high) in _INT_KEYS.items():
+        value = job.get(key)
+        if value is None:
+            continue
+        if isinstance(value, str) and value.strip().isdigit():
+            value = int(value)
+        if not isinstance(value, int) or isinstance(value, bool) or value < low or (high is not None and value > high):
+            limit = f"{low}~{high}" if high is not None else f"{low} 이상"
+            raise ValueError(f"'{key}'는 {limit}의 정수여야 합니다: {value!r}")
+        job[key] = value
+    for key in _BOOL_KEYS:
+        if key in job and not isinstance(job[key], bool):
+            raise ValueError(f"'{key}'는 true 또는 false여야 합니다: {job[key]!r}")
+    for key in _STR_KEYS:
+        if job.get(key) is not None and not isinstance(job[key], str):
+            raise ValueError(f"'{key}'는 문자열이어야 합니다: {job[key]!r}")
+    return job
+
+
+def template_path_for(template_num):
+    return os.path.abspath(os.path.join(TEMPLATE_DIR, f"base_template{template_num}.pptx"))
+
+
+def resolve_jobs(jobs, config=None):
+    """
+    작업 목록의 템플릿 번호/생략된 값을 build_deck 형식으로 채운다.
+    config: 생략한 값을 채울 설정 (없으면 data/settings.json을 읽음)
+    """
+    config = config if config is not None else load_settings()
+    bg_images = config["bg_images"]
+    resolved = []
+    for job in map(check_job, jobs):
+        template_num = str(job.get("template", 1))
+        output_path = job["output"]
+        if not output_path.lower().endswith(".pptx") and not export_format(output_path):
+            output_path += ".pptx"
+        out_dir = os.path.dirname(output_path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        resolved.append({
+            "selection": job["selection"],
+            "output_path": output_path,
+            "template_path": template_path_for(template_num),
+            "bg_image_path": job.get("bg_image", bg_images.get(template_num, "")),
+            "max_chars": job.get("max_chars") or config["max_chars_per_slide"].get(template_num, 500),
+            "fit_mode": job.get("fit", config.get("fit_to_box", False)),
+            "pack_verses": job.get("pack", config.get("pack_verses", False)),
+            "streaming": job.get("stream", False),
+            "incremental": job.get("incremental", False),
+            "bg_dpi": job["bg_dpi"] if job.get("bg_dpi") is not None else config["bg_image_dpi"],
+            "version": job.get("version") or config["bible_version"],
+            "parallel_version": job.get("parallel", config["parallel_version"]),
+            "use_cache": job.get("cache", config["deck_cache"]),
+        })
+    return resolved
+
+
+def run_jobs(jobs, bible_data=None, workers=1, log=print, report=False):
+    """
+    작업들을 실행하고 작업별 결과를 반환.
+    workers > 1 이면 프로세스 풀로 병렬 생성한다.
+    결과: [{"output", "slides", "seconds", "error"}, ...] (실패한 작업은 error에 메시지)
+    report면 결과마다 단계별 계측 보고서("report")를 포함한다.
+    """
+    resolved = resolve_jobs(jobs)
+    if report:
+        for job in resolved:
+            job["report"] = True
+    if workers > 1:
+        results = build_decks_parallel(resolved, max_workers=workers)
+    else:
+        if bible_data is None:
+            bible_data = load_bible_data()
+        # 템플릿은 ppt_generator의 템플릿 캐시 덕분에 경로별로 한 번만 준비된다
+        results = [build_deck(job, bible_data) for job in resolved]
+
+    for i, result in enumerate(results, 1):
+        if result["error"]:
+            log(f"[{i}/{len(results)}] 실패 {result['output']}: {result['error']} ({result['seconds']:.2f}초)")
+        else:
+            cached = ", 캐시에서 복사" if result.get("cached") else ""
+            log(f"[{i}/{len(results)}] 완료 {result['output']}: 슬라이드 {result['slides']}장 "
+                f"({result['seconds']:.2f}초{cached})")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="성경 구절 PPT를 명령줄에서 생성합니다.")
+    parser.add_argument("manifest", nargs="?", help="작업 목록 JSON 파일")
+    parser.add_argument("--selection", help="구절 범위 (예: '창1:1-3; 시23:1-6')")
+    parser.add_argument("--template", default="1", help="템플릿 번호 (1~3)")
+    parser.add_argument("--output", help="저장할 PPT 경로 (.pdf/.png/.html이면 그 형식으로 내보내기)")
+    parser.add_argument("--max-chars", type=int, help="한 슬라이드 최대 글자 수")
+    parser.add_argument("--bg-image", help="배경 이미지 경로")
+    parser.add_argument("--bg-dpi", type=int, help="배경 이미지를 줄일 해상도 (0: 원본 그대로)")
+    parser.add_argument("--version", help="역본 (예: 개역개정, 새번역)")
+    parser.add_argument("--parallel", help="나란히 넣을 두 번째 역본 (예: KJV)")
+    parser.add_argument("--fit", action="store_true", help="글자 수 대신 본문 상자 크기에 맞춰 나누기")
+    parser.add_argument("--pack", action="store_true", help="짧은 연속 구절을 한 슬라이드에 묶기")
+    parser.add_argument("--stream", action="store_true", help="슬라이드를 만드는 즉시 파일에 기록 (대용량 PPT 메모리 절약)")
+    parser.add_argument("--incremental", action="store_true", help="같은 출력 파일은 바뀐 슬라이드만 다시 만들기")
+    parser.add_argument("--no-cache", action="store_true", help="전에 만든 같은 PPT가 있어도 다시 만들기")
+    parser.add_argument("--workers", type=int, default=1, help="동시에 생성할 프로세스 수 (0: CPU 코어 수)")
+    parser.add_argument("--report", help="작업별 단계 소요 시간 보고서를 저장할 JSON 경로")
+    args = parser.parse_args(argv)
+
+    if args.manifest:
+        jobs = load_manifest(args.manifest)
+    elif args.selection and args.output:
+        job = {"selection": args.selection, "template": args.template, "output": args.output,
+               "max_chars": args.max_chars}
+        if args.bg_image is not None:
+            job["bg_image"] = args.bg_image
+        if args.bg_dpi is not None:
+            job["bg_dpi"] = args.bg_dpi
+        jobs = [job]
+    else:
+        parser.error("작업 목록 파일 또는 --selection/--output 을 지정하세요.")
+    for job in jobs:
+        if args.fit:
+            job.setdefault("fit", True)
+        if args.pack:
+            job.setdefault("pack", True)
+        if args.stream:
+            job.setdefault("stream", True)
+        if args.incremental:
+            job.setdefault("incremental", True)
+        if args.no_cache:
+            job.setdefault("cache", False)
+        if args.version:
+            job.setdefault("version", args.version)
+        if args.parallel is not None:
+            job.setdefault("parallel", args.parallel)
+
+    start = time.perf_counter()
+    load_bible_data()
+    print(f"성경 데이터 로드: {time.perf_counter() - start:.2f}초")
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    results = run_jobs(jobs, workers=workers, report=bool(args.report))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump([r["report"] for r in results if r.get("report")], f, ensure_ascii=False, indent=2)
+    failed = sum(1 for r in results if r["error"])
+    cached = sum(1 for r in results if r.get("cached"))
+    print(f"전체 {len(results)}개 중 {len(results) - failed}개 성공, {failed}개 실패 "
+          f"({time.perf_counter() - start:.2f}초)")
+    print(f"PPT 캐시: 재사용 {cached}개, 새로 생성 {len(results) - failed - cached}개 ({DECK_CACHE_DIR})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+생성한 PPT 캐시
+
+시23, 요3:16 처럼 자주 쓰는 구절을 같은 템플릿/배경/옵션으로 다시 만들면 결과 파일도 똑같으므로,
+만든 PPT를 프로그램 폴더의 data/cache/decks/ 에 보관해 두고 같은 요청이 오면 다시 만들지 않고 파일만 복사한다.
+
+- 키: 구절 내용(책/장/절/본문), 템플릿 파일 내용 해시, 배경 이미지 내용 해시, 최대 글자 수, 나누기 옵션,
+  상자 크기에 맞춰 나눌 때(fit_mode)는 실제로 폭을 잰 글꼴 파일 내용 해시
+  (저장소의 VerseRecord는 본문을 읽지 않고 역본과 원본 데이터 수정시각/크기로 대신한다)
+  (파일 내용으로 비교하므로 템플릿을 다른 이름으로 복사해도 같은 키)
+- 전체 크기가 DECK_CACHE_MAX_BYTES를 넘으면 오래 안 쓴 것(수정시각)부터 지운다
+- 캐시 파일 옆의 .json 에 슬라이드 수와 슬라이드별 내용 키를 저장 (진행률 표시/증분 생성 기록용)
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import threading
+
+from core.incremental import page_key
+from core.bible_store import VerseRecord
+
+# 프로그램 폴더 (PyInstaller 실행 파일이면 exe 위치, 아니면 main.py가 있는 폴더).
+# 라이브러리로 불러 쓸 때 작업 폴더마다 캐시가 생기지 않도록 작업 폴더 대신 여기를 기준으로 한다
+APP_DIR = (os.path.dirname(os.path.abspath(sys.executable)) if getattr(sys, "frozen", False)
+           else os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DECK_CACHE_DIR = os.path.join(APP_DIR, "data", "cache", "decks")
+DECK_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+_CACHE_FORMAT = 1  # 슬라이드 XML 만드는 방식이 바뀌면 올려서 예전 캐시를 무시
+
+# (경로, 수정시각, 크기) -> 내용 해시 (같은 파일은 한 번만 읽음)
+_file_digests = {}
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_lock = threading.Lock()
+
+
+def file_digest(path):
+    """파일 내용의 sha1 (수정시각/크기가 같으면 다시 읽지 않는다)"""
+    st = os.stat(path)
+    stamp = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    digest = _file_digests.get(stamp)
+    if digest is None:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        _file_digests[stamp] = digest
+    return digest
+
+
+def deck_key(verses, template_path, bg_image_path, max_chars, options, font_files=()):
+    """
+    결과 PPT를 결정하는 입력 전체의 해시.
+    options: 나누기 옵션 등 결과에 영향을 주는 값들의 dict (JSON으로 바꿀 수 있어야 함)
+    font_files: 슬라이드 나누기에 폭을 잰 글꼴 파일 경로들 (글꼴을 못 찾아 추정했으면 None)
+    """
+    bg = file_digest(bg_image_path) if bg_image_path and os.path.exists(bg_image_path) else None
+    fonts = [file_digest(path) if path and os.path.exists(path) else None for path in font_files]
+    head = [_CACHE_FORMAT, file_digest(template_path), bg, max_chars, options, fonts]
+    h = hashlib.sha256(json.dumps(head, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    for verse in verses:
+        h.update(_verse_key(verse).encode("utf-8"))
+    return h.hexdigest()[:40]
+
+
+def _verse_key(verse):
+    """
+    구절 하나의 키. 원본 데이터가 바뀌면 알 수 있는 저장소의 VerseRecord는 본문을 읽지 않고
+    (책, 장, 절, 역본, 원본 수정시각/크기)로 만든다. 본문은 슬라이드를 만들 때 한 번만 읽도록.
+    """
+    if isinstance(verse, VerseRecord) and verse.source.source_mtime_ns:
+        source = verse.source
+        return "\x1f".join((verse.book, str(verse.chapter), str(verse.verse), "\x1e".join(verse.versions),
+                             str(source.source_mtime_ns), str(getattr(source, "source_size", 0)))) + "\x1d"
+    return page_key(*verse)
+
+
+def _paths(key):
+    base = os.path.join(DECK_CACHE_DIR, key)
+    return base + ".pptx", base + ".json"
+
+
+def _copy(src, dst):
+    """임시 파일에 복사한 뒤 교체 (중간에 실패해도 반쯤 쓰인 파일이 남지 않도록)"""
+    tmp_path = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def fetch_deck(key, output_path):
+    """캐시에 있으면 output_path로 복사하고 {"slides", "pages"} 반환, 없으면 None"""
+    deck_path, meta_path = _paths(key)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        _copy(deck_path, output_path)
+        os.utime(deck_path)  # 최근 사용 표시
+    except (OSError, ValueError):
+        with _lock:
+            _stats["misses"] += 1
+        return None
+    with _lock:
+        _stats["hits"] += 1
+    return meta
+
+
+def store_deck(key, output_path, page_keys):
+    """방금 만든 output_path를 캐시에 넣는다 (실패해도 생성 결과에는 영향 없음)"""
+    deck_path, meta_path = _paths(key)
+    try:
+        os.makedirs(DECK_CACHE_DIR, exist_ok=True)
+        _copy(output_path, deck_path)
+        tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"slides": len(page_keys), "pages": page_keys}, f)
+        os.replace(tmp_path, meta_path)
+    except OSError as e:
+        print(f"경고: 생성한 PPT를 캐시에 저장하지 못했습니다: {e}")
+        return
+    with _lock:
+        _stats["stores"] += 1
+    _prune(deck_path)
+
+
+def _cached_decks():
+    """[(경로, 수정시각, 크기), ...] (오래 안 쓴 것부터)"""
+    decks = []
+    for name in os.listdir(DECK_CACHE_DIR):
+        if not name.endswith(".pptx"):
+            continue
+        path = os.path.join(DECK_CACHE_DIR, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        decks.append((path, st.st_mtime, st.st_size))
+    decks.sort(key=lambda d: d[1])
+    return decks
+
+
+def _prune(keep_path):
+    """전체 크기가 DECK_CACHE_MAX_BYTES 이하가 되도록 오래 안 쓴 PPT부터 지운다"""
+    decks = _cached_decks()
+    total = sum(size for _, _, size in decks)
+    for path, _, size in decks:
+        if total <= DECK_CACHE_MAX_BYTES:
+            break
+        if path == keep_path:
+            continue
+        try:
+            os.remove(path)
+            os.remove(os.path.splitext(path)[0] + ".json")
+        except OSError:
+            pass
+        total -= size
+        with _lock:
+            _stats["evictions"] += 1
+
+
+def deck_cache_info():
+    """캐시 상태 {"hits", "misses", "stores", "evictions", "decks", "bytes"} (적중/실패는 이 프로세스 기준)"""
+    decks = _cached_decks() if os.path.isdir(DECK_CACHE_DIR) else []
+    with _lock:
+        return dict(_stats, decks=len(decks), bytes=sum(size for _, _, size in decks))
+
+
+def clear_deck_cache():
+    """캐시한 PPT를 모두 지운다"""
+    if os.path.isdir(DECK_CACHE_DIR):
+        shutil.rmtree(DECK_CACHE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="생성한 PPT 캐시 상태를 보거나 비웁니다.")
+    parser.add_argument("--clear", action="store_true", help="캐시 비우기")
+    args = parser.parse_args()
+    if args.clear:
+        clear_deck_cache()
+    info = deck_cache_info()
+    print(f"PPT 캐시: {DECK_CACHE_DIR} ({info['decks']}개, {info['bytes'] / 1024 / 1024:.1f}MB)")
@@ -0,0 +1,335 @@
+"""
+PDF / PNG / HTML 내보내기
+
+PPT를 받지 않는 곳(PDF만 받는 행사장, 이미지만 넣는 방송 프로그램 등)을 위해 같은 슬라이드를
+PowerPoint 없이 그려서 PDF, 번호 붙은 PNG 파일들, 파일 하나로 된 HTML 슬라이드쇼로 저장한다.
+
+- 슬라이드 나누기는 PPT 생성과 같은 규칙(_paginate)으로 한 번만 하고,
+  상자 위치/크기/글꼴은 미리보기 렌더러가 템플릿의 TitleBox/VerseBox/ContentBox에서 읽는다
+- 나눈 슬라이드는 모아 두지 않고 나오는 대로 그리기에 넘긴다. 그리기는 여러 프로세스가 나눠서 하고
+  (CPU 코어 수만큼), 다 그린 슬라이드는 순서대로 바로 파일에 쓰므로 덱이 길어도 메모리가 늘지 않는다
+- 출력 파일 확장자로 형식을 정한다: .pdf / .png (시23_001.png, 시23_002.png ...) / .html
+- 모두 임시 파일(PNG는 임시 폴더)에 쓴 뒤 다 되면 옮기므로, 취소/오류 시 반쯤 쓰인 결과가 남지 않는다
+- PNG로 내보낸 파일 목록은 data/cache/builds/ 에 기록해 두고, 같은 이름으로 다시 내보낼 때
+  그 목록에 있던 파일 중 이번에 안 쓴 것만 지운다 (사용자가 둔 시23_2023.png 같은 파일은 건드리지 않음)
+"""
+import os
+import io
+import json
+import shutil
+import base64
+import tempfile
+from itertools import chain, islice
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from core.background import DEFAULT_BG_DPI
+from core.incremental import manifest_path_for
+from core.instrument import measure, note
+
+EXPORT_FORMATS = {".pdf": "pdf", ".png": "png", ".html": "html", ".htm": "html"}
+EXPORT_WIDTH = 1920  # 내보낼 슬라이드 이미지 폭(px), 높이는 슬라이드 비율대로
+JPEG_QUALITY = 90  # PDF/HTML에 넣는 슬라이드 이미지 화질
+PARALLEL_MIN_PAGES = 8  # 이보다 적으면 프로세스를 띄우지 않고 바로 그린다
+
+EMU_PER_PT = 12700
+
+
+def export_format(output_path):
+    """출력 경로의 확장자로 정한 내보내기 형식 ("pdf", "png", "html"). PPT 등이면 None"""
+    return EXPORT_FORMATS.get(os.path.splitext(output_path)[1].lower())
+
+
+def png_page_path(output_path, number, total):
+    """PNG로 내보낼 때 슬라이드 번호(1부터)의 파일 경로: 시23.png -> 시23_001.png"""
+    base, ext = os.path.splitext(output_path)
+    return f"{base}_{number:0{max(3, len(str(total)))}d}{ext}"
+
+
+def _png_record_path(output_path):
+    """output_path로 내보낸 PNG 파일 목록 기록 위치 (증분 생성 기록과 같은 data/cache/builds/)"""
+    return os.path.splitext(manifest_path_for(output_path))[0] + ".png.json"
+
+
+def _is_png_page_name(output_path, path):
+    """path가 output_path의 번호 붙은 PNG 이름(0을 채운 3자리 이상 번호: 시23_001.png)인지"""
+    base, ext = os.path.splitext(os.path.abspath(output_path))
+    path = os.path.abspath(path)
+    if not (path.startswith(base + "_") and path.endswith(ext)):
+        return False
+    number = path[len(base) + 1:len(path) - len(ext)]
+    return len(number) >= 3 and number.isdigit()
+
+
+def png_page_paths(output_path):
+    """
+    전에 output_path로 내보낸 번호 붙은 PNG 파일 중 아직 있는 것 (자릿수가 달랐던 것 포함).
+    이 프로그램이 쓴 기록에 있는 파일만 돌려주므로, 이름만 비슷한 다른 파일은 들어가지 않는다.
+    """
+    try:
+        with open(_png_record_path(output_path), "r", encoding="utf-8") as f:
+            recorded = json.load(f).get("pages", [])
+    except (OSError, ValueError, AttributeError):
+        return []
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    paths = [os.path.join(out_dir, name) for name in recorded if isinstance(name, str)]
+    return [path for path in paths if _is_png_page_name(output_path, path) and os.path.exists(path)]
+
+
+def _save_png_record(output_path, paths):
+    record_path = _png_record_path(output_path)
+    os.makedirs(os.path.dirname(record_path), exist_ok=True)
+    tmp_path = f"{record_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"output_path": os.path.abspath(output_path),
+                   "pages": [os.path.basename(path) for path in paths]}, f, ensure_ascii=False)
+    os.replace(tmp_path, record_path)
+
+
+# 그리기 프로세스마다 한 번 만드는 렌더러와 이미지 형식
+_worker_renderer = None
+_worker_image_format = None
+
+
+def _init_render_worker(template_path, bg_image_path, bg_dpi, parallel, width, image_format):
+    global _worker_renderer, _worker_image_format
+    from core.preview import ImageCache, get_preview_renderer
+    # 그린 슬라이드는 바로 부모 프로세스로 보내므로 캐시에 쌓아 두지 않는다
+    _worker_renderer = get_preview_renderer(template_path, bg_image_path, width, bg_dpi, parallel,
+                                            cache=ImageCache(0))
+    _worker_image_format = image_format
+
+
+def _render_page(page):
+    """슬라이드 한 장을 그려서 PNG/JPEG 바이트로 반환"""
+    image = _worker_renderer.render(*page)
+    buf = io.BytesIO()
+    if _worker_image_format == "PNG":
+        image.save(buf, format="PNG", optimize=False, compress_level=6)
+    else:
+        image.save(buf, format="JPEG", quality=JPEG_QUALITY)
+    return buf.getvalue()
+
+
+def _rendered_pages(pages, render_args, workers):
+    """
+    pages(나눈 슬라이드를 하나씩 내주는 생성기도 됨)를 순서대로 그린 이미지 바이트를 하나씩 내준다.
+    여러 프로세스로 그릴 때도 동시에 맡기는 장수를 workers*2로 제한해서, 쓰기보다 그리기가 빨라도
+    그려 둔 이미지가 메모리에 쌓이지 않는다.
+    """
+    pages = iter(pages)
+    head = list(islice(pages, PARALLEL_MIN_PAGES))  # 몇 장 안 되면 프로세스를 띄우지 않는다
+    pages = chain(head, pages)
+    if workers <= 1 or len(head) < PARALLEL_MIN_PAGES:
+        _init_render_worker(*render_args)
+        for page in pages:
+            yield _render_page(page)
+        return
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker, initargs=render_args)
+    pending = deque()
+    try:
+        for page in pages:
+            pending.append(executor.submit(_render_page, page))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # 취소/오류로 중간에 멈추면 아직 시작하지 않은 슬라이드는 그리지 않는다
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _PdfWriter:
+    """
+    슬라이드 이미지(JPEG)를 한 장씩 바로 파일에 쓰는 PDF 작성기.
+    페이지 목록(Pages)과 상호 참조표(xref)만 마지막에 쓰므로 이미지를 모아 둘 필요가 없다.
+    """
+
+    def __init__(self, f, page_width_pt, page_height_pt):
+        self.f = f
+        self.page_size = (page_width_pt, page_height_pt)
+        self.offsets = {}  # 객체 번호 -> 파일 위치
+        self.page_ids = []
+        self.next_id = 3  # 1: Catalog, 2: Pages
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _object(self, obj_id, body, stream=None):
+        self.offsets[obj_id] = self.f.tell()
+        self.f.write(f"{obj_id} 0 obj\n".encode("ascii") + body)
+        if stream is not None:
+            self.f.write(b"\nstream\n" + stream + b"\nendstream")
+        self.f.write(b"\nendobj\n")
+
+    def add_page(self, jpeg_bytes, pixel_width, pixel_height):
+        image_id, content_id, page_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+        width, height = self.page_size
+        self._object(image_id, (f"<< /Type /XObject /Subtype /Image /Width {pixel_width} /Height {pixel_height} "
+                                f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode "
+                                f"/Length {len(jpeg_bytes)} >>").encode("ascii"), jpeg_bytes)
+        content = f"q {width:.2f} 0 0 {height:.2f} 0 0 cm /Im0 Do Q".encode("ascii")
+        self._object(content_id, f"<< /Length {len(content)} >>".encode("ascii"), content)
+        self._object(page_id, (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width:.2f} {height:.2f}] "
+                               f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+                               f"/Contents {content_id} 0 R >>").encode("ascii"))
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode("ascii"))
+        xref_offset = self.f.tell()
+        lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, self.next_id)]
+        lines.append(f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self.f.write("".join(lines).encode("ascii"))
+
+
+_HTML_HEAD = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+html, body {{ margin: 0; height: 100%; background: #000; overflow: hidden; }}
+.slide {{ display: none; width: 100vw; height: 100vh; object-fit: contain; }}
+.slide.current {{ display: block; }}
+</style>
+</head>
+<body>
+"""
+
+# →/Space/PageDown/클릭: 다음, ←/PageUp: 이전, Home/End, F: 전체 화면
+_HTML_TAIL = """<script>
+var slides = document.querySelectorAll(".slide"), current = 0;
+function show(i) {
+  slides[current].classList.remove("current");
+  current = Math.max(0, Math.min(slides.length - 1, i));
+  slides[current].classList.add("current");
+}
+document.addEventListener("keydown", function (e) {
+  if (["ArrowRight", "ArrowDown", " ", "PageDown"].indexOf(e.key) >= 0) show(current + 1);
+  else if (["ArrowLeft", "ArrowUp", "Backspace", "PageUp"].indexOf(e.key) >= 0) show(current - 1);
+  else if (e.key === "Home") show(0);
+  else if (e.key === "End") show(slides.length - 1);
+  else if (e.key === "f" || e.key === "F") document.documentElement.requestFullscreen();
+  else return;
+  e.preventDefault();
+});
+document.addEventListener("click", function () { show(current + 1); });
+if (slides.length) slides[0].classList.add("current");
+</script>
+</body>
+</html>
+"""
+
+
+def export_deck(verses, output_path, template_path, bg_image_path=None, max_chars=500,
+                progress_callback=None, cancel_event=None, fit_mode=False, pack_verses=False,
+                bg_dpi=DEFAULT_BG_DPI, width=EXPORT_WIDTH, workers=None):
+    """
+    구절 목록(또는 VerseRecord 생성기)을 output_path 확장자에 맞는 형식(PDF/PNG/HTML)으로 내보낸다.
+    나누기 옵션, progress_callback(처리한 구절 수, 전체 구절 수), cancel_event는 create_ppt와 같고,
+    PDF/HTML은 임시 파일에 쓴 뒤 교체한다.
+    workers: 슬라이드를 그릴 프로세스 수 (None이면 CPU 코어 수, 1이면 이 프로세스에서)
+    PNG는 임시 폴더에 다 그린 뒤 옮기고, 전에 같은 이름으로 내보낸 파일 중 이번에 안 쓴 번호는 지운다.
+    반환: {"slides": 슬라이드 수, "cached": False}
+    """
+    from core.ppt_generator import GenerationCancelled, _is_parallel, _peek, _total
+    from core.preview import ImageCache, get_preview_renderer
+
+    fmt = export_format(output_path)
+    if fmt is None:
+        raise ValueError(f"내보낼 수 없는 형식입니다: {output_path} (가능: {', '.join(EXPORT_FORMATS)})")
+    first, verses = _peek(verses)
+    parallel = _is_parallel([first] if first is not None else [])
+    total = _total(verses) if progress_callback else None
+    template_path = os.path.abspath(template_path)
+    bg_image_path = os.path.abspath(bg_image_path) if bg_image_path and os.path.exists(bg_image_path) else ""
+    # 상자 크기 계산은 여기서 한 번만 (그리는 프로세스는 나뉜 슬라이드만 받는다)
+    layout = get_preview_renderer(template_path, bg_image_path, width, bg_dpi, parallel, cache=ImageCache(0))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    render_args = (template_path, bg_image_path, bg_dpi, parallel, width, "PNG" if fmt == "png" else "JPEG")
+
+    done_verses = 0  # 나누기에 넘긴 구절 수
+    marks = deque()  # 나눈 슬라이드마다 그때까지 넘긴 구절 수 (그린 순서대로 꺼내 진행률로 알림)
+
+    def counted(items):
+        nonlocal done_verses
+        for item in items:
+            yield item
+            done_verses += 1
+
+    def pages():
+        for page in layout.iter_pages(counted(verses), max_chars, fit_mode, pack_verses):
+            marks.append(done_verses)
+            yield page
+
+    def rendered():
+        stream = _rendered_pages(pages(), render_args, workers)
+        try:
+            for done, data in enumerate(stream, 1):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise GenerationCancelled()
+                yield done, data
+                mark = marks.popleft()
+                if progress_callback and total:
+                    progress_callback(min(mark, total), total)
+        finally:
+            stream.close()  # 그리는 프로세스 정리
+
+    def finished(slides):
+        note("verses", done_verses)
+        note("slides", slides)
+        note("export", fmt)
+        if progress_callback and total:
+            progress_callback(total, total)
+        return {"slides": slides, "cached": False}
+
+    if fmt == "png":
+        out_dir = os.path.dirname(os.path.abspath(output_path))
+        tmp_dir = tempfile.mkdtemp(prefix=".b2p_export_", dir=out_dir)
+        try:
+            # 전체 장수를 알아야 번호 자릿수가 정해지므로, 임시 폴더에는 번호만으로 써 두었다가 옮기면서 이름을 붙인다
+            slides = 0
+            with measure("export_render"):
+                for slides, data in rendered():
+                    with open(os.path.join(tmp_dir, f"{slides}.png"), "wb") as f:
+                        f.write(data)
+            new_paths = [os.path.abspath(png_page_path(output_path, number, slides))
+                         for number in range(1, slides + 1)]
+            # 전에 이 이름으로 내보낸 파일(자릿수가 달랐던 것 포함) 중 이번에 안 쓰는 것만 지운다
+            keep = set(new_paths)
+            for path in png_page_paths(output_path):
+                if path not in keep:
+                    os.remove(path)
+            for number, path in enumerate(new_paths, 1):
+                os.replace(os.path.join(tmp_dir, f"{number}.png"), path)
+            _save_png_record(output_path, new_paths)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return finished(slides)
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    slides = 0
+    try:
+        with measure("export_render"), open(tmp_path, "wb") as f:
+            if fmt == "pdf":
+                writer = _PdfWriter(f, layout.slide_width / EMU_PER_PT, layout.slide_height / EMU_PER_PT)
+                for slides, data in rendered():
+                    writer.add_page(data, layout.width, layout.height)
+                writer.close()
+            else:
+                title = os.path.splitext(os.path.basename(output_path))[0]
+                f.write(_HTML_HEAD.format(title=title.replace("&", "&amp;").replace("<", "&lt;")).encode("utf-8"))
+                for slides, data in rendered():
+                    f.write(f'<img class="slide" alt="{slides}" src="data:image/jpeg;base64,'.encode("ascii"))
+                    f.write(base64.b64encode(data))
+                    f.write(b'">\n')
+                f.write(_HTML_TAIL.encode("utf-8"))
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return finished(slides)
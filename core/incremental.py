@@ -0,0 +1,94 @@
+"""
+증분 생성용 기록
+
+PPT를 만들 때마다 출력 파일별로 (템플릿/배경/옵션 서명, 슬라이드별 내용 키)를
+data/cache/builds/ 에 저장해 둔다. 같은 파일로 다시 만들 때 서명과 출력 파일이 그대로면
+내용이 같은 슬라이드는 이전 파일의 슬라이드 XML을 그대로 가져다 쓰고,
+바뀐 슬라이드만 새로 만든다. (슬라이드 XML은 템플릿과 텍스트만으로 정해지므로
+순서가 바뀐 슬라이드도 재사용할 수 있다)
+"""
+import os
+import json
+import hashlib
+
+BUILD_CACHE_DIR = os.path.join("data", "cache", "builds")
+MANIFEST_VERSION = 1
+
+
+def _file_stamp(path):
+    """[수정시각(ns), 크기] (파일이 없으면 None)"""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def manifest_path_for(output_path):
+    digest = hashlib.sha1(os.path.normcase(os.path.abspath(output_path)).encode("utf-8")).hexdigest()
+    return os.path.join(BUILD_CACHE_DIR, digest[:20] + ".json")
+
+
+def build_signature(template_path, bg_image_path, max_chars, fit_mode, pack_verses, bg_dpi=None, parallel=False):
+    """슬라이드 XML에 영향을 주는 입력들. 하나라도 바뀌면 전체를 다시 만든다."""
+    template = os.path.abspath(template_path)
+    bg = os.path.abspath(bg_image_path) if bg_image_path and os.path.exists(bg_image_path) else None
+    return {
+        "version": MANIFEST_VERSION,
+        "template": [template, _file_stamp(template)],
+        "background": [bg, _file_stamp(bg)] if bg else None,
+        "max_chars": max_chars,
+        "fit_mode": bool(fit_mode),
+        "pack_verses": bool(pack_verses),
+        "bg_dpi": bg_dpi,
+        "parallel": bool(parallel),
+    }
+
+
+def page_key(book, chapter, verse, text):
+    """슬라이드 한 장의 내용 키 (나란히 보기면 text는 역본별 튜플)"""
+    if isinstance(text, tuple):
+        text = "\x1e".join(text)
+    return hashlib.sha1(f"{book}\x1f{chapter}\x1f{verse}\x1f{text}".encode("utf-8")).hexdigest()
+
+
+def load_previous_pages(output_path, signature):
+    """
+    이전 생성 기록의 슬라이드 키 목록. 기록이 없거나, 서명이 다르거나,
+    그 뒤에 출력 파일이 바뀌었으면(PowerPoint에서 수정 등) None.
+    """
+    try:
+        with open(manifest_path_for(output_path), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("signature") != signature:
+        return None
+    if manifest.get("output") != _file_stamp(output_path):
+        return None
+    return manifest.get("pages")
+
+
+def save_build_manifest(output_path, signature, page_keys):
+    """출력 파일을 다 쓴 뒤에 호출 (출력 파일의 수정시각/크기를 함께 기록)"""
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    path = manifest_path_for(output_path)
+    manifest = {
+        "output_path": os.path.abspath(output_path),
+        "output": _file_stamp(output_path),
+        "signature": signature,
+        "pages": page_keys,
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def previous_positions(previous_keys):
+    """이전 슬라이드 내용 키 -> 그 내용이 처음 나오는 이전 슬라이드 번호(0부터)"""
+    previous = {}
+    for i, key in enumerate(previous_keys or ()):
+        previous.setdefault(key, i)
+    return previous
+
@@ -0,0 +1,149 @@
+"""
+PPT 생성 계측
+
+create_ppt, 슬라이드 생성, clone_slide, 배경 이미지 삽입(add_picture), 저장 등 단계별로
+호출 횟수와 소요 시간을 모아서 생성 한 번마다 JSON 보고서로 만든다.
+
+    with collect("주일.pptx") as report:
+        create_ppt(...)
+    print(report.to_json())
+
+collect()를 쓴 스레드에서만 기록한다. 수집 중인 곳이 없으면 계측된 함수는
+전역 정수 하나만 확인하고 원래 함수를 그대로 호출한다.
+"""
+import os
+import json
+import time
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+REPORT_LOG_PATH = os.path.join("data", "logs", "build_report.log")
+
+_local = threading.local()
+_active = 0  # 수집 중인 collect() 개수
+_active_lock = threading.Lock()
+
+
+class BuildReport:
+    """생성 한 번의 단계별 {호출 횟수, 합계/최대 시간}과 부가 정보"""
+
+    def __init__(self, name=None):
+        self.name = name
+        self.started_at = time.time()
+        self.seconds = None
+        self.stages = {}  # 단계 -> [횟수, 합계(초), 최대(초)]
+        self.info = {}
+
+    def record(self, stage, seconds):
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+    def note(self, key, value):
+        self.info[key] = value
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+            "seconds": round(self.seconds, 4) if self.seconds is not None else None,
+            "stages": {
+                stage: {"count": count, "total_seconds": round(total, 4), "max_seconds": round(peak, 4),
+                        "mean_seconds": round(total / count, 6)}
+                for stage, (count, total, peak) in self.stages.items()
+            },
+            "info": self.info,
+        }
+
+    def to_json(self, indent=None):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+
+def current_report():
+    """이 스레드에서 수집 중인 BuildReport (없으면 None)"""
+    if not _active:
+        return None
+    return getattr(_local, "report", None)
+
+
+@contextmanager
+def collect(name=None):
+    """with 블록 안에서 이 스레드의 계측 결과를 BuildReport로 모은다"""
+    global _active
+    report = BuildReport(name)
+    previous = getattr(_local, "report", None)
+    _local.report = report
+    with _active_lock:
+        _active += 1
+    start = time.perf_counter()
+    try:
+        yield report
+    finally:
+        report.seconds = time.perf_counter() - start
+        _local.report = previous
+        with _active_lock:
+            _active -= 1
+
+
+def instrument(stage):
+    """함수 호출을 stage 이름으로 계측하는 데코레이터"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            report = current_report()
+            if report is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                report.record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def measure(stage):
+    """함수 단위가 아닌 구간 계측 (생성 한 번에 몇 번만 실행되는 곳에 사용)"""
+    report = current_report()
+    if report is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        report.record(stage, time.perf_counter() - start)
+
+
+def note(key, value):
+    """수집 중이면 보고서에 부가 정보 기록"""
+    report = current_report()
+    if report is not None:
+        report.note(key, value)
+
+
+_report_logger = None
+
+
+def write_report_log(report, path=REPORT_LOG_PATH, max_bytes=1024 * 1024, backup_count=3):
+    """보고서를 JSON 한 줄로 로그 파일에 추가 (max_bytes를 넘으면 .1, .2 ... 로 넘김)"""
+    global _report_logger
+    if _report_logger is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("b2p.build_report")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        _report_logger = logger
+    _report_logger.info(report.to_json())
@@ -1,99 +1,95 @@
 from pptx import Presentation
-from pptx.util import Pt, Inches
-from pptx.enum.text import PP_ALIGN
 import os
-import json
-import shutil
 from copy import deepcopy
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import platform
-import subprocess
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
-import re
-
-BIBLE_DATA_PATH = os.path.join("data", "cache", "bible_data.json")
-
-# 성경책 약칭 테이블 (약칭: 정식이름)
-BIBLE_BOOK_ABBR = {
-    "창": "창세기", "출": "출애굽기", "레": "레위기", "민": "민수기", "신": "신명기", "수": "여호수아", "삿": "사사기",
-    "룻": "룻기", "삼상": "사무엘상", "삼하": "사무엘하", "왕상": "열왕기상", "왕하": "열왕기하", "대상": "역대상", "대하": "역대하",
-    "스": "에스라", "느": "느헤미야", "에": "에스더", "욥": "욥기", "시": "시편", "잠": "잠언", "전": "전도서", "아": "아가",
-    "사": "이사야", "렘": "예레미야", "애": "예레미야애가", "겔": "에스겔", "단": "다니엘", "호": "호세아", "욜": "요엘",
-    "암": "아모스", "옵": "오바댜", "욘": "요나", "미": "미가", "나": "나훔", "합": "하박국", "습": "스바냐", "학": "학개",
-    "슥": "스가랴", "말": "말라기", "마": "마태복음", "막": "마가복음", "눅": "누가복음", "요": "요한복음",
-    "행": "사도행전", "롬": "로마서", "고전": "고린도전서", "고후": "고린도후서", "갈": "갈라디아서", "엡": "에베소서",
-    "빌": "빌립보서", "골": "골로새서", "살전": "데살로니가전서", "살후": "데살로니가후서", "딤전": "디모데전서", "딤후": "디모데후서",
-    "딛": "디도서", "몬": "빌레몬서", "히": "히브리서", "약": "야고보서", "벧전": "베드로전서", "벧후": "베드로후서",
-    "요일": "요한1서", "요이": "요한2서", "요삼": "요한3서", "유": "유다서", "계": "요한계시록"
-}
-
-def load_bible_data():
-    with open(BIBLE_DATA_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+import io
+import time
+import zipfile
+import threading
+from itertools import chain, zip_longest
+from concurrent.futures import ProcessPoolExecutor
+from pptx.oxml.ns import qn
+from core.bible_store import VerseRecord, load_bible_data
+from core.text_layout import split_text, TextBoxMetrics
+from pptx.parts.slide import SlidePart
+from core.pptx_stream import StreamingDeckWriter, get_slide_appender
+from core.reference import DEFAULT_VERSION, get_verse_index, parse_references
+from core.instrument import collect, instrument, measure, note
+from core.incremental import build_signature, load_previous_pages, page_key, previous_positions, save_build_manifest
+from core.background import DEFAULT_BG_DPI, optimized_background
+from core.deck_cache import deck_key, fetch_deck, store_deck
+from core.export import export_deck, export_format
 
 def parse_selection(selection_str, bible_data, version):
     """
     예시 입력: '창세기1:1-3,2:1-2; 출애굽기3:1-5' 또는 '창1:1-3,2:1-2; 왕상3:1-5'
-    또는 '창4:1-3,2:1-2; 왕상3:1-5' (공백 없이도 인식)
-    여러 권, 여러 범위 지원. 반환: [(책, 장, [절, ...]), ...]
+    또는 '창1:26-2:3' (장 넘김), '창1:26-' (장 끝까지), '시23' (장 전체), '요3:16,18', '계시록1:1' (다른 이름)
+    여러 권, 여러 범위 지원. 반환: [(책, 장, 절 번호 목록), ...] (장마다 한 항목, 연속된 절은 range)
+    잘못된 책/장/절은 위치 정보와 함께 SelectionError를 발생시킨다.
+    version이 역본 목록이면 첫 번째 역본 기준으로 해석한다.
     """
-    result = []
-    for book_part in selection_str.split(";"):
-        book_part = book_part.strip()
-        if not book_part:
-            continue
-        
-        # 성경이름과 나머지 부분을 분리
-        # 숫자가 나오는 첫 번째 위치를 찾아서 분리
-        match = re.search(r'(\d+:)', book_part)
-        if not match:
-            continue
-        
-        # 숫자 앞까지가 성경이름, 숫자부터가 장절 정보
-        split_pos = match.start()
-        book_name = book_part[:split_pos].strip()
-        rest = book_part[split_pos:]
-        
-        # 약칭이면 fullname으로 변환
-        if book_name in BIBLE_BOOK_ABBR:
-            book_name_full = BIBLE_BOOK_ABBR[book_name]
-        else:
-            book_name_full = book_name
-            
-        for chapter_range in rest.split(","):
-            chapter_range = chapter_range.strip()
-            if not chapter_range:
-                continue
-            if ":" not in chapter_range:
-                continue
-            chapter, verses = chapter_range.split(":")
-            chapter = int(chapter)
-            for v in verses.split(","):
-                v = v.strip()
-                if not v:
-                    continue
-                if "-" in v:
-                    start, end = map(int, v.split("-"))
-                    verse_list = list(range(start, end+1))
-                else:
-                    verse_list = [int(v)]
-                result.append((book_name_full, chapter, verse_list))
-    return result
+    version = _version_list(version)[0]
+    _check_versions(bible_data, [version])
+    index = get_verse_index(bible_data, version)
+    return parse_references(selection_str, index)
 
-def get_verses(bible_data, version, selections):
-    version = "개역개정"  # 항상 개역개정만 사용
-    verses = []
+def _version_list(version):
+    if not version:
+        return [DEFAULT_VERSION]
+    if isinstance(version, str):
+        return [version]
+    return list(version)
+
+def _check_versions(bible_data, versions):
+    available = bible_data.versions()
+    for version in versions:
+        if version not in available:
+            raise ValueError(f"성경 데이터에 '{version}' 역본이 없습니다. (있는 역본: {', '.join(available)})")
+
+def iter_verses(bible_data, version, selections):
+    """
+    선택한 구절을 하나씩 VerseRecord로 내준다. 본문은 읽지 않고, 레코드의 text를 쓸 때 저장소에서 가져온다.
+    레코드는 (책, 장, 절, 본문) 튜플처럼 풀 수 있어서 get_verses 결과 대신 그대로 쓸 수 있다.
+    version에 역본을 두 개 이상(예: ["개역개정", "KJV"]) 주면 본문은 (역본1 본문, 역본2 본문, ...) 튜플 (나란히 보기용).
+    첫 번째 역본에 없는 절은 빼고, 나머지 역본에 없는 절은 빈 문자열로 둔다.
+    """
+    versions = tuple(_version_list(version))
+    _check_versions(bible_data, versions)
+    index = get_verse_index(bible_data, versions[0])
     for book, chapter, verse_list in selections:
         for verse in verse_list:
-            try:
-                text = bible_data[version][book][str(chapter)][str(verse)]
-            except KeyError:
-                continue
-            verses.append((book, chapter, verse, text))
-    return verses
+            if index.has_verse(book, chapter, verse):
+                yield VerseRecord(bible_data, versions, book, chapter, verse)
+
+def get_verses(bible_data, version, selections):
+    """선택한 구절의 [(책, 장, 절, 본문), ...] (iter_verses 결과를 본문까지 읽어서 목록으로)"""
+    return [tuple(record) for record in iter_verses(bible_data, version, selections)]
+
+class VerseSelection:
+    """
+    iter_verses와 같은 구절을 내주지만 여러 번 훑을 수 있는 선택 결과 (create_ppt/export_deck/미리보기에 그대로 넘긴다).
+    구절을 목록으로 모으지 않고, 훑을 때마다 iter_verses로 레코드를 새로 만든다.
+    len()은 진행률에 전체 구절 수가 필요할 때만 본문 없이 한 번 세고, bool()은 첫 구절만 확인한다.
+    """
+    def __init__(self, bible_data, version, selections):
+        self.bible_data = bible_data
+        self.version = version
+        self.selections = selections
+        self._count = None
 
+    def __iter__(self):
+        return iter_verses(self.bible_data, self.version, self.selections)
+
+    def __len__(self):
+        if self._count is None:
+            self._count = sum(1 for _ in self)
+        return self._count
+
+    def __bool__(self):
+        return next(iter(self), None) is not None
+
+@instrument("clone_slide")
 def clone_slide(prs, slide):
     slide_layout = slide.slide_layout
     new_slide = prs.slides.add_slide(slide_layout)
@@ -104,9 +100,31 @@ def clone_slide(prs, slide):
     # 샘플 슬라이드의 모든 요소 복제
     for shape in slide.shapes:
         el = deepcopy(shape._element)
+        _relink_element(el, slide.part, new_slide.part)
         new_slide.shapes._spTree.insert_element_before(el, 'p:extLst')
     return new_slide
 
+# 다른 파트(이미지 등)를 가리키는 관계 ID 속성
+_REL_ATTRS = (qn("r:embed"), qn("r:link"), qn("r:id"))
+
+def _relink_element(el, src_part, dst_part):
+    """
+    복제한 요소의 관계 ID(r:embed 등)를 새 슬라이드 기준으로 바꿔준다.
+    이미지 파일을 다시 읽지 않고 이미 등록된 같은 이미지 파트를 참조하므로,
+    배경 이미지는 PPT 안에 한 번만 저장된다.
+    """
+    for node in el.iter():
+        for attr in _REL_ATTRS:
+            rId = node.get(attr)
+            if not rId or rId not in src_part.rels:
+                continue
+            rel = src_part.rels[rId]
+            if rel.is_external:
+                new_rId = dst_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+            else:
+                new_rId = dst_part.relate_to(rel.target_part, rel.reltype)
+            node.set(attr, new_rId)
+
 def set_text_preserve_style(shape, new_text):
     """텍스트박스의 스타일을 유지하며 텍스트만 변경"""
     tf = shape.text_frame
@@ -124,6 +142,119 @@ def set_text_preserve_style(shape, new_text):
         # 스타일이 없는 경우 fallback
         shape.text = new_text
 
+class SlidePrototype:
+    """
+    템플릿 슬라이드를 한 번만 분석해 둔 슬라이드 원형.
+    TitleBox/VerseBox/ContentBox의 텍스트(a:t) 위치를 미리 찾아두므로,
+    새 슬라이드마다 도형 트리 한 번 복제 + 텍스트 3개 대입만 하면 된다.
+    """
+
+    TEXT_BOX_NAMES = ("TitleBox", "VerseBox", "ContentBox", "ContentBox2")
+
+    def __init__(self, template_slide):
+        self.layout = template_slide.slide_layout
+        self._tree = deepcopy(template_slide.shapes._spTree)
+        # 텍스트박스 이름 -> [a:t 요소까지의 자식 인덱스 경로, ...]
+        self._text_paths = {name: [] for name in self.TEXT_BOX_NAMES}
+        for shape_el in self._tree:
+            name = self._shape_name(shape_el)
+            if name not in self._text_paths:
+                continue
+            t = self._prepare_text_run(shape_el)
+            if t is not None:
+                self._text_paths[name].append(self._path_of(t))
+        # (경로, 속성, 관계) : 이미지 등 다른 파트를 참조하는 요소
+        self._rel_refs = []
+        src_part = template_slide.part
+        for node in self._tree.iter():
+            for attr in _REL_ATTRS:
+                rId = node.get(attr)
+                if rId and rId in src_part.rels:
+                    self._rel_refs.append((self._path_of(node), attr, src_part.rels[rId]))
+
+    @staticmethod
+    def _shape_name(shape_el):
+        nv = shape_el.find(qn("p:nvSpPr"))
+        if nv is None:
+            return None
+        c_nv_pr = nv.find(qn("p:cNvPr"))
+        return c_nv_pr.get("name") if c_nv_pr is not None else None
+
+    @staticmethod
+    def _prepare_text_run(shape_el):
+        """set_text_preserve_style와 같은 규칙으로 첫 run만 남기고 그 a:t 요소를 반환"""
+        tx_body = shape_el.find(qn("p:txBody"))
+        if tx_body is None:
+            return None
+        paragraphs = tx_body.findall(qn("a:p"))
+        if not paragraphs:
+            return None
+        p = paragraphs[0]
+        # 나머지 paragraph 삭제
+        for extra_p in paragraphs[1:]:
+            tx_body.remove(extra_p)
+        runs = p.findall(qn("a:r"))
+        # 나머지 run 삭제
+        for extra_r in runs[1:]:
+            p.remove(extra_r)
+        r = runs[0] if runs else p.add_r()  # 스타일이 없는 경우 fallback
+        return r.find(qn("a:t"))
+
+    def _path_of(self, node):
+        path = []
+        while node is not self._tree:
+            parent = node.getparent()
+            path.append(parent.index(node))
+            node = parent
+        return tuple(reversed(path))
+
+    @staticmethod
+    def _resolve(tree, path):
+        node = tree
+        for i in path:
+            node = node[i]
+        return node
+
+    def text_box_metrics(self, name, slide_height=None):
+        """이름이 name인 텍스트박스의 위치/크기/글꼴 정보 (TextBoxMetrics)"""
+        for shape_el in self._tree:
+            if self._shape_name(shape_el) == name:
+                return TextBoxMetrics.from_shape_element(shape_el, slide_height)
+        return None
+
+    def relate(self, part):
+        """이미지 등 참조 관계를 part(슬라이드 파트)에 연결하고 새 rId 목록 반환 (항상 같은 순서)"""
+        rIds = []
+        for _, _, rel in self._rel_refs:
+            if rel.is_external:
+                rIds.append(part.relate_to(rel.target_ref, rel.reltype, is_external=True))
+            else:
+                rIds.append(part.relate_to(rel.target_part, rel.reltype))
+        return rIds
+
+    def build_tree(self, part, texts):
+        """part(슬라이드 파트) 기준으로 관계를 연결하고 텍스트를 채운 도형 트리(p:spTree) 생성"""
+        tree = deepcopy(self._tree)
+        for (path, attr, _), new_rId in zip(self._rel_refs, self.relate(part)):
+            self._resolve(tree, path).set(attr, new_rId)
+        for name, text in texts.items():
+            for path in self._text_paths.get(name, ()):
+                self._resolve(tree, path).text = text
+        return tree
+
+    def add_slide(self, prs, texts):
+        """texts: {텍스트박스 이름: 텍스트} 로 새 슬라이드를 만들어 덱 끝에 추가"""
+        # 레이아웃 placeholder 복제는 어차피 지워지므로 생략하고 빈 슬라이드만 만든다
+        appender = get_slide_appender(prs)
+        slide_part = SlidePart.new(appender.next_partname(), prs.part.package, self.layout.part)
+        appender.append(slide_part)
+        slide = slide_part.slide
+
+        tree = self.build_tree(slide_part, texts)
+        c_sld = slide._element.cSld
+        c_sld.replace(c_sld.spTree, tree)
+        return slide
+
 def copy_slide_background(src_slide, dst_slide):
     src_fill = src_slide.background.fill
     dst_fill = dst_slide.background.fill
@@ -139,10 +270,64 @@ def copy_slide_background(src_slide, dst_slide):
         print("경고: 템플릿 배경이 패턴입니다. 현재는 단색만 복제합니다.")
     # 기타 fill type은 필요시 추가 구현
 
-def create_ppt(verses, output_path, template_path, bg_image_path=None, max_chars=500):
-    shutil.copy(template_path, output_path)
-    prs = Presentation(output_path)
+class PreparedTemplate:
+    """
+    배경 처리와 텍스트박스 검증까지 끝낸 템플릿.
+    준비된 첫 슬라이드만 남긴 pptx를 바이트로 보관하므로, 매 생성마다
+    배경 이미지를 다시 읽거나 검증할 필요 없이 이 상태에서 바로 시작한다.
+    """
+
+    def __init__(self, blob):
+        self.blob = blob
+
+    def open(self):
+        """새 Presentation과 SlidePrototype을 반환 (샘플 슬라이드는 삭제된 상태)"""
+        prs = Presentation(io.BytesIO(self.blob))
+        prototype = SlidePrototype(prs.slides[0])
+        _remove_all_slides(prs)
+        return prs, prototype
+
+def _remove_all_slides(prs):
+    """기존 슬라이드(샘플)는 모두 삭제"""
+    while len(prs.slides) > 0:
+        rId = prs.slides._sldIdLst[0].rId
+        prs.part.drop_rel(rId)
+        del prs.slides._sldIdLst[0]
+
+# 나란히 보기에서 ContentBox를 나눌 때 두 상자 사이 간격 (원래 상자 폭 대비)
+PARALLEL_GAP_RATIO = 0.04
+
+def _add_parallel_box(template_slide):
+    """
+    나란히 보기용 두 번째 본문 상자(ContentBox2) 준비.
+    템플릿에 이미 있으면 그대로 쓰고, 없으면 ContentBox를 좌우로 나눠 오른쪽을 ContentBox2로 만든다.
+    """
+    shapes = {shape.name: shape for shape in template_slide.shapes if shape.has_text_frame}
+    box = shapes.get("ContentBox")
+    if "ContentBox2" in shapes or box is None:
+        return
+    gap = int(box.width * PARALLEL_GAP_RATIO)
+    half = (box.width - gap) // 2
+    el = deepcopy(box._element)
+    c_nv_pr = el.find(qn("p:nvSpPr")).find(qn("p:cNvPr"))
+    c_nv_pr.set("id", str(template_slide.shapes._next_shape_id))
+    c_nv_pr.set("name", "ContentBox2")
+    el.x = box.left + half + gap
+    el.cx = half
+    box.width = half
+    box._element.addnext(el)
+
+@instrument("prepare_template")
+def prepare_template(template_path, bg_image_path=None, bg_dpi=DEFAULT_BG_DPI, parallel=False):
+    """
+    템플릿을 열어 배경을 준비하고 필수 텍스트박스를 확인한 PreparedTemplate 생성.
+    배경 이미지는 슬라이드 크기 x bg_dpi 로 줄인 캐시 이미지를 넣는다 (bg_dpi가 0이면 원본).
+    parallel이면 두 역본을 나란히 넣을 ContentBox2도 준비한다.
+    """
+    prs = Presentation(template_path)
     template_slide = prs.slides[0]
+    if parallel:
+        _add_parallel_box(template_slide)
 
     if bg_image_path and os.path.exists(bg_image_path):
         # 배경 투명 + 이미지 첨부
@@ -150,7 +335,10 @@ def create_ppt(verses, output_path, template_path, bg_image_path=None, max_chars
         template_slide.background.fill.transparency = 1.0
         slide_width = prs.slide_width
         slide_height = prs.slide_height
-        pic = template_slide.shapes.add_picture(bg_image_path, 0, 0, slide_width, slide_height)
+        with measure("bg_optimize"):
+            bg_file = optimized_background(bg_image_path, slide_width, slide_height, bg_dpi)
+        with measure("add_picture"):
+            pic = template_slide.shapes.add_picture(bg_file, 0, 0, slide_width, slide_height)
         template_slide.shapes._spTree.remove(pic._element)
         template_slide.shapes._spTree.insert(2, pic._element)
         print("배경 이미지가 존재하는 템플릿으로 생성!!!")
@@ -169,76 +357,447 @@ def create_ppt(verses, output_path, template_path, bg_image_path=None, max_chars
         template_slide.shapes._spTree.insert(2, shape._element)
         print("배경 이미지가 없어요 검정배경으로 !!!")
 
-    # 기존 슬라이드(샘플)는 모두 삭제
-    while len(prs.slides) > 0:
-        rId = prs.slides._sldIdLst[0].rId
-        prs.part.drop_rel(rId)
-        del prs.slides._sldIdLst[0]
-
     required_names = {"TitleBox", "VerseBox", "ContentBox"}
+    if parallel:
+        required_names.add("ContentBox2")
     actual_names = {getattr(shape, "name", "") for shape in template_slide.shapes if shape.has_text_frame}
     missing = required_names - actual_names
     if missing:
         raise Exception(f"템플릿에 다음 텍스트박스 이름이 없습니다: {missing}")
 
-    # 입력 순서대로 각 구절별로 슬라이드 생성 (중복 제거하지 않음)
-    for book, chapter, verse, text in verses:
-        # 텍스트가 최대 글자 수를 초과하면 분할
-        if len(text) <= max_chars:
-            # 한 슬라이드에 모두 표시
-            _create_slide(prs, template_slide, book, chapter, verse, text, bg_image_path)
-        else:
-            # 여러 슬라이드로 분할
-            _create_split_slides(prs, template_slide, book, chapter, verse, text, max_chars, bg_image_path)
-    
-    prs.save(output_path)
-
-def _create_slide(prs, template_slide, book, chapter, verse, text, bg_image_path):
-    """단일 슬라이드 생성"""
-    slide = clone_slide(prs, template_slide)
-    
-    # 배경 이미지 설정
-    if bg_image_path and os.path.exists(bg_image_path):
-        slide_width = prs.slide_width
-        slide_height = prs.slide_height
-        pic = slide.shapes.add_picture(bg_image_path, 0, 0, slide_width, slide_height)
-        slide.shapes._spTree.remove(pic._element)
-        slide.shapes._spTree.insert(2, pic._element)
-    
-    # 텍스트 설정
-    name_to_text = {
+    # 준비된 첫 슬라이드만 남기고 나머지 샘플 슬라이드는 삭제
+    while len(prs.slides) > 1:
+        rId = prs.slides._sldIdLst[1].rId
+        prs.part.drop_rel(rId)
+        del prs.slides._sldIdLst[1]
+
+    buf = io.BytesIO()
+    prs.save(buf)
+    return PreparedTemplate(buf.getvalue())
+
+# (템플릿 경로, 수정시각, 배경 경로, 배경 수정시각, 배경 DPI, 나란히 보기) -> PreparedTemplate
+_template_cache = {}
+_template_cache_lock = threading.Lock()
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def get_prepared_template(template_path, bg_image_path=None, bg_dpi=DEFAULT_BG_DPI, parallel=False):
+    """
+    캐시된 PreparedTemplate 반환. 템플릿이나 배경 이미지 파일이 바뀌면(수정시각) 다시 준비한다.
+    파일 경로가 아닌 스트림이 들어오면 캐시하지 않는다.
+    나란히 보기용과 일반용은 따로 캐시한다.
+    """
+    if not isinstance(template_path, str):
+        return prepare_template(template_path, bg_image_path, bg_dpi, parallel)
+    path = os.path.abspath(template_path)
+    bg_path = os.path.abspath(bg_image_path) if bg_image_path and os.path.exists(bg_image_path) else ""
+    parallel = bool(parallel)
+    key = (path, _mtime_ns(path), bg_path, _mtime_ns(bg_path) if bg_path else None, bg_dpi, parallel)
+    with _template_cache_lock:
+        prepared = _template_cache.get(key)
+        note("template_cache", "hit" if prepared is not None else "miss")
+        if prepared is None:
+            prepared = prepare_template(path, bg_path, bg_dpi, parallel)
+            # 같은 템플릿의 이전 버전은 버린다
+            for old_key in [k for k in _template_cache if k[0] == path and k[5] == parallel]:
+                del _template_cache[old_key]
+            _template_cache[key] = prepared
+        return prepared
+
+def clear_template_cache(template_path=None):
+    """템플릿 캐시 비우기 (template_path를 주면 해당 템플릿만)"""
+    with _template_cache_lock:
+        if template_path is None:
+            _template_cache.clear()
+            return
+        path = os.path.abspath(template_path)
+        for key in [k for k in _template_cache if k[0] == path]:
+            del _template_cache[key]
+
+class GenerationCancelled(Exception):
+    """사용자가 PPT 생성을 취소함"""
+
+
+@instrument("create_ppt")
+def create_ppt(verses, output_path, template_path, bg_image_path=None, max_chars=500,
+               progress_callback=None, cancel_event=None, fit_mode=False, pack_verses=False,
+               streaming=False, incremental=False, bg_dpi=DEFAULT_BG_DPI, use_cache=False):
+    """
+    구절 목록(get_verses 결과, VerseSelection, 또는 iter_verses의 VerseRecord 생성기)으로 PPT 생성.
+    progress_callback(처리한 구절 수, 전체 구절 수)로 진행상황을 알리고 (구절 수를 셀 수 있는 목록/VerseSelection일 때),
+    cancel_event(threading.Event)가 설정되면 GenerationCancelled를 발생시킨다.
+    결과는 임시 파일에 저장한 뒤 교체하므로, 취소/오류 시 반쯤 쓰인 파일이 남지 않는다.
+    fit_mode면 max_chars 대신 ContentBox 크기/글꼴로 한 슬라이드 분량을 정하고,
+    pack_verses면 짧은 연속 구절을 한 슬라이드에 묶는다.
+    streaming이면 슬라이드를 만드는 즉시 파일에 기록해서, 덱 길이와 상관없이 메모리를 적게 쓴다.
+    incremental이면 같은 출력 파일의 이전 생성 기록과 비교해서 내용이 같은 슬라이드는
+    기존 파일의 슬라이드를 그대로 가져오고 바뀐 슬라이드만 새로 만든다.
+    배경 이미지는 슬라이드 크기 x bg_dpi 로 줄여서 넣는다 (0이면 원본 그대로).
+    구절 본문이 (역본1, 역본2) 튜플이면(get_verses에 역본 두 개) ContentBox/ContentBox2에 나란히 넣는다.
+    use_cache면 구절/템플릿/배경/옵션(fit_mode면 폭을 잰 글꼴까지)이 모두 같은 PPT를 전에 만든 적이 있을 때
+    프로그램 폴더의 캐시에서 복사만 한다. (기본은 끔: 프로그램 설정의 deck_cache를 켠 GUI/명령줄/서버만 사용)
+    (캐시 키를 먼저 구해야 하므로 VerseSelection처럼 여러 번 훑을 수 있는 입력은 키를 구할 때와 만들 때 두 번 훑고,
+    한 번만 훑을 수 있는 생성기만 목록으로 모은다. VerseRecord 키는 본문 대신 구절 위치로 만든다)
+    구절은 한 번만 훑는다: 나눈 슬라이드를 모아 두지 않고 나오는 대로 바로 만들고, 슬라이드별 내용 키만 남긴다.
+    반환: {"slides": 슬라이드 수, "cached": 캐시에서 복사했는지}
+    """
+    first, verses = _peek(verses)
+    parallel = _is_parallel([first] if first is not None else [])
+    opened = None
+    cache_key = None
+    if use_cache and isinstance(template_path, str):
+        if iter(verses) is verses:
+            verses = list(verses)
+        font_files = ()
+        if fit_mode:
+            # 글꼴이 바뀌면 나누는 위치도 바뀌므로, 템플릿을 먼저 열어 실제로 폭을 잴 글꼴 파일을 키에 넣는다
+            opened = _open_template(template_path, bg_image_path, bg_dpi, parallel, fit_mode)
+            font_files = _fit_font_files(opened[2])
+        with measure("deck_cache"):
+            cache_key = deck_key(verses, template_path, bg_image_path, max_chars,
+                                 {"fit_mode": bool(fit_mode), "pack_verses": bool(pack_verses),
+                                  "bg_dpi": bg_dpi, "parallel": parallel}, font_files)
+            cached = fetch_deck(cache_key, output_path)
+        note("deck_cache", "hit" if cached is not None else "miss")
+        if cached is not None:
+            note("verses", len(verses))
+            note("slides", cached["slides"])
+            if incremental:
+                signature = build_signature(template_path, bg_image_path, max_chars, fit_mode, pack_verses,
+                                            bg_dpi, parallel)
+                save_build_manifest(output_path, signature, cached["pages"])
+            if progress_callback:
+                progress_callback(len(verses), len(verses))
+            return {"slides": cached["slides"], "cached": True}
+    total = _total(verses) if progress_callback else None
+
+    prs, prototype, fit = opened or _open_template(template_path, bg_image_path, bg_dpi, parallel, fit_mode)
+
+    signature = None
+    previous = {}  # 이전 슬라이드 내용 키 -> 이전 파일의 슬라이드 번호(0부터)
+    old_zip = None
+    if incremental:
+        signature = build_signature(template_path, bg_image_path, max_chars, fit_mode, pack_verses, bg_dpi,
+                                    parallel)
+        previous_keys = load_previous_pages(output_path, signature)
+        if previous_keys is not None:
+            previous = previous_positions(previous_keys)
+            old_zip = zipfile.ZipFile(output_path)
+            streaming = True  # 기존 파일의 항목을 그대로 복사하는 것은 스트리밍 저장기에서만 가능
+
+    done = 0  # 처리한 구절 수
+
+    def counted(items):
+        nonlocal done
+        for item in items:
+            yield item
+            done += 1
+
+    page_keys = []
+    reused = 0
+    tmp_path = output_path + ".tmp"
+    writer = StreamingDeckWriter(prs, prototype, tmp_path, old_zip) if streaming else None
+    try:
+        # 입력 순서대로 각 구절별로 슬라이드 생성 (중복 제거하지 않음)
+        for book, chapter, verse, text in _paginate(counted(verses), max_chars, fit, pack_verses):
+            if cancel_event is not None and cancel_event.is_set():
+                raise GenerationCancelled("PPT 생성이 취소되었습니다.")
+            key = page_key(book, chapter, verse, text)
+            page_keys.append(key)
+            old_index = previous.get(key)
+            if old_index is not None:
+                writer.add_reused_slide(f"ppt/slides/slide{old_index + 1}.xml")
+                reused += 1
+            elif writer is not None:
+                writer.add_slide(_slide_texts(book, chapter, verse, text))
+            else:
+                _create_slide(prs, prototype, book, chapter, verse, text)
+            if progress_callback and total:
+                progress_callback(min(done, total), total)
+
+        if cancel_event is not None and cancel_event.is_set():
+            raise GenerationCancelled("PPT 생성이 취소되었습니다.")
+        note("reused_slides", reused)
+        note("verses", done)
+        note("slides", len(page_keys))
+        note("options", {"max_chars": max_chars, "fit_mode": fit_mode, "pack_verses": pack_verses,
+                         "streaming": streaming, "background": bool(bg_image_path), "bg_dpi": bg_dpi,
+                         "parallel": parallel})
+        with measure("save"):
+            if writer is not None:
+                writer.close()
+                writer = None
+            else:
+                prs.save(tmp_path)
+        if old_zip is not None:
+            old_zip.close()  # Windows에서는 열려 있는 파일을 교체할 수 없음
+            old_zip = None
+        os.replace(tmp_path, output_path)
+        if progress_callback and total:
+            progress_callback(total, total)
+        if incremental:
+            save_build_manifest(output_path, signature, page_keys)
+        if cache_key is not None:
+            with measure("deck_cache"):
+                store_deck(cache_key, output_path, page_keys)
+        return {"slides": len(page_keys), "cached": False}
+    finally:
+        if writer is not None:
+            writer.abort()
+        if old_zip is not None:
+            old_zip.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _open_template(template_path, bg_image_path, bg_dpi, parallel, fit_mode):
+    """준비된 템플릿을 열어 (prs, prototype, fit) 반환. fit은 fit_mode일 때 본문 상자 정보 (나란히 보기면 두 상자)"""
+    prepared = get_prepared_template(template_path, bg_image_path, bg_dpi, parallel)
+    with measure("template_open"):
+        prs, prototype = prepared.open()
+    fit = None
+    if fit_mode:
+        fit = prototype.text_box_metrics("ContentBox", prs.slide_height)
+        if parallel:
+            fit = (fit, prototype.text_box_metrics("ContentBox2", prs.slide_height))
+    return prs, prototype, fit
+
+def _fit_font_files(fit):
+    """상자 크기에 맞춰 나눌 때 폭을 재는 글꼴 파일 경로들 (상자 순서대로)"""
+    boxes = fit if isinstance(fit, tuple) else (fit,)
+    return [box.font_file if box is not None else None for box in boxes]
+
+def _peek(verses):
+    """
+    (첫 구절 또는 None, 첫 구절을 포함한 전체). 목록은 그대로, 여러 번 훑을 수 있는 것(VerseSelection)은
+    첫 구절만 따로 보고 그대로, 생성기는 첫 구절만 미리 읽어 다시 이어 붙인다
+    """
+    if isinstance(verses, (list, tuple)):
+        return (verses[0] if verses else None), verses
+    stream = iter(verses)
+    first = next(stream, None)
+    if stream is not verses:
+        return first, verses
+    return first, (chain((first,), stream) if first is not None else [])
+
+def _total(verses):
+    """전체 구절 수 (len()을 쓸 수 있을 때만, 생성기면 None)"""
+    return len(verses) if hasattr(verses, "__len__") else None
+
+def _is_parallel(verses):
+    """본문이 역본별 튜플인 나란히 보기 구절 목록인지"""
+    if not verses:
+        return False
+    first = verses[0]
+    if isinstance(first, VerseRecord):
+        count = len(first.versions)  # 본문을 읽지 않고 역본 수로 판단
+    else:
+        count = len(first[3]) if isinstance(first[3], tuple) else 1
+    if count == 1:
+        return False
+    if count > 2:
+        raise ValueError("나란히 보기는 역본 두 개까지만 지원합니다.")
+    return True
+
+def _slide_texts(book, chapter, verse, text):
+    texts = {
         "TitleBox": f"{book} {chapter}장",
         "VerseBox": str(verse),
-        "ContentBox": text
     }
-    
-    for shape in slide.shapes:
-        if not shape.has_text_frame:
-            continue
-        shape_name = getattr(shape, "name", "")
-        if shape_name in name_to_text:
-            set_text_preserve_style(shape, name_to_text[shape_name])
-
-def _create_split_slides(prs, template_slide, book, chapter, verse, full_text, max_chars, bg_image_path):
-    """긴 텍스트를 여러 슬라이드로 분할"""
-    words = full_text.split()
-    current_text = ""
-    slide_count = 0
-    
+    if isinstance(text, tuple):
+        texts["ContentBox"], texts["ContentBox2"] = text
+    else:
+        texts["ContentBox"] = text
+    return texts
+
+@instrument("create_slide")
+def _create_slide(prs, prototype, book, chapter, verse, text):
+    """단일 슬라이드 생성 (배경 이미지는 템플릿 슬라이드에서 복제되며 같은 이미지 파트를 공유)"""
+    return prototype.add_slide(prs, _slide_texts(book, chapter, verse, text))
+
+def _text_rules(max_chars, fit=None):
+    """한 상자의 (들어가는지 확인, 나누기) 함수"""
+    if fit is not None:
+        return fit.fits, fit.split
+    return (lambda text: len(text) <= max_chars), (lambda text: split_text(text, max_chars))
+
+def _split_even(text, count):
+    """텍스트를 단어 단위로 길이가 비슷한 count개 조각으로 (나란히 보기에서 조각 수 맞추기)"""
+    words = text.split()
+    total = sum(len(word) + 1 for word in words)
+    chunks = [[] for _ in range(count)]
+    done = 0
     for word in words:
-        test_text = current_text + " " + word if current_text else word
-        if len(test_text) <= max_chars:
-            current_text = test_text
+        chunks[min(count - 1, done * count // max(1, total))].append(word)
+        done += len(word) + 1
+    return [" ".join(chunk) for chunk in chunks]
+
+def _parallel_rules(max_chars, fits_boxes):
+    """
+    나란히 보기용 (들어가는지 확인, 나누기) 함수. 본문은 (역본1, 역본2) 튜플.
+    두 역본 중 하나라도 넘치면 나누고, 짧은 쪽도 같은 수로 고르게 나눠 같은 내용끼리 마주 보게 한다.
+    """
+    rules = [_text_rules(max_chars, fit) for fit in fits_boxes]
+
+    def fits(texts):
+        return all(rule[0](text) for rule, text in zip(rules, texts))
+
+    def split(texts):
+        parts = [rule[1](text) for rule, text in zip(rules, texts)]
+        count = max(len(p) for p in parts)
+        parts = [p if len(p) == count else _split_even(text, count) for p, text in zip(parts, texts)]
+        return list(zip_longest(*parts, fillvalue=""))
+
+    return fits, split
+
+def _paginate(verses, max_chars, fit=None, pack_verses=False):
+    """
+    구절 목록을 슬라이드 단위 (책, 장, 절, 본문)로 펼친다.
+    fit(TextBoxMetrics)이 있으면 글자 수 대신 ContentBox에 실제로 들어가는 만큼 나누고,
+    pack_verses면 한 슬라이드에 들어가는 짧은 연속 구절을 묶는다 (절 표시는 '1-3').
+    나란히 보기(본문이 역본별 튜플)에서는 fit에 (ContentBox, ContentBox2) 튜플을 준다.
+    verses는 생성기여도 되고(첫 구절만 미리 보고 나머지는 하나씩 읽음), 나눈 결과도 하나씩 내준다.
+    """
+    verses = iter(verses)
+    first = next(verses, None)
+    if first is None:
+        return
+    verses = chain((first,), verses)
+    if _is_parallel([first]):
+        fits, split = _parallel_rules(max_chars, fit if isinstance(fit, tuple) else (fit, fit))
+    else:
+        fits, split = _text_rules(max_chars, fit)
+
+    group = []  # 한 슬라이드에 묶을 [(절, 본문), ...]
+    group_key = None
+    for book, chapter, verse, text in verses:
+        if pack_verses and fits(text):
+            if (group and group_key == (book, chapter) and verse == group[-1][0] + 1
+                    and fits(_packed_text(group + [(verse, text)]))):
+                group.append((verse, text))
+                continue
+            if group:
+                yield _flush_group(group_key, group)
+            group, group_key = [(verse, text)], (book, chapter)
+            continue
+        if group:
+            yield _flush_group(group_key, group)
+            group = []
+        if fits(text):
+            # 한 슬라이드에 모두 표시
+            yield book, chapter, verse, text
+        else:
+            # 여러 슬라이드로 분할
+            for chunk in split(text):
+                yield book, chapter, verse, chunk
+    if group:
+        yield _flush_group(group_key, group)
+
+def _packed_text(group):
+    if isinstance(group[0][1], tuple):
+        return tuple(" ".join(f"{verse} {text[i]}" for verse, text in group if text[i])
+                     for i in range(len(group[0][1])))
+    return " ".join(f"{verse} {text}" for verse, text in group)
+
+def _flush_group(group_key, group):
+    book, chapter = group_key
+    if len(group) == 1:
+        verse, text = group[0]
+        return book, chapter, verse, text
+    return book, chapter, f"{group[0][0]}-{group[-1][0]}", _packed_text(group)
+
+def build_deck(job, bible_data, version=DEFAULT_VERSION):
+    """
+    PPT 한 개 생성 작업.
+    job: {"selection", "output_path", "template_path", "bg_image_path", "max_chars",
+          "fit_mode"(선택), "pack_verses"(선택), "streaming"(선택), "incremental"(선택), "bg_dpi"(선택),
+          "version"(선택, 기본은 version 인자), "parallel_version"(선택, 나란히 넣을 역본),
+          "use_cache"(선택, 기본 거짓), "export_workers"(선택, 내보내기 그리기 프로세스 수), "report"(선택)}
+    output_path 확장자가 .pdf/.png/.html이면 PPT 대신 그 형식으로 내보낸다 (core.export).
+    반환: {"output", "slides", "seconds", "error", "cached"} (실패해도 예외 대신 error에 메시지)
+    job["report"]가 참이면 단계별 계측 결과(BuildReport.to_dict())를 "report"에 담는다.
+    """
+    if not job.get("report"):
+        return _build_deck(job, bible_data, version)
+    with collect(os.path.basename(job["output_path"])) as report:
+        result = _build_deck(job, bible_data, version)
+    result["report"] = report.to_dict()
+    return result
+
+def _build_deck(job, bible_data, version):
+    result = {"output": job["output_path"], "slides": 0, "seconds": 0.0, "error": None, "cached": False}
+    start = time.perf_counter()
+    try:
+        version = job.get("version") or version
+        selections = parse_selection(job["selection"], bible_data, version)
+        if not selections:
+            raise ValueError("구절 범위 해석 실패")
+        parallel_version = job.get("parallel_version")
+        verses = VerseSelection(bible_data, [version, parallel_version] if parallel_version else version,
+                                selections)
+        if not verses:
+            raise ValueError("해당 구절을 찾을 수 없습니다.")
+
+        if export_format(job["output_path"]):
+            # .pdf/.png/.html: PPT 대신 그린 슬라이드로 내보낸다
+            built = export_deck(verses, job["output_path"], job["template_path"], job.get("bg_image_path"),
+                                job.get("max_chars", 500),
+                                fit_mode=job.get("fit_mode", False), pack_verses=job.get("pack_verses", False),
+                                bg_dpi=job.get("bg_dpi", DEFAULT_BG_DPI), workers=job.get("export_workers"))
         else:
-            # 현재 슬라이드 저장
-            if current_text:
-                slide_count += 1
-                verse_display = f"{verse}" if slide_count > 1 else str(verse)
-                _create_slide(prs, template_slide, book, chapter, verse_display, current_text, bg_image_path)
-            current_text = word
-    
-    # 마지막 슬라이드 저장
-    if current_text:
-        slide_count += 1
-        verse_display = f"{verse}" if slide_count > 1 else str(verse)
-        _create_slide(prs, template_slide, book, chapter, verse_display, current_text, bg_image_path)
\ No newline at end of file
+            built = create_ppt(verses, job["output_path"], job["template_path"], job.get("bg_image_path"),
+                               job.get("max_chars", 500),
+                               fit_mode=job.get("fit_mode", False), pack_verses=job.get("pack_verses", False),
+                               streaming=job.get("streaming", False), incremental=job.get("incremental", False),
+                               bg_dpi=job.get("bg_dpi", DEFAULT_BG_DPI), use_cache=job.get("use_cache", False))
+        result["slides"] = built["slides"]
+        result["cached"] = built["cached"]
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+# 작업 프로세스마다 한 번 열어두는 성경 저장소 (mmap이라 OS 페이지 캐시를 프로세스끼리 공유)
+_worker_bible_data = None
+
+def _init_worker(templates=()):
+    """templates: 미리 준비해 둘 (템플릿 경로, 배경 이미지, bg_dpi) 목록 (프로세스마다 템플릿 캐시가 따로 있음)"""
+    global _worker_bible_data
+    _worker_bible_data = load_bible_data()
+    for template_path, bg_image_path, bg_dpi in templates:
+        try:
+            get_prepared_template(template_path, bg_image_path, bg_dpi)
+        except Exception as e:
+            print(f"경고: 템플릿을 미리 준비하지 못했습니다 ({template_path}): {e}")
+
+def _run_worker_job(job):
+    # 작업들이 이미 프로세스마다 나뉘어 있으므로 내보내기 그리기는 이 프로세스에서
+    return build_deck(dict(job, export_workers=job.get("export_workers", 1)), _worker_bible_data)
+
+def build_decks_parallel(jobs, max_workers=None):
+    """
+    서로 독립적인 PPT 작업들을 프로세스 풀에 나눠서 생성.
+    결과는 jobs 순서대로 build_deck과 같은 형식으로 반환한다.
+    """
+    if not jobs:
+        return []
+    # 작업 프로세스들이 동시에 바이너리를 다시 만들지 않도록 먼저 준비
+    load_bible_data()
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(jobs)))
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        futures = [executor.submit(_run_worker_job, job) for job in jobs]
+        for job, future in zip(jobs, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # 작업 프로세스가 비정상 종료된 경우 등
+                results.append({"output": job["output_path"], "slides": 0, "seconds": 0.0, "error": str(e),
+                                "cached": False})
+    return results
@@ -0,0 +1,204 @@
+"""
+대용량 PPT용 스트리밍 저장
+
+일반 경로는 모든 슬라이드를 Presentation 객체 안에 만든 뒤 마지막에 prs.save로 저장하므로
+시편 전체처럼 슬라이드가 수천 장이면 메모리가 크게 늘어납니다.
+StreamingDeckWriter는 슬라이드 XML을 만들자마자 zip에 기록하고 버리며,
+프레젠테이션에는 본문 없는 작은 자리표시 파트(관계 정보만 보유)만 남깁니다.
+마지막에 나머지 파트(presentation.xml, 레이아웃, 이미지, [Content_Types].xml 등)를
+python-pptx와 같은 방식으로 기록하므로 결과 파일의 내용은 일반 경로와 같습니다.
+
+증분 생성에서는 이전 결과 파일(reuse_zip)에서 바뀌지 않은 슬라이드와 이미지 등을
+압축을 풀지 않고 그대로 복사합니다. (zipfile 내부 구조를 확인한 파이썬 버전에서만.
+그 밖의 버전이나 ZIP64가 필요한 큰 항목은 풀었다가 다시 압축하는 공개 API로 복사)
+"""
+import sys
+import struct
+import zipfile
+import zlib
+
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.package import Part
+from pptx.opc.packuri import PackURI, PACKAGE_URI, CONTENT_TYPES_URI
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.oxml.slide import CT_Slide
+
+from core.instrument import instrument
+
+
+class SlideListAppender:
+    """
+    프레젠테이션 끝에 슬라이드 파트를 붙인다.
+    python-pptx의 add_slide는 매번 전체 관계/슬라이드 ID를 훑어서 슬라이드 수에 비례해 느려지므로,
+    다음 슬라이드 ID를 기억해 두고 새 관계를 바로 추가한다.
+    """
+
+    def __init__(self, prs):
+        self._prs_part = prs.part
+        self._sld_id_lst = prs.slides._sldIdLst
+        self._sync()
+
+    def _sync(self):
+        ids = [int(i) for i in self._sld_id_lst.xpath("./p:sldId/@id")]
+        self._next_id = max([255] + ids) + 1
+        self._count = len(ids)
+
+    def next_partname(self):
+        if len(self._sld_id_lst) != self._count:
+            self._sync()  # 다른 곳에서 슬라이드가 추가/삭제된 경우
+        return PackURI("/ppt/slides/slide%d.xml" % (self._count + 1))
+
+    def append(self, slide_part):
+        """slide_part를 마지막 슬라이드로 등록하고 rId 반환"""
+        if len(self._sld_id_lst) != self._count:
+            self._sync()
+        # 새로 만든 파트라 기존 관계와 겹칠 일이 없으므로 중복 검사 없이 추가
+        rId = self._prs_part.rels._add_relationship(RT.SLIDE, slide_part)
+        self._sld_id_lst._add_sldId(id=self._next_id, rId=rId)
+        self._next_id += 1
+        self._count += 1
+        return rId
+
+
+def get_slide_appender(prs):
+    """Presentation마다 하나씩 쓰는 SlideListAppender"""
+    appender = getattr(prs, "_b2p_slide_appender", None)
+    if appender is None:
+        appender = SlideListAppender(prs)
+        prs._b2p_slide_appender = appender
+    return appender
+
+
+# 압축된 바이트를 그대로 옮길 때 건드리는 ZipFile 내부 속성. 이 범위의 파이썬 버전에서 쓰기 동작
+# (_open_to_write/close)과 맞는지 확인했다. 범위 밖이거나 속성이 없으면 copy_zip_member는 read/writestr로 복사한다
+_RAW_COPY_VERSIONS = ((3, 7), (3, 13))
+_RAW_COPY_ATTRS = ("fp", "filelist", "NameToInfo", "start_dir", "_didModify", "_writing", "_lock")
+
+
+def _raw_copy_supported(dst_zip):
+    return (_RAW_COPY_VERSIONS[0] <= sys.version_info[:2] <= _RAW_COPY_VERSIONS[1]
+            and all(hasattr(dst_zip, name) for name in _RAW_COPY_ATTRS))
+
+
+def _read_raw(src_zip, info):
+    """src_zip 항목의 압축된 바이트 (원본 파일을 따로 열어서 읽는다). 그대로 옮길 수 없는 항목이면 None"""
+    if not src_zip.filename or info.flag_bits & 0x1:  # 파일이 아닌 스트림 / 암호화된 항목
+        return None
+    if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        return None
+    with open(src_zip.filename, "rb") as fp:
+        fp.seek(info.header_offset)
+        header = fp.read(zipfile.sizeFileHeader)
+        if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+            return None
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        fp.seek(info.header_offset + zipfile.sizeFileHeader + name_len + extra_len)
+        raw = fp.read(info.compress_size)
+    return raw if len(raw) == info.compress_size else None
+
+
+def copy_zip_member(src_zip, info, dst_zip, arcname):
+    """
+    src_zip의 항목을 arcname 이름으로 dst_zip(쓰기 모드)에 복사.
+    가능하면 압축을 풀지 않고 그대로 옮기고, 안 되면(확인하지 않은 파이썬 버전, ZIP64가 필요한 크기/위치,
+    다른 항목을 쓰는 중) 풀어서 writestr로 다시 압축한다.
+    """
+    raw = None
+    if (_raw_copy_supported(dst_zip) and not dst_zip._writing
+            and max(info.compress_size, info.file_size, dst_zip.start_dir) < zipfile.ZIP64_LIMIT):
+        raw = _read_raw(src_zip, info)
+    zinfo = zipfile.ZipInfo(arcname, info.date_time)
+    zinfo.compress_type = info.compress_type
+    zinfo.external_attr = info.external_attr
+    if raw is None:
+        dst_zip.writestr(zinfo, src_zip.read(info))
+        return
+    zinfo.CRC = info.CRC
+    zinfo.compress_size = info.compress_size
+    zinfo.file_size = info.file_size
+    with dst_zip._lock:
+        dst_zip.fp.seek(dst_zip.start_dir)
+        zinfo.header_offset = dst_zip.start_dir
+        dst_zip.fp.write(zinfo.FileHeader(False))
+        dst_zip.fp.write(raw)
+        dst_zip.filelist.append(zinfo)
+        dst_zip.NameToInfo[arcname] = zinfo
+        dst_zip.start_dir = dst_zip.fp.tell()
+        dst_zip._didModify = True
+
+
+class _StreamedSlidePart(Part):
+    """이미 zip에 기록된 슬라이드의 자리표시 파트 (관계 정보만 보관)"""
+
+    @property
+    def blob(self):
+        return b""
+
+
+class StreamingDeckWriter:
+    """슬라이드를 만드는 즉시 zip에 기록하는 PPT 저장기"""
+
+    def __init__(self, prs, prototype, path, reuse_zip=None):
+        self._prototype = prototype
+        self._reuse_zip = reuse_zip
+        self._package = prs.part.package
+        self._appender = get_slide_appender(prs)
+        self._zipf = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, strict_timestamps=False)
+        self.slide_count = 0
+
+    @instrument("stream_slide")
+    def add_slide(self, texts):
+        """texts: {텍스트박스 이름: 텍스트} 로 슬라이드 하나를 만들어 바로 기록"""
+        partname = self._appender.next_partname()
+        part = _StreamedSlidePart(partname, CT.PML_SLIDE, self._package)
+        # SlidePart.new와 같은 순서로 관계를 만든다 (레이아웃 -> 이미지)
+        part.relate_to(self._prototype.layout.part, RT.SLIDE_LAYOUT)
+        sld = CT_Slide.new()
+        sld.cSld.replace(sld.cSld.spTree, self._prototype.build_tree(part, texts))
+        self._zipf.writestr(partname.membername, serialize_part_xml(sld))
+        self._appender.append(part)
+        self.slide_count += 1
+
+    @instrument("reuse_slide")
+    def add_reused_slide(self, membername):
+        """
+        reuse_zip의 슬라이드(같은 템플릿으로 만든 것)를 그대로 복사해서 추가.
+        관계는 add_slide와 같은 순서로 연결하므로 슬라이드 XML 안의 rId가 그대로 맞는다.
+        """
+        partname = self._appender.next_partname()
+        part = _StreamedSlidePart(partname, CT.PML_SLIDE, self._package)
+        part.relate_to(self._prototype.layout.part, RT.SLIDE_LAYOUT)
+        self._prototype.relate(part)
+        copy_zip_member(self._reuse_zip, self._reuse_zip.getinfo(membername), self._zipf, partname.membername)
+        self._appender.append(part)
+        self.slide_count += 1
+
+    def close(self):
+        """나머지 파트와 [Content_Types].xml, 관계 파일을 기록하고 zip을 닫는다"""
+        parts = tuple(self._package.iter_parts())
+        self._zipf.writestr(CONTENT_TYPES_URI.membername,
+                            serialize_part_xml(_ContentTypesItem.xml_for(parts)))
+        self._zipf.writestr(PACKAGE_URI.rels_uri.membername, self._package._rels.xml)
+        for part in parts:
+            if not isinstance(part, _StreamedSlidePart):
+                self._write_blob(part.partname.membername, part.blob)
+            if part._rels:
+                self._zipf.writestr(part.partname.rels_uri.membername, part.rels.xml)
+        self._zipf.close()
+
+    def _write_blob(self, membername, blob):
+        """이전 결과 파일에 내용이 같은 항목이 있으면(배경 이미지 등) 다시 압축하지 않고 복사"""
+        if self._reuse_zip is not None:
+            try:
+                info = self._reuse_zip.getinfo(membername)
+            except KeyError:
+                info = None
+            if info is not None and info.file_size == len(blob) and info.CRC == zlib.crc32(blob):
+                copy_zip_member(self._reuse_zip, info, self._zipf, membername)
+                return
+        self._zipf.writestr(membername, blob)
+
+    def abort(self):
+        """취소/오류 시 zip만 닫는다 (파일 삭제는 호출한 쪽에서)"""
+        self._zipf.close()
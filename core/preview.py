@@ -0,0 +1,474 @@
+"""
+슬라이드 미리보기
+
+PowerPoint 없이 준비된 템플릿(PreparedTemplate)의 첫 슬라이드를 Pillow로 그려서 미리보기 이미지를 만든다.
+- 배경 이미지/검정 배경, 템플릿의 사각형/둥근 사각형/타원 도형(단색 채우기, 테두리)
+- TitleBox/VerseBox/ContentBox(나란히 보기면 ContentBox2도): 위치, 크기, 글꼴, 색, 정렬을 템플릿에서 읽고
+  줄바꿈은 맞춤 모드와 같은 TextBoxMetrics로 계산
+그림자, 그라데이션(첫 색으로 칠함), 텍스트박스가 아닌 도형의 글자 등은 생략한다.
+
+그린 슬라이드는 (템플릿, 책, 장, 절, 본문 조각) 키로 LRU 캐시(ImageCache)에 보관하므로,
+긴 덱을 넘겨 볼 때나 구절 범위를 고쳤을 때 바뀐 슬라이드만 새로 그린다.
+발표 화면은 화면 크기의 렌더러와 따로 만든 ImageCache를 써서 미리보기 캐시를 밀어내지 않는다.
+"""
+import io
+import os
+import colorsys
+import threading
+from collections import OrderedDict
+
+from lxml import etree
+from pptx.oxml.ns import qn
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+from core.text_layout import EMU_PER_PT, TextBoxMetrics, find_font_file, run_properties
+from core.background import DEFAULT_BG_DPI
+
+PREVIEW_WIDTH = 480  # 미리보기 이미지 폭(px), 높이는 슬라이드 비율대로
+PREVIEW_CACHE_BYTES = 64 * 1024 * 1024  # 그린 슬라이드 캐시 최대 크기
+
+TEXT_BOX_NAMES = ("TitleBox", "VerseBox", "ContentBox", "ContentBox2")
+
+# 슬라이드 마스터의 기본 색 대응 (bg1 -> lt1 등)
+_SCHEME_ALIASES = {"bg1": "lt1", "tx1": "dk1", "bg2": "lt2", "tx2": "dk2"}
+_PRESET_COLORS = {"black": "000000", "white": "FFFFFF", "gray": "808080", "red": "FF0000",
+                  "green": "008000", "blue": "0000FF", "yellow": "FFFF00"}
+_DEFAULT_LINE_WIDTH = 9525  # 0.75pt (EMU)
+
+_fonts = {}  # (글꼴 이름, 크기 px) -> ImageFont
+
+
+def _local_name(el):
+    return etree.QName(el).localname
+
+
+def _theme_colors(prs):
+    """테마 색 이름(dk1, lt1, accent1 ...) -> 'RRGGBB'"""
+    theme_part = prs.slide_master.part.part_related_by(RT.THEME)
+    scheme = etree.fromstring(theme_part.blob).find(f"{qn('a:themeElements')}/{qn('a:clrScheme')}")
+    colors = {}
+    for slot in scheme if scheme is not None else ():
+        if len(slot) == 0:
+            continue
+        color = slot[0]
+        colors[_local_name(slot)] = color.get("lastClr") if _local_name(color) == "sysClr" else color.get("val")
+    return colors
+
+
+def _apply_modifiers(hex_color, color_el):
+    """lumMod/lumOff/alpha를 적용한 (r, g, b, a)"""
+    r, g, b = (int(hex_color[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    alpha = 255
+    lum_mod, lum_off = 1.0, 0.0
+    for mod in color_el:
+        value = int(mod.get("val", "100000")) / 100000
+        tag = _local_name(mod)
+        if tag == "lumMod":
+            lum_mod = value
+        elif tag == "lumOff":
+            lum_off = value
+        elif tag == "alpha":
+            alpha = round(255 * value)
+    if lum_mod != 1.0 or lum_off:
+        h, lum, s = colorsys.rgb_to_hls(r, g, b)
+        r, g, b = colorsys.hls_to_rgb(h, min(1.0, max(0.0, lum * lum_mod + lum_off)), s)
+    return round(r * 255), round(g * 255), round(b * 255), alpha
+
+
+def _color(parent, theme):
+    """색 요소(srgbClr/schemeClr/sysClr/prstClr)를 담은 parent의 색 (r, g, b, a). 없으면 None"""
+    if parent is None:
+        return None
+    for el in parent:
+        tag = _local_name(el)
+        if tag == "srgbClr":
+            hex_color = el.get("val")
+        elif tag == "schemeClr":
+            name = el.get("val")
+            hex_color = theme.get(_SCHEME_ALIASES.get(name, name))
+        elif tag == "sysClr":
+            hex_color = el.get("lastClr")
+        elif tag == "prstClr":
+            hex_color = _PRESET_COLORS.get(el.get("val"))
+        else:
+            continue
+        return _apply_modifiers(hex_color, el) if hex_color else None
+    return None
+
+
+def _style_ref_color(style, ref_tag, theme):
+    """p:style의 fillRef/lnRef 색 (idx가 0이면 없음)"""
+    if style is None:
+        return None
+    ref = style.find(qn(ref_tag))
+    if ref is None or ref.get("idx", "0") == "0":
+        return None
+    return _color(ref, theme)
+
+
+def _shape_fill(sp_pr, style, theme):
+    for child in sp_pr:
+        tag = _local_name(child)
+        if tag == "noFill":
+            return None
+        if tag == "solidFill":
+            return _color(child, theme)
+        if tag == "gradFill":
+            gs_list = child.find(qn("a:gsLst"))
+            return _color(gs_list[0], theme) if gs_list is not None and len(gs_list) else None
+        if tag in ("blipFill", "pattFill", "grpFill"):
+            return None
+    return _style_ref_color(style, "a:fillRef", theme)
+
+
+def _shape_line(sp_pr, style, theme):
+    """테두리 (색, 두께 EMU). 테두리가 없으면 (None, 0)"""
+    ln = sp_pr.find(qn("a:ln"))
+    width = int(ln.get("w")) if ln is not None and ln.get("w") else _DEFAULT_LINE_WIDTH
+    if ln is not None:
+        if ln.find(qn("a:noFill")) is not None:
+            return None, 0
+        solid = ln.find(qn("a:solidFill"))
+        if solid is not None:
+            return _color(solid, theme), width
+    color = _style_ref_color(style, "a:lnRef", theme)
+    return (color, width) if color is not None else (None, 0)
+
+
+def _font(typeface, size_px):
+    key = (typeface, size_px)
+    font = _fonts.get(key)
+    if font is None:
+        from PIL import ImageFont
+        path = find_font_file(typeface)
+        try:
+            font = ImageFont.truetype(path, size_px) if path else ImageFont.load_default(size_px)
+        except (OSError, TypeError):
+            font = ImageFont.load_default()
+        _fonts[key] = font
+    return font
+
+
+class _TextBox:
+    """미리보기용 텍스트박스: TextBoxMetrics(위치/크기/글꼴) + 색/굵기/정렬"""
+
+    def __init__(self, shape_el, slide_height, theme):
+        self.metrics = TextBoxMetrics.from_shape_element(shape_el, slide_height)
+        tx_body = shape_el.find(qn("p:txBody"))
+        body_pr = tx_body.find(qn("a:bodyPr"))
+        self.no_wrap = body_pr.get("wrap") == "none"
+        self.anchor = body_pr.get("anchor", "t")
+        p = tx_body.find(qn("a:p"))
+        p_pr = p.find(qn("a:pPr")) if p is not None else None
+        self.align = p_pr.get("algn", "l") if p_pr is not None else "l"
+        self.color, self.bold = None, None
+        for rpr in run_properties(p):
+            if self.color is None:
+                self.color = _color(rpr.find(qn("a:solidFill")), theme)
+            if self.bold is None and rpr.get("b") is not None:
+                self.bold = rpr.get("b") in ("1", "true")
+        if self.color is None:
+            self.color = _apply_modifiers(theme.get("dk1") or "000000", ())  # 기본 글자색
+
+
+class SlidePreviewRenderer:
+    """준비된 템플릿 하나의 미리보기 렌더러. 배경과 도형은 한 번만 그려 두고 슬라이드마다 글자만 그린다."""
+
+    def __init__(self, prepared, width=PREVIEW_WIDTH, key=None, cache=None, max_height=None):
+        """max_height: 높이가 이보다 크면 폭을 줄여서 맞춘다 (발표 화면처럼 폭과 높이가 모두 정해진 경우)"""
+        from PIL import Image
+        from pptx import Presentation
+
+        prs = Presentation(io.BytesIO(prepared.blob))
+        slide = prs.slides[0]
+        self.key = key if key is not None else id(self)
+        self.cache = cache if cache is not None else _preview_cache
+        self.slide_width, self.slide_height = prs.slide_width, prs.slide_height
+        if max_height and width * self.slide_height > max_height * self.slide_width:
+            width = max(1, max_height * self.slide_width // self.slide_height)
+        self.width = width
+        self.height = max(1, round(width * self.slide_height / self.slide_width))
+        self.scale = width / self.slide_width
+        theme = _theme_colors(prs)
+
+        self._boxes = {}  # 텍스트박스 이름 -> _TextBox
+        base = Image.new("RGBA", (self.width, self.height), (0, 0, 0, 255))
+        for el in slide.shapes._spTree.iterchildren():
+            tag = _local_name(el)
+            if tag == "sp":
+                c_nv_pr = el.find(f"{qn('p:nvSpPr')}/{qn('p:cNvPr')}")
+                name = c_nv_pr.get("name") if c_nv_pr is not None else None
+                if name in TEXT_BOX_NAMES and el.find(qn("p:txBody")) is not None:
+                    self._boxes.setdefault(name, _TextBox(el, self.slide_height, theme))
+                else:
+                    self._draw_shape(base, el, theme)
+            elif tag == "pic":
+                self._draw_picture(base, el, slide.part)
+        self._base = base.convert("RGB")
+
+    def _rect(self, sp_pr):
+        """도형 위치 (x0, y0, x1, y1) px. 위치 정보가 없으면 None"""
+        xfrm = sp_pr.find(qn("a:xfrm")) if sp_pr is not None else None
+        if xfrm is None or xfrm.find(qn("a:off")) is None or xfrm.find(qn("a:ext")) is None:
+            return None
+        off, ext = xfrm.find(qn("a:off")), xfrm.find(qn("a:ext"))
+        x, y = int(off.get("x")), int(off.get("y"))
+        cx, cy = int(ext.get("cx")), int(ext.get("cy"))
+        return (round(x * self.scale), round(y * self.scale),
+                round((x + cx) * self.scale), round((y + cy) * self.scale))
+
+    def _draw_shape(self, base, el, theme):
+        from PIL import Image, ImageDraw
+
+        sp_pr = el.find(qn("p:spPr"))
+        rect = self._rect(sp_pr)
+        if rect is None or rect[2] <= rect[0] or rect[3] <= rect[1]:
+            return
+        style = el.find(qn("p:style"))
+        fill = _shape_fill(sp_pr, style, theme)
+        line, line_width = _shape_line(sp_pr, style, theme)
+        if fill is None and line is None:
+            return
+        width_px = max(1, round(line_width * self.scale)) if line is not None else 0
+        geom = sp_pr.find(qn("a:prstGeom"))
+        prst = geom.get("prst") if geom is not None else "rect"
+
+        # 반투명 색이 있을 수 있으므로 별도 층에 그려서 합성
+        layer = Image.new("RGBA", base.size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+        if prst == "roundRect":
+            gd = geom.find(f"{qn('a:avLst')}/{qn('a:gd')}")
+            adj = int(gd.get("fmla", "val 16667").split()[-1]) if gd is not None else 16667
+            radius = round(min(rect[2] - rect[0], rect[3] - rect[1]) * adj / 100000)
+            draw.rounded_rectangle(rect, radius, fill=fill, outline=line, width=width_px)
+        elif prst == "ellipse":
+            draw.ellipse(rect, fill=fill, outline=line, width=width_px)
+        else:
+            draw.rectangle(rect, fill=fill, outline=line, width=width_px)
+        base.alpha_composite(layer)
+
+    def _draw_picture(self, base, el, part):
+        from PIL import Image
+
+        blip = el.find(f"{qn('p:blipFill')}/{qn('a:blip')}")
+        rId = blip.get(qn("r:embed")) if blip is not None else None
+        rect = self._rect(el.find(qn("p:spPr")))
+        if not rId or rect is None or rect[2] <= rect[0] or rect[3] <= rect[1]:
+            return
+        size = (rect[2] - rect[0], rect[3] - rect[1])
+        image = Image.open(io.BytesIO(part.related_part(rId).blob))
+        image.draft("RGB", size)  # JPEG는 미리보기 크기에 가깝게 줄여서 읽는다
+        image = image.convert("RGBA").resize(size, Image.LANCZOS)
+        base.paste(image, rect[:2], image)
+
+    def text_box_metrics(self, name):
+        box = self._boxes.get(name)
+        return box.metrics if box is not None else None
+
+    def paginate(self, verses, max_chars, fit_mode=False, pack_verses=False):
+        """PPT 생성과 같은 규칙으로 슬라이드 단위 [(책, 장, 절, 본문), ...]"""
+        return list(self.iter_pages(verses, max_chars, fit_mode, pack_verses))
+
+    def iter_pages(self, verses, max_chars, fit_mode=False, pack_verses=False):
+        """paginate와 같지만 나눈 슬라이드를 하나씩 내준다 (verses는 생성기도 됨)"""
+        from core.ppt_generator import _is_parallel, _paginate, _peek
+        first, verses = _peek(verses)
+        fit = None
+        if fit_mode:
+            fit = self.text_box_metrics("ContentBox")
+            if _is_parallel([first] if first is not None else []):
+                fit = (fit, self.text_box_metrics("ContentBox2"))
+        return _paginate(verses, max_chars, fit, pack_verses)
+
+    def render(self, book, chapter, verse, text):
+        """슬라이드 한 장의 미리보기 이미지 (PIL Image). 캐시에 있으면 그대로 반환"""
+        key = (self.key, book, chapter, verse, text)
+        image = self.cache.get(key)
+        if image is None:
+            from core.ppt_generator import _slide_texts
+            image = self._draw_slide(_slide_texts(book, chapter, verse, text))
+            self.cache.put(key, image)
+        return image
+
+    def _draw_slide(self, texts):
+        from PIL import ImageDraw
+
+        image = self._base.copy()
+        draw = ImageDraw.Draw(image)
+        for name, text in texts.items():
+            box = self._boxes.get(name)
+            if box is not None and text:
+                self._draw_text(draw, box, text)
+        return image
+
+    def _draw_text(self, draw, box, text):
+        m = box.metrics
+        scale = self.scale
+        font_px = max(1, round(m.font_size_pt * EMU_PER_PT * scale))
+        font = _font(m.typeface, font_px)
+        line_px = m.line_height_pt * EMU_PER_PT * scale
+        lines = [" ".join(text.split())] if box.no_wrap else m.wrap(text)
+
+        left = (m.left + m.insets["lIns"]) * scale
+        right = (m.left + m.width - m.insets["rIns"]) * scale
+        top = (m.top + m.insets["tIns"]) * scale
+        if not m.auto_grow and box.anchor in ("ctr", "b"):
+            inner = (m.height - m.insets["tIns"] - m.insets["bIns"]) * scale
+            top += (inner - line_px * len(lines)) / (2 if box.anchor == "ctr" else 1)
+        stroke = max(1, font_px // 28) if box.bold else 0  # 굵은 글꼴 파일 대신 외곽선으로 굵게
+        color = box.color[:3]
+        for i, line in enumerate(lines):
+            line_w = draw.textlength(line, font=font)
+            if box.align == "ctr":
+                x = (left + right - line_w) / 2
+            elif box.align == "r":
+                x = right - line_w
+            else:
+                x = left
+            draw.text((x, top + i * line_px), line, font=font, fill=color,
+                      stroke_width=stroke, stroke_fill=color)
+
+
+def _image_bytes(image):
+    return image.width * image.height * len(image.getbands())
+
+
+class ImageCache:
+    """
+    그린 슬라이드 LRU 캐시 (전체 크기가 max_bytes를 넘으면 오래 안 본 것부터 버림).
+    키는 (렌더러 키, 책, 장, 절, 본문). 여러 스레드에서 함께 써도 된다.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()  # 가장 최근에 쓴 것이 뒤
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self._stats["misses"] += 1
+                return None
+            self._images.move_to_end(key)
+            self._stats["hits"] += 1
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old is not None:
+                self._bytes -= _image_bytes(old)
+            self._images[key] = image
+            self._bytes += _image_bytes(image)
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, dropped = self._images.popitem(last=False)
+                self._bytes -= _image_bytes(dropped)
+
+    def drop_renderer(self, renderer_key):
+        """렌더러 하나가 그린 슬라이드를 모두 버린다"""
+        with self._lock:
+            for key in [k for k in self._images if k[0] == renderer_key]:
+                self._bytes -= _image_bytes(self._images.pop(key))
+
+    def info(self):
+        """{"hits", "misses", "images", "bytes"}"""
+        with self._lock:
+            return dict(self._stats, images=len(self._images), bytes=self._bytes)
+
+
+_preview_cache = ImageCache(PREVIEW_CACHE_BYTES)
+
+
+def preview_cache_info():
+    """미리보기 캐시 상태 {"hits", "misses", "images", "bytes"}"""
+    return _preview_cache.info()
+
+
+def find_page(pages, chapter, verse):
+    """[(책, 장, 절, 본문), ...]에서 chapter장 verse절이 들어 있는 첫 슬라이드 번호(0부터). 없으면 None
+    (chapter가 None이면 장은 보지 않는다. 여러 절을 묶은 슬라이드는 절이 "3-5" 형식)"""
+    for index, (_, page_chapter, page_verse, _) in enumerate(pages):
+        if chapter is not None and page_chapter != chapter:
+            continue
+        first, _, last = str(page_verse).partition("-")
+        if int(first) <= verse <= int(last or first):
+            return index
+    return None
+
+
+# (템플릿 경로, 폭, 최대 높이, 나란히 보기) -> SlidePreviewRenderer (키에 템플릿/배경 수정시각이 들어 있음)
+_renderers = {}
+_renderers_lock = threading.Lock()
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_preview_renderer(template_path, bg_image_path=None, width=PREVIEW_WIDTH, bg_dpi=DEFAULT_BG_DPI,
+                         parallel=False, max_height=None, cache=None):
+    """
+    템플릿별 렌더러 반환. 템플릿이나 배경 이미지 파일이 바뀌면(수정시각) 새로 만들고
+    이전 렌더러가 그린 슬라이드는 캐시에서 지운다. parallel이면 나란히 보기용 템플릿으로 그린다.
+    크기(width, max_height)와 나란히 보기 여부마다 따로 보관하므로 미리보기와 발표 화면, 한 역본과 두 역본
+    렌더러가 서로를 밀어내지 않는다.
+    cache: 새로 만들 렌더러가 쓸 ImageCache (없으면 미리보기 캐시)
+    """
+    from core.ppt_generator import get_prepared_template
+
+    path = os.path.abspath(template_path)
+    bg_path = os.path.abspath(bg_image_path) if bg_image_path and os.path.exists(bg_image_path) else ""
+    key = (path, _mtime_ns(path), bg_path, _mtime_ns(bg_path) if bg_path else None, bg_dpi, width, max_height,
+           bool(parallel))
+    slot = (path, width, max_height, bool(parallel))
+    with _renderers_lock:
+        renderer = _renderers.get(slot)
+        if renderer is not None and renderer.key == key:
+            return renderer
+        new_renderer = SlidePreviewRenderer(get_prepared_template(path, bg_path, bg_dpi, parallel), width, key,
+                                            cache, max_height)
+        if renderer is not None:
+            renderer.cache.drop_renderer(renderer.key)
+        _renderers[slot] = new_renderer
+        return new_renderer
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import argparse
+    from core.bible_store import load_bible_data
+    from core.reference import DEFAULT_VERSION
+    from core.ppt_generator import parse_selection, get_verses
+
+    parser = argparse.ArgumentParser(description="구절 범위의 슬라이드 미리보기를 PNG로 저장합니다.")
+    parser.add_argument("selection", help="구절 범위 (예: 창1:1-3)")
+    parser.add_argument("--template", default="1", help="템플릿 번호 (기본 1)")
+    parser.add_argument("--bg", help="배경 이미지 경로")
+    parser.add_argument("--max-chars", type=int, default=500)
+    parser.add_argument("--fit", action="store_true", help="본문 상자 크기에 맞춰 나누기")
+    parser.add_argument("--version", default=DEFAULT_VERSION, help="역본 (기본 개역개정)")
+    parser.add_argument("--parallel", help="나란히 넣을 두 번째 역본")
+    parser.add_argument("--width", type=int, default=PREVIEW_WIDTH)
+    parser.add_argument("--out", default="preview", help="PNG를 저장할 폴더")
+    args = parser.parse_args()
+
+    bible_store = load_bible_data()
+    preview_versions = [args.version, args.parallel] if args.parallel else args.version
+    preview_verses = get_verses(bible_store, preview_versions, parse_selection(args.selection, bible_store, args.version))
+    start = time.perf_counter()
+    preview_renderer = get_preview_renderer(os.path.join("templates", f"base_template{args.template}.pptx"),
+                                            args.bg, args.width, parallel=bool(args.parallel))
+    pages = preview_renderer.paginate(preview_verses, args.max_chars, args.fit)
+    print(f"템플릿 준비: {time.perf_counter() - start:.3f}초, 슬라이드 {len(pages)}장")
+    os.makedirs(args.out, exist_ok=True)
+    start = time.perf_counter()
+    for page_no, page in enumerate(pages, 1):
+        preview_renderer.render(*page).save(os.path.join(args.out, f"slide{page_no:04d}.png"))
+    print(f"그리기+저장: {time.perf_counter() - start:.3f}초 -> {args.out}", file=sys.stderr)
@@ -0,0 +1,310 @@
+"""
+성경 구절 범위 해석기
+
+지원하는 형식 (공백은 자유, ';'로 여러 권, ','로 같은 책의 여러 범위)
+  창1:1          한 절
+  창1:1-3        같은 장의 절 범위
+  창1:26-2:3     장을 넘어가는 범위
+  창1:26-        그 장의 끝 절까지
+  요3:16,18      ',' 뒤의 숫자는 앞 범위와 같은 장의 절
+  시23           장 전체
+  시23-24        여러 장 전체 (시23- 는 책의 마지막 장까지)
+
+성경 저장소에서 장별 절 목록 색인(VerseIndex)을 한 번 만들어 두고 범위를 펼치므로,
+없는 절을 하나씩 찾아보지 않고 결과 개수에 비례하는 시간으로 펼칩니다.
+잘못된 입력은 건너뛰지 않고 위치와 함께 SelectionError로 알려줍니다.
+책 이름은 정식 이름, 약칭, 흔히 쓰는 다른 이름을 받고, 앞부분만 쓴 이름('빌레')은 그렇게 시작하는 책이 하나뿐이면 그 책으로,
+오타는 앞부분이 맞는 책이 없을 때 가까운 책이 하나뿐이면 그 책으로 고쳐 읽습니다.
+"""
+from bisect import bisect_left, bisect_right
+
+from core.book_resolver import get_book_resolver
+
+DEFAULT_VERSION = "개역개정"
+
+_PUNCT = ":-,;"
+
+# (저장소 경로, 원본 수정시각, 역본) -> VerseIndex
+_index_cache = {}
+
+
+class SelectionError(ValueError):
+    """구절 범위 입력 오류. position은 입력 문자열 안의 위치(0부터)"""
+
+    def __init__(self, message, selection_str, position):
+        self.position = position
+        self.selection_str = selection_str
+        fragment = selection_str[position:position + 10].strip() if position < len(selection_str) else "(끝)"
+        super().__init__(f"{message} - {position + 1}번째 글자 '{fragment}'")
+
+
+class VerseIndex:
+    """책 -> 장 -> 절 번호 목록 색인 (절이 1부터 연속이면 절 수만 보관)"""
+
+    def __init__(self, books):
+        # books: {책: {장: [절, ...]}}
+        self._chapters = {}
+        self._verses = {}
+        for book, chapters in books.items():
+            self._chapters[book] = sorted(chapters)
+            for chapter, verses in chapters.items():
+                if verses == list(range(1, len(verses) + 1)):
+                    self._verses[(book, chapter)] = len(verses)
+                else:
+                    self._verses[(book, chapter)] = verses
+
+    @classmethod
+    def from_store(cls, store, version):
+        books = {}
+        for book in store.books(version):
+            books[book] = {chapter: store.verse_numbers(version, book, chapter)
+                           for chapter in store.chapters(version, book)}
+        return cls(books)
+
+    def has_book(self, book):
+        return book in self._chapters
+
+    def chapters(self, book):
+        return self._chapters.get(book, [])
+
+    def has_verse(self, book, chapter, verse):
+        verses = self._verses.get((book, chapter))
+        if verses is None:
+            return False
+        if isinstance(verses, int):
+            return 1 <= verse <= verses
+        i = bisect_left(verses, verse)
+        return i < len(verses) and verses[i] == verse
+
+    def last_verse(self, book, chapter):
+        verses = self._verses.get((book, chapter))
+        if not verses:
+            return None
+        return verses if isinstance(verses, int) else verses[-1]
+
+    def verses_between(self, book, chapter, start, end):
+        """장 안에서 start~end(포함) 사이에 실제로 있는 절 번호 목록 (절이 연속인 장은 range)"""
+        verses = self._verses.get((book, chapter))
+        if verses is None:
+            return []
+        if isinstance(verses, int):
+            return range(max(start, 1), min(end, verses) + 1)
+        return verses[bisect_left(verses, start):bisect_right(verses, end)]
+
+    def expand(self, book, start, end):
+        """(장, 절) ~ (장, 절) 범위를 [(책, 장, 절 번호 목록), ...]로 펼친다 (장마다 한 항목)"""
+        chapters = self._chapters.get(book, [])
+        lo = bisect_left(chapters, start[0])
+        hi = bisect_right(chapters, end[0])
+        result = []
+        for chapter in chapters[lo:hi]:
+            first = start[1] if chapter == start[0] else 1
+            last = end[1] if chapter == end[0] else self.last_verse(book, chapter)
+            verses = self.verses_between(book, chapter, first, last)
+            if verses:
+                result.append((book, chapter, verses))
+        return result
+
+
+def get_verse_index(store, version=DEFAULT_VERSION):
+    """저장소별로 한 번만 만드는 VerseIndex"""
+    key = (store.path, store.source_mtime_ns, version)
+    index = _index_cache.get(key)
+    if index is None:
+        index = VerseIndex.from_store(store, version)
+        _index_cache[key] = index
+    return index
+
+
+def tokenize(selection_str, book_names):
+    """
+    입력을 (종류, 값, 위치) 토큰 목록으로 나눈다.
+    종류: 'book', 'num', ':', '-', ',', ';'
+    숫자가 든 이름('요한1서')은 알려진 이름과 맞춰서 인식한다.
+    """
+    names = sorted(book_names, key=len, reverse=True)
+    tokens = []
+    i, n = 0, len(selection_str)
+    while i < n:
+        ch = selection_str[i]
+        if ch.isspace():
+            i += 1
+        elif ch in _PUNCT:
+            tokens.append((ch, ch, i))
+            i += 1
+        elif ch.isdigit():
+            start = i
+            while i < n and selection_str[i].isdigit():
+                i += 1
+            tokens.append(("num", int(selection_str[start:i]), start))
+        else:
+            start = i
+            # 숫자/구분자/공백 전까지를 이름으로 보되, '요한1서'처럼 더 긴 알려진 이름이 있으면 그것을 사용
+            while i < n and not (selection_str[i].isdigit() or selection_str[i] in _PUNCT
+                                 or selection_str[i].isspace()):
+                i += 1
+            for name in names:
+                if len(name) <= i - start:
+                    break
+                if selection_str.startswith(name, start):
+                    i = start + len(name)
+                    break
+            tokens.append(("book", selection_str[start:i], start))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, selection_str, index, books):
+        self.text = selection_str
+        self.index = index
+        self.books = books
+        self.tokens = tokenize(selection_str, books.names())
+        self.pos = 0
+
+    def error(self, message, token=None):
+        position = token[2] if token else len(self.text)
+        raise SelectionError(message, self.text, position)
+
+    def peek(self, kind=None):
+        if self.pos >= len(self.tokens):
+            return None
+        token = self.tokens[self.pos]
+        if kind is not None and token[0] != kind:
+            return None
+        return token
+
+    def take(self, kind, message):
+        token = self.peek()
+        if token is None or token[0] != kind:
+            self.error(message, token)
+        self.pos += 1
+        return token
+
+    def accept(self, kind):
+        token = self.peek(kind)
+        if token is not None:
+            self.pos += 1
+        return token
+
+    def parse(self):
+        result = []
+        while self.peek() is not None:
+            if self.accept(";"):
+                continue
+            result.extend(self.parse_book_group())
+            if self.peek() is not None:
+                self.take(";", "';' 또는 ','가 필요합니다")
+        return result
+
+    def parse_book_group(self):
+        token = self.take("book", "성경 이름이 필요합니다")
+        book = self.resolve_book(token)
+        result = []
+        chapter = None  # 직전 범위가 '장:절' 형식이면 그 장 (',' 뒤 숫자를 절로 해석)
+        while True:
+            items, chapter = self.parse_ref(book, chapter)
+            result.extend(items)
+            if not self.accept(","):
+                break
+            if self.range_end_is_open():
+                break  # 끝에 붙은 ',' 는 무시
+        return result
+
+    def resolve_book(self, token):
+        """
+        이름 -> 정식 이름. 모르는 이름은 앞부분이 맞는 책이 하나뿐이면 그 책('빌레' -> 빌레몬서),
+        앞부분이 맞는 책이 없으면 오타 교정을 시도하고, 안 되면 가까운 책을 알려준다
+        """
+        book = self.books.resolve(token[1]) or token[1]
+        if self.index.has_book(book):
+            return book
+        completed = [name for name in self.books.complete(token[1], limit=len(self.books.books))
+                     if self.index.has_book(name)]
+        if len(completed) == 1:
+            return completed[0]
+        if completed:
+            close = completed[:3]  # 앞부분이 맞는 책이 여럿이면 그 책들을 알려준다
+        else:
+            corrected = self.books.correct(token[1])
+            if corrected is not None and self.index.has_book(corrected):
+                return corrected
+            close = [name for name, _ in self.books.suggest(token[1]) if self.index.has_book(name)]
+        hint = f" (혹시 {', '.join(close)}?)" if close else ""
+        self.error(f"알 수 없는 성경 이름입니다: {token[1]}{hint}", token)
+
+    def check_chapter(self, book, chapter_token):
+        if chapter_token[1] not in self.index.chapters(book):
+            self.error(f"{book}에 {chapter_token[1]}장이 없습니다", chapter_token)
+
+    def check_verse(self, book, chapter, verse_token):
+        if not self.index.has_verse(book, chapter, verse_token[1]):
+            self.error(f"{book} {chapter}장에 {verse_token[1]}절이 없습니다", verse_token)
+
+    def range_end_is_open(self):
+        return self.peek() is None or self.peek()[0] in (",", ";")
+
+    def parse_ref(self, book, chapter):
+        """범위 하나를 해석해서 (펼친 결과, 다음 ','에 쓸 현재 장)을 반환"""
+        first = self.take("num", "장 또는 절 번호가 필요합니다")
+        if self.accept(":"):
+            chapter = first[1]
+            self.check_chapter(book, first)
+            start_token = self.take("num", "절 번호가 필요합니다")
+        elif chapter is not None:
+            # '요3:16,18' 의 18 처럼 앞 범위와 같은 장의 절
+            start_token = first
+        else:
+            return self.parse_chapter_range(book, first), None
+
+        self.check_verse(book, chapter, start_token)
+        start = (chapter, start_token[1])
+        if not self.accept("-"):
+            return self.index.expand(book, start, start), chapter
+        if self.range_end_is_open():
+            # '창1:26-' : 장의 끝까지
+            end = (chapter, self.index.last_verse(book, chapter))
+        else:
+            end_token = self.take("num", "범위 끝 번호가 필요합니다")
+            if self.accept(":"):
+                # '창1:26-2:3' : 장을 넘어가는 범위
+                self.check_chapter(book, end_token)
+                verse_token = self.take("num", "절 번호가 필요합니다")
+                self.check_verse(book, end_token[1], verse_token)
+                end = (end_token[1], verse_token[1])
+                chapter = end_token[1]
+            else:
+                self.check_verse(book, chapter, end_token)
+                end = (chapter, end_token[1])
+            if end < start:
+                self.error("범위의 끝이 시작보다 앞에 있습니다", end_token)
+        return self.index.expand(book, start, end), chapter
+
+    def parse_chapter_range(self, book, first):
+        """'시23', '시23-24', '시23-' 처럼 장 단위 범위"""
+        self.check_chapter(book, first)
+        start = (first[1], 1)
+        end = (first[1], self.index.last_verse(book, first[1]))
+        if self.accept("-"):
+            if self.range_end_is_open():
+                last_chapter = self.index.chapters(book)[-1]
+                end = (last_chapter, self.index.last_verse(book, last_chapter))
+            else:
+                end_token = self.take("num", "범위 끝 번호가 필요합니다")
+                self.check_chapter(book, end_token)
+                if self.accept(":"):
+                    verse_token = self.take("num", "절 번호가 필요합니다")
+                    self.check_verse(book, end_token[1], verse_token)
+                    end = (end_token[1], verse_token[1])
+                else:
+                    end = (end_token[1], self.index.last_verse(book, end_token[1]))
+                if end < start:
+                    self.error("범위의 끝이 시작보다 앞에 있습니다", end_token)
+        return self.index.expand(book, start, end)
+
+
+def parse_references(selection_str, index, books=None):
+    """
+    구절 범위 문자열을 [(책, 장, [절, ...]), ...]로 해석. 잘못된 입력은 SelectionError
+    books: 책 이름 색인(BookResolver, 없으면 기본 색인)
+    """
+    return _Parser(selection_str, index, books or get_book_resolver()).parse()
@@ -0,0 +1,396 @@
+"""
+로컬 PPT 생성 서버
+
+여러 PC에서 PPT를 만들 때 PC마다 성경 데이터와 템플릿을 읽는 대신, 한 PC에서 이 서버를 띄워 두고
+작업을 보내면 서버가 만든 .pptx를 돌려받는다. 서버는 성경 저장소와 준비된 템플릿(템플릿 캐시)을
+계속 열어 두므로 작업마다 다시 읽지 않는다.
+
+  python -m core.server                       # http://127.0.0.1:8765 (이 PC에서만 접속 가능)
+  python -m core.server --host 0.0.0.0        # 같은 네트워크의 다른 PC에서도 접속
+  python -m core.server --workers 2 --queue 16
+
+요청
+  GET  /status : 대기/실행 중인 작업 수, 처리 결과 수, PPT 캐시 상태 (JSON)
+  POST /decks  : 작업(JSON) -> 생성된 .pptx. 작업 형식은 명령줄 작업 목록 파일의 항목과 같고 output은 없다.
+    {"selection": "시23", "template": 1, "max_chars": 100, "fit": false, "pack": false,
+     "version": "개역개정", "parallel": "", "bg_dpi": 150, "cache": true,
+     "bg_image_data": "<이미지 base64>", "bg_image_name": "배경.jpg"}
+    생략한 값은 서버의 data/settings.json 을 따른다. 배경은 bg_image_data로 이미지 내용을 보내고,
+    "bg_image": "" 면 검정 배경 (서버 PC의 파일 경로는 받지 않는다).
+    응답 헤더 X-Slides(슬라이드 수), X-Cached(캐시에서 복사했으면 1), X-Seconds(생성 시간)
+
+작업은 크기가 정해진 대기열에 넣고 작업 프로세스들(--workers개)이 차례로 create_ppt(build_deck)로 만든다.
+PPT 생성은 CPU를 쓰는 작업이라 스레드로는 동시에 돌지 않으므로 프로세스로 나눈다. 작업 프로세스는
+시작할 때 성경 저장소를 한 번 열고 설정된 템플릿을 준비해 두므로 작업마다 다시 읽지 않는다.
+설정(data/settings.json)은 서버를 시작할 때 한 번만 읽는다.
+대기열이 가득 차면 바로 503(Retry-After)을 돌려준다.
+"""
+import os
+import sys
+import json
+import time
+import base64
+import shutil
+import asyncio
+import binascii
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 16
+MAX_BODY_BYTES = 64 * 1024 * 1024  # 배경 이미지(base64) 포함 요청 최대 크기
+UPLOAD_DIR = os.path.join("data", "cache", "uploads")
+UPLOAD_MAX_FILES = 30  # 오래 안 쓴 것부터 지움
+CHUNK_SIZE = 64 * 1024
+PPTX_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# 클라이언트가 정할 수 있는 작업 값 (출력 경로 등 서버 쪽 값은 받지 않는다)
+_JOB_KEYS = ("selection", "template", "max_chars", "fit", "pack", "bg_dpi", "version", "parallel", "cache")
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+class HttpError(Exception):
+    """요청 처리 실패 (상태 코드와 함께 JSON {"error": 메시지}로 응답)"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+def save_upload(data, name=""):
+    """
+    올라온 배경 이미지를 내용 해시 이름으로 저장하고 경로 반환.
+    같은 이미지는 같은 경로(수정시각도 그대로)가 되므로 서버의 템플릿/배경 캐시를 그대로 쓴다.
+    """
+    ext = os.path.splitext(name)[1].lower() or ".img"
+    path = os.path.join(UPLOAD_DIR, hashlib.sha1(data).hexdigest()[:24] + ext)
+    if os.path.exists(path):
+        # 최근 사용은 접근 시각으로 표시 (수정시각이 바뀌면 템플릿 캐시가 다시 준비함)
+        os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+        return os.path.abspath(path)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    uploads = sorted((os.path.join(UPLOAD_DIR, n) for n in os.listdir(UPLOAD_DIR) if not n.endswith(".tmp")),
+                     key=os.path.getatime)
+    for old in uploads[:max(0, len(uploads) - UPLOAD_MAX_FILES)]:
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return os.path.abspath(path)
+
+
+def job_from_request(request, output_path):
+    """요청 JSON을 명령줄 작업 형식(core.cli.resolve_jobs 입력)으로"""
+    if not isinstance(request, dict):
+        raise HttpError(400, "작업은 JSON 객체여야 합니다.")
+    selection = request.get("selection")
+    if not isinstance(selection, str) or not selection.strip():
+        raise HttpError(400, "'selection' 값이 없습니다.")
+    from core.cli import check_job
+    try:
+        job = check_job({key: request[key] for key in _JOB_KEYS if key in request})
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    job["output"] = output_path
+    if request.get("bg_image_data"):
+        try:
+            data = base64.b64decode(request["bg_image_data"], validate=True)
+        except (binascii.Error, TypeError, ValueError):
+            raise HttpError(400, "'bg_image_data'가 올바른 base64가 아닙니다.")
+        job["bg_image"] = save_upload(data, str(request.get("bg_image_name", "")))
+    elif "bg_image" in request:
+        if request["bg_image"]:
+            raise HttpError(400, "서버 PC의 파일 경로는 쓸 수 없습니다. 이미지는 'bg_image_data'로 보내주세요.")
+        job["bg_image"] = ""
+    return job
+
+
+class DeckServer:
+    """
+    asyncio HTTP 서버 + 작업 대기열 + 작업 프로세스 풀.
+    작업 프로세스는 각자 성경 저장소(mmap이라 OS 페이지 캐시는 공유)와 템플릿 캐시를 열어 두고,
+    PPT 캐시는 파일이라 함께 쓴다. bible_data는 이 프로세스의 상태 표시/역본 색인 준비에만 쓴다.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE, bible_data=None):
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.bible_data = bible_data
+        self.stats = {"running": 0, "done": 0, "failed": 0, "rejected": 0}
+        self.config = None  # 시작할 때 한 번 읽는 설정
+        self._templates = []  # 작업 프로세스마다 미리 준비할 (템플릿, 배경, bg_dpi)
+        self._queue = None
+        self._executor = None
+        self._tasks = []
+        self._server = None
+
+    async def start(self):
+        """성경 데이터/템플릿을 미리 준비하고 접속을 받기 시작 (port가 0이면 빈 포트를 골라 self.port에 기록)"""
+        from core.ppt_generator import _init_worker
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._warm_up)
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self._templates,))
+        self._queue = asyncio.Queue(self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def _warm_up(self):
+        """
+        설정 읽기, 성경 저장소 열기(바이너리가 오래됐으면 작업 프로세스들보다 먼저 다시 만듦),
+        기본 역본 색인, 작업 프로세스가 미리 준비할 템플릿 목록 정하기
+        """
+        from core.cli import template_path_for
+        from core.ppt_generator import load_bible_data
+        from core.reference import get_verse_index
+        from core.settings import load_settings
+
+        self.config = load_settings()
+        if self.bible_data is None:
+            self.bible_data = load_bible_data()
+        get_verse_index(self.bible_data, self.config["bible_version"])
+        self._templates = [(template_path_for(num), self.config["bg_images"].get(num, ""),
+                            self.config["bg_image_dpi"])
+                           for num in ("1", "2", "3") if os.path.exists(template_path_for(num))]
+
+    async def _worker(self):
+        from core.cli import resolve_jobs
+        from core.ppt_generator import _run_worker_job
+
+        loop = asyncio.get_running_loop()
+        while True:
+            job, future = await self._queue.get()
+            self.stats["running"] += 1
+            try:
+                resolved = resolve_jobs([job], self.config)[0]
+                result = await loop.run_in_executor(self._executor, _run_worker_job, resolved)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.stats["running"] -= 1
+                self._queue.task_done()
+
+    def status(self):
+        from core.deck_cache import deck_cache_info
+        return dict(self.stats, queued=self._queue.qsize(), queue_size=self.queue_size, workers=self.workers,
+                    versions=self.bible_data.versions(), deck_cache=deck_cache_info())
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                method, path, body = await self._read_request(reader)
+                if path == "/status":
+                    if method != "GET":
+                        raise HttpError(405, "GET만 사용할 수 있습니다.")
+                    await self._send(writer, 200, self._json(self.status()), "application/json")
+                elif path == "/decks":
+                    if method != "POST":
+                        raise HttpError(405, "POST만 사용할 수 있습니다.")
+                    await self._handle_deck(writer, body)
+                else:
+                    raise HttpError(404, f"없는 주소입니다: {path}")
+            except HttpError as e:
+                await self._send(writer, e.status, self._json({"error": e.message}), "application/json", e.headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as e:
+                # 예상하지 못한 오류도 연결을 그냥 끊지 않고 500으로 알린다
+                await self._send(writer, 500, self._json({"error": str(e)}), "application/json")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # 클라이언트가 먼저 끊음
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        """(메서드, 경로, 본문). 연결마다 요청 하나만 처리한다 (Connection: close)."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HttpError(400, "요청 헤더가 너무 깁니다.")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "잘못된 요청입니다.")
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HttpError(400, "Content-Length가 올바르지 않습니다.")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, f"요청이 너무 큽니다 (최대 {MAX_BODY_BYTES // 1024 // 1024}MB).")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return method.upper(), target.split("?", 1)[0], body
+
+    async def _handle_deck(self, writer, body):
+        try:
+            request = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            raise HttpError(400, "작업 JSON을 읽을 수 없습니다.")
+        work_dir = tempfile.mkdtemp(prefix="b2p_server_")
+        try:
+            loop = asyncio.get_running_loop()
+            job = await loop.run_in_executor(None, job_from_request, request, os.path.join(work_dir, "deck.pptx"))
+            future = loop.create_future()
+            try:
+                self._queue.put_nowait((job, future))
+            except asyncio.QueueFull:
+                self.stats["rejected"] += 1
+                raise HttpError(503, "대기 중인 작업이 너무 많습니다. 잠시 후 다시 시도해주세요.", {"Retry-After": "5"})
+            result = await future
+            if result["error"]:
+                self.stats["failed"] += 1
+                raise HttpError(422, result["error"])
+            self.stats["done"] += 1
+            await self._send_file(writer, result["output"], {
+                "X-Slides": str(result["slides"]),
+                "X-Cached": "1" if result.get("cached") else "0",
+                "X-Seconds": f"{result['seconds']:.3f}",
+            })
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    @staticmethod
+    def _json(data):
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def _head(status, content_type, length, headers=None):
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                 f"Content-Type: {content_type}", f"Content-Length: {length}", "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(self, writer, status, body, content_type, headers=None):
+        if content_type == "application/json":
+            content_type += "; charset=utf-8"
+        writer.write(self._head(status, content_type, len(body), headers) + body)
+        await writer.drain()
+
+    async def _send_file(self, writer, path, headers):
+        """PPT 파일을 조각씩 보낸다 (큰 PPT도 메모리에 한 번에 올리지 않음)"""
+        writer.write(self._head(200, PPTX_TYPE, os.path.getsize(path), headers))
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                writer.write(chunk)
+                await writer.drain()
+
+
+def submit_deck(server_url, job, output_path, bg_image_path=None, timeout=600, cancel_event=None):
+    """
+    생성 서버에 작업을 보내고 받은 PPT를 output_path에 저장.
+    job: POST /decks 형식 (bg_image_path를 주면 이미지 내용을 함께 보내고, 빈 값이면 검정 배경)
+    반환: {"slides", "cached", "seconds"}. 서버 오류는 Exception(메시지), 취소는 GenerationCancelled.
+    """
+    import http.client
+    from urllib.parse import urlsplit
+
+    url = urlsplit(server_url if "://" in server_url else "http://" + server_url)
+    body = dict(job)
+    if bg_image_path and os.path.exists(bg_image_path):
+        with open(bg_image_path, "rb") as f:
+            body["bg_image_data"] = base64.b64encode(f.read()).decode("ascii")
+        body["bg_image_name"] = os.path.basename(bg_image_path)
+    else:
+        body["bg_image"] = ""
+
+    conn = http.client.HTTPConnection(url.hostname, url.port or DEFAULT_PORT, timeout=timeout)
+    tmp_path = output_path + ".tmp"
+    try:
+        conn.request("POST", "/decks", json.dumps(body, ensure_ascii=False).encode("utf-8"),
+                     {"Content-Type": "application/json; charset=utf-8"})
+        response = conn.getresponse()
+        if response.status != 200:
+            try:
+                message = json.loads(response.read().decode("utf-8"))["error"]
+            except (ValueError, KeyError, TypeError):
+                message = response.reason
+            raise Exception(f"생성 서버 오류 ({response.status}): {message}")
+        with open(tmp_path, "wb") as f:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                if cancel_event is not None and cancel_event.is_set():
+                    from core.ppt_generator import GenerationCancelled
+                    raise GenerationCancelled("PPT 생성이 취소되었습니다.")
+                f.write(chunk)
+        os.replace(tmp_path, output_path)
+        return {"slides": int(response.getheader("X-Slides", "0")),
+                "cached": response.getheader("X-Cached") == "1",
+                "seconds": float(response.getheader("X-Seconds", "0"))}
+    finally:
+        conn.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="여러 PC에서 작업을 받아 PPT를 만드는 로컬 생성 서버")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="접속 받을 주소 (다른 PC에서 접속하려면 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="동시에 만들 작업 수 (작업마다 프로세스 하나)")
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE_SIZE, help="대기열 크기 (넘치면 503)")
+    args = parser.parse_args(argv)
+
+    async def run():
+        start = time.perf_counter()
+        server = DeckServer(args.host, args.port, args.workers, args.queue)
+        await server.start()
+        print(f"생성 서버 준비 완료 ({time.perf_counter() - start:.2f}초): http://{args.host}:{server.port} "
+              f"(작업 프로세스 {server.workers}개, 대기열 {server.queue_size}개)")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("생성 서버를 종료합니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+설정 저장소
+
+예전의 data/config.json(템플릿 이름, 최대 글자 수, 옵션)과 data/bg_images.json(템플릿별 배경 이미지)을
+버전이 있는 data/settings.json 하나로 합쳐서 관리한다.
+
+- 처음 실행할 때 settings.json이 없으면 예전 두 파일을 읽어 옮긴다 (예전 파일은 그대로 두지만 더 이상 쓰지 않음)
+- 읽을 때 값의 형식을 확인하고, 잘못된 값은 기본값으로 바꾼다
+- 저장은 모아서 한 번에: save()를 여러 번 불러도 마지막 호출 후 SAVE_DELAY초 뒤에 한 번만 쓴다
+- 임시 파일에 쓴 뒤 교체하므로 저장 중에 꺼져도 설정 파일이 깨지지 않는다
+"""
+import os
+import copy
+import json
+import atexit
+import threading
+
+from core.background import DEFAULT_BG_DPI
+from core.reference import DEFAULT_VERSION
+
+SETTINGS_PATH = os.path.join("data", "settings.json")
+LEGACY_CONFIG_PATH = os.path.join("data", "config.json")
+LEGACY_BG_IMAGES_PATH = os.path.join("data", "bg_images.json")
+
+SETTINGS_VERSION = 1
+SAVE_DELAY = 1.0  # 초
+
+TEMPLATE_NUMS = ("1", "2", "3")
+
+DEFAULT_SETTINGS = {
+    "version": SETTINGS_VERSION,
+    "template_names": {"1": "템플릿 1", "2": "템플릿 2", "3": "템플릿 3"},
+    "max_chars_per_slide": {"1": 500, "2": 400, "3": 600},
+    "bg_images": {},
+    "fit_to_box": False,
+    "pack_verses": False,
+    "incremental": False,  # 켜면 data/cache/builds/에 생성 기록을 남기고 바뀐 슬라이드만 다시 만든다
+    "build_report": False,  # 단계별 소요 시간 기록 (켜야 data/logs/build_report.log에 남김)
+    "deck_cache": True,  # 같은 PPT를 다시 만들면 캐시에서 복사
+    "bg_image_dpi": DEFAULT_BG_DPI,  # 배경 이미지를 줄일 해상도 (0이면 원본 그대로)
+    "bible_version": DEFAULT_VERSION,  # 본문 역본
+    "parallel_version": "",  # 나란히 넣을 두 번째 역본 (빈 문자열이면 사용 안 함)
+    "server_url": "",  # 생성 서버 주소 (예: http://192.168.0.10:8765, 빈 문자열이면 이 PC에서 생성)
+}
+
+_BOOL_KEYS = ("fit_to_box", "pack_verses", "incremental", "build_report", "deck_cache")
+
+
+def _migrate_v0(data):
+    """버전 0: 예전 config.json 내용 + bg_images.json 내용("bg_images")"""
+    data = dict(data)
+    data["version"] = 1
+    return data
+
+
+# 버전 n -> n+1 변환 함수
+_MIGRATIONS = {0: _migrate_v0}
+
+
+def migrate(data):
+    """이전 버전 설정을 현재 버전으로 바꾼다"""
+    version = data.get("version", 0)
+    if not isinstance(version, int) or version > SETTINGS_VERSION:
+        raise ValueError(f"지원하지 않는 설정 파일 버전입니다: {version}")
+    while version < SETTINGS_VERSION:
+        data = _MIGRATIONS[version](data)
+        version = data["version"]
+    return data
+
+
+def validate(data):
+    """
+    형식이 맞지 않는 값을 기본값으로 바꾼 설정과 문제 목록을 반환.
+    알 수 없는 키는 그대로 둔다 (새 버전에서 추가된 설정을 지우지 않도록).
+    """
+    problems = []
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    for key, value in data.items():
+        if key not in settings:
+            settings[key] = value
+
+    names = data.get("template_names", {})
+    if isinstance(names, dict):
+        for num in TEMPLATE_NUMS:
+            name = names.get(num)
+            if isinstance(name, str) and name.strip():
+                settings["template_names"][num] = name
+            elif num in names:
+                problems.append(f"template_names.{num}")
+    else:
+        problems.append("template_names")
+
+    max_chars = data.get("max_chars_per_slide", {})
+    if isinstance(max_chars, dict):
+        for num in TEMPLATE_NUMS:
+            value = max_chars.get(num)
+            if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+                settings["max_chars_per_slide"][num] = value
+            elif num in max_chars:
+                problems.append(f"max_chars_per_slide.{num}")
+    else:
+        problems.append("max_chars_per_slide")
+
+    bg_images = data.get("bg_images", {})
+    if isinstance(bg_images, dict):
+        for num, path in bg_images.items():
+            if isinstance(path, str):
+                if path:
+                    settings["bg_images"][str(num)] = path
+            else:
+                problems.append(f"bg_images.{num}")
+    else:
+        problems.append("bg_images")
+
+    dpi = data.get("bg_image_dpi", DEFAULT_BG_DPI)
+    if isinstance(dpi, int) and not isinstance(dpi, bool) and 0 <= dpi <= 1200:
+        settings["bg_image_dpi"] = dpi
+    else:
+        problems.append("bg_image_dpi")
+
+    for key in ("bible_version", "parallel_version", "server_url"):
+        if key in data:
+            if isinstance(data[key], str):
+                settings[key] = data[key]
+            else:
+                problems.append(key)
+    if not settings["bible_version"]:
+        settings["bible_version"] = DEFAULT_VERSION
+
+    for key in _BOOL_KEYS:
+        if key in data:
+            if isinstance(data[key], bool):
+                settings[key] = data[key]
+            else:
+                problems.append(key)
+    settings["version"] = SETTINGS_VERSION
+    return settings, problems
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _load_legacy(config_path, bg_images_path):
+    """예전 config.json + bg_images.json -> 버전 0 설정 (둘 다 없으면 None)"""
+    data = None
+    for path, key in ((config_path, None), (bg_images_path, "bg_images")):
+        if not os.path.exists(path):
+            continue
+        try:
+            content = _read_json(path)
+        except (OSError, ValueError) as e:
+            print(f"경고: 예전 설정 파일을 읽지 못했습니다 ({path}): {e}")
+            continue
+        data = data or {}
+        if key is None:
+            if isinstance(content, dict):
+                data.update(content)
+        else:
+            data[key] = content
+    return data
+
+
+def write_settings(settings, path=SETTINGS_PATH):
+    """임시 파일에 쓰고 디스크에 반영한 뒤 교체 (중간에 꺼져도 기존 파일은 온전함)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(settings, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_settings(path=SETTINGS_PATH, legacy_config_path=LEGACY_CONFIG_PATH,
+                  legacy_bg_images_path=LEGACY_BG_IMAGES_PATH):
+    """
+    설정 읽기. settings.json이 없으면 예전 파일에서 옮겨 저장하고,
+    깨진 파일은 settings.json.broken 으로 남긴 뒤 기본값(또는 예전 파일)으로 시작한다.
+    """
+    data = None
+    if os.path.exists(path):
+        try:
+            data = _read_json(path)
+            if not isinstance(data, dict):
+                raise ValueError("설정 파일 형식이 올바르지 않습니다.")
+            data = migrate(data)
+        except (OSError, ValueError) as e:
+            print(f"경고: 설정 파일을 읽지 못해 새로 만듭니다 ({path}): {e}")
+            try:
+                os.replace(path, path + ".broken")
+            except OSError:
+                pass
+            data = None
+    needs_write = data is None or data.get("version") != SETTINGS_VERSION
+    if data is None:
+        data = migrate(_load_legacy(legacy_config_path, legacy_bg_images_path) or {"version": SETTINGS_VERSION})
+    settings, problems = validate(data)
+    if problems:
+        print(f"경고: 잘못된 설정 값을 기본값으로 바꿨습니다: {', '.join(problems)}")
+    if needs_write or problems:
+        try:
+            write_settings(settings, path)
+        except OSError as e:
+            print(f"경고: 설정 파일을 저장하지 못했습니다 ({path}): {e}")
+    return settings
+
+
+class SettingsStore:
+    """
+    설정 dict(data)와 모아서 저장하는 기능.
+    data를 고친 뒤 save()를 부르면 delay초 동안 더 바뀌지 않을 때 한 번 저장하고,
+    프로그램이 끝날 때 남은 변경은 flush()로 바로 저장한다.
+    """
+
+    def __init__(self, path=SETTINGS_PATH, delay=SAVE_DELAY):
+        self.path = path
+        self.delay = delay
+        self.data = load_settings(path)
+        self.write_count = 0
+        self._pending = None  # 저장할 설정 스냅샷
+        self._timer = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def save(self):
+        """지금 설정을 저장 예약 (호출한 시점의 내용이 저장됨)"""
+        settings, problems = validate(self.data)
+        if problems:
+            print(f"경고: 잘못된 설정 값은 저장하지 않습니다: {', '.join(problems)}")
+        with self._lock:
+            self._pending = settings
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """예약된 저장을 바로 실행"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            settings, self._pending = self._pending, None
+            if settings is None:
+                return
+            try:
+                write_settings(settings, self.path)
+                self.write_count += 1
+            except OSError as e:
+                print(f"경고: 설정 파일을 저장하지 못했습니다 ({self.path}): {e}")
+
+
+if __name__ == "__main__":
+    print(json.dumps(load_settings(), ensure_ascii=False, indent=2))
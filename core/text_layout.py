@@ -0,0 +1,264 @@
+"""
+본문 텍스트 분할/배치
+
+- split_text: 글자 수 기준 분할 (단어 단위, 선형 시간)
+- TextBoxMetrics: 템플릿 ContentBox의 크기와 글꼴로 실제 줄바꿈을 추정해서
+  한 슬라이드에 들어가는 만큼 채우는 분할 (맞춤 모드)
+
+글꼴 폭은 이 컴퓨터에 설치된 글꼴 파일(Pillow)로 측정하고,
+글꼴을 찾지 못하면 한글/한자는 1em, 영문/숫자는 0.55em 으로 추정합니다.
+"""
+import os
+import sys
+
+from pptx.oxml.ns import qn
+
+EMU_PER_PT = 12700
+
+# bodyPr 기본 여백 (EMU)
+_DEFAULT_INSETS = {"lIns": 91440, "rIns": 91440, "tIns": 45720, "bIns": 45720}
+_LINE_SPACING = 1.2  # 글꼴 크기 대비 줄 높이
+
+# 지정된 글꼴을 찾지 못했을 때 대신 사용할 한글 글꼴 파일 이름
+_FALLBACK_FONT_FILES = ("malgun.ttf", "NanumGothic.ttf", "NotoSansKR-Regular.otf",
+                        "NotoSansCJK-Regular.ttc", "AppleSDGothicNeo.ttc")
+
+_font_file_index = None
+_measurers = {}
+
+
+def split_text(full_text, max_chars):
+    """긴 텍스트를 단어 단위로 max_chars 이하의 조각으로 분할 (단어 하나가 더 길면 그대로 한 조각)"""
+    chunks = []
+    current = []
+    current_len = 0
+    for word in full_text.split():
+        # 현재 조각에 단어를 붙였을 때 길이 (공백 1칸 포함)
+        new_len = current_len + len(word) + (1 if current else 0)
+        if current and new_len > max_chars:
+            chunks.append(" ".join(current))
+            current = [word]
+            current_len = len(word)
+        else:
+            current.append(word)
+            current_len = new_len
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _font_dirs():
+    if sys.platform.startswith("win"):
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        dirs = [os.path.join(windir, "Fonts")]
+        local = os.environ.get("LOCALAPPDATA")
+        if local:
+            dirs.append(os.path.join(local, "Microsoft", "Windows", "Fonts"))
+        return dirs
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/Library/Fonts", os.path.expanduser("~/Library/Fonts")]
+    return ["/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+            os.path.expanduser("~/.local/share/fonts")]
+
+
+def _normalize_font_name(name):
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+
+def find_font_file(typeface):
+    """글꼴 이름으로 설치된 글꼴 파일 경로를 찾는다 (못 찾으면 대체 한글 글꼴, 그것도 없으면 None)"""
+    global _font_file_index
+    if _font_file_index is None:
+        _font_file_index = {}
+        for font_dir in _font_dirs():
+            for dirpath, _, filenames in os.walk(font_dir):
+                for filename in filenames:
+                    if filename.lower().endswith((".ttf", ".otf", ".ttc")):
+                        stem = _normalize_font_name(os.path.splitext(filename)[0])
+                        _font_file_index.setdefault(stem, os.path.join(dirpath, filename))
+    if typeface and not typeface.startswith("+"):
+        wanted = _normalize_font_name(typeface)
+        if wanted in _font_file_index:
+            return _font_file_index[wanted]
+        for stem, path in _font_file_index.items():
+            if stem.startswith(wanted):
+                return path
+    for filename in _FALLBACK_FONT_FILES:
+        stem = _normalize_font_name(os.path.splitext(filename)[0])
+        if stem in _font_file_index:
+            return _font_file_index[stem]
+    return None
+
+
+class _FontMeasurer:
+    """1pt 크기 기준 텍스트 폭 측정기. 단어 폭은 캐시한다."""
+
+    _REFERENCE_SIZE = 100
+
+    def __init__(self, font_path):
+        self.font_path = font_path
+        self._font = None
+        if font_path:
+            try:
+                from PIL import ImageFont
+                self._font = ImageFont.truetype(font_path, self._REFERENCE_SIZE)
+            except Exception:
+                self._font = None
+                self.font_path = None  # 읽지 못한 글꼴은 쓰지 않고 폭을 추정한다
+        self._cache = {}
+
+    @staticmethod
+    def _estimate(text):
+        width = 0.0
+        for ch in text:
+            if ch == " ":
+                width += 0.3
+            elif ord(ch) >= 0x1100:  # 한글/한자 등 전각 문자
+                width += 1.0
+            else:
+                width += 0.55
+        return width
+
+    def width(self, text):
+        """글꼴 크기 1pt 일 때의 폭(pt)"""
+        w = self._cache.get(text)
+        if w is None:
+            if self._font is not None:
+                w = self._font.getlength(text) / self._REFERENCE_SIZE
+            else:
+                w = self._estimate(text)
+            self._cache[text] = w
+        return w
+
+
+def get_measurer(typeface):
+    measurer = _measurers.get(typeface)
+    if measurer is None:
+        measurer = _FontMeasurer(find_font_file(typeface))
+        _measurers[typeface] = measurer
+    return measurer
+
+
+_RPR_PATHS = (qn("a:r") + "/" + qn("a:rPr"), qn("a:pPr") + "/" + qn("a:defRPr"), qn("a:endParaRPr"))
+
+
+def run_properties(p):
+    """문단(a:p)의 글꼴 속성 요소들: 첫 run -> 문단 기본값 -> 문단 끝 속성 순서 (앞에 있는 것이 우선)"""
+    if p is None:
+        return []
+    return [rpr for rpr in map(p.find, _RPR_PATHS) if rpr is not None]
+
+
+class TextBoxMetrics:
+    """텍스트박스의 위치/크기/글꼴 정보와 줄바꿈 추정"""
+
+    def __init__(self, left, top, width, height, font_size_pt, typeface=None, auto_grow=False,
+                 insets=None, slide_height=None):
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.font_size_pt = font_size_pt
+        self.typeface = typeface
+        self.auto_grow = auto_grow
+        insets = insets or _DEFAULT_INSETS
+        self.insets = insets
+        self.text_width_pt = max(1.0, (width - insets["lIns"] - insets["rIns"]) / EMU_PER_PT)
+        # 도형이 글자에 맞춰 늘어나는 경우(spAutoFit)는 슬라이드 아래 끝까지 사용 가능
+        usable = height
+        if auto_grow and slide_height:
+            usable = max(height, slide_height - top)
+        self.text_height_pt = max(0.0, (usable - insets["tIns"] - insets["bIns"]) / EMU_PER_PT)
+        self.line_height_pt = font_size_pt * _LINE_SPACING
+        self.max_lines = max(1, int(self.text_height_pt // self.line_height_pt))
+        self._measurer = get_measurer(typeface)
+
+    @classmethod
+    def from_shape_element(cls, shape_el, slide_height=None):
+        """p:sp 요소(ContentBox 등)에서 위치, 크기, 글꼴 크기/이름을 읽는다"""
+        xfrm = shape_el.find(qn("p:spPr")).find(qn("a:xfrm"))
+        off, ext = xfrm.find(qn("a:off")), xfrm.find(qn("a:ext"))
+        tx_body = shape_el.find(qn("p:txBody"))
+        body_pr = tx_body.find(qn("a:bodyPr"))
+        insets = {k: int(body_pr.get(k, v)) for k, v in _DEFAULT_INSETS.items()}
+        auto_grow = body_pr.find(qn("a:spAutoFit")) is not None
+
+        size, typeface = None, None
+        for rpr in run_properties(tx_body.find(qn("a:p"))):
+            if size is None and rpr.get("sz"):
+                size = int(rpr.get("sz"))
+            for font_tag in ("a:ea", "a:latin"):
+                font_el = rpr.find(qn(font_tag))
+                if typeface is None and font_el is not None:
+                    typeface = font_el.get("typeface")
+        size = size or 1800
+        return cls(int(off.get("x")), int(off.get("y")), int(ext.get("cx")), int(ext.get("cy")),
+                   size / 100.0, typeface, auto_grow, insets, slide_height)
+
+    @property
+    def font_file(self):
+        """폭을 잰 글꼴 파일 경로 (글꼴을 못 찾아 글자 수로 추정하면 None)"""
+        return self._measurer.font_path
+
+    def _word_width(self, word):
+        return self._measurer.width(word) * self.font_size_pt
+
+    def wrap_words(self, words):
+        """단어 목록을 줄 단위로 나눈 [[단어, ...], ...] (단어 하나가 줄보다 길면 글자 단위로 자름)"""
+        return [line for line, _ in self._wrap_lines(words)]
+
+    def _wrap_lines(self, words):
+        """[(줄 단어 목록, 앞 줄의 마지막 단어가 이 줄로 이어지는지), ...]"""
+        lines = []
+        line = []
+        line_w = 0.0
+        continued = False  # 지금 줄이 앞 줄에서 잘린 단어로 시작하는지
+        space_w = self._word_width(" ")
+        max_w = self.text_width_pt
+        for word in words:
+            w = self._word_width(word)
+            if w > max_w:
+                # 긴 단어는 글자 단위로 잘라서 배치 (잘린 조각끼리는 공백 없이 이어진다)
+                if line:
+                    lines.append((line, continued))
+                    line, line_w, continued = [], 0.0, False
+                # 조각 폭은 글자 폭을 더해서 구한다 (조각마다 다시 재지 않고, 글자 폭만 캐시에 남긴다)
+                piece, w = "", 0.0
+                for ch in word:
+                    ch_w = self._word_width(ch)
+                    if piece and w + ch_w > max_w:
+                        lines.append(([piece], continued))
+                        piece, w, continued = "", 0.0, True
+                    piece += ch
+                    w += ch_w
+                word = piece
+            needed = w + (space_w if line else 0.0)
+            if line and line_w + needed > max_w:
+                lines.append((line, continued))
+                line, line_w, continued = [word], w, False
+            else:
+                line.append(word)
+                line_w += needed
+        if line:
+            lines.append((line, continued))
+        return lines
+
+    def wrap(self, text):
+        """텍스트를 줄 문자열 목록으로"""
+        return [" ".join(line) for line in self.wrap_words(text.split())]
+
+    def fits(self, text):
+        return len(self.wrap_words(text.split())) <= self.max_lines
+
+    def split(self, text):
+        """상자에 들어가는 만큼씩 나눈 텍스트 조각 목록 (조각을 이으면 원래 단어가 그대로 나온다)"""
+        lines = self._wrap_lines(text.split())
+        chunks = []
+        for i in range(0, len(lines), self.max_lines):
+            chunk = ""
+            for j, (line, continued) in enumerate(lines[i:i + self.max_lines]):
+                if j and not continued:
+                    chunk += " "
+                chunk += " ".join(line)
+            chunks.append(chunk)
+        return chunks
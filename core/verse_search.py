@@ -0,0 +1,242 @@
+"""
+본문 검색 색인
+
+개역개정 본문은 띄어쓰기가 일정하지 않으므로 단어 대신 글자 2개씩(bigram)으로 색인합니다.
+공백과 문장부호는 빼고 비교하므로 '하나님이 세상을' 과 '하나님이세상을' 은 같은 검색어입니다.
+
+색인은 성경 저장소(bible_data.bin)에서 한 번 만들어 data/cache/search_index.bin 에 저장하고,
+원본 JSON이 바뀌면 다시 만듭니다.
+
+파일 구조 (리틀엔디언)
+  헤더       : magic, 포맷버전, 원본 mtime_ns, 절 수, bigram 수, 위치 목록 길이
+  역본 이름  : str16
+  책 목록    : 책 수(u16), 이름(str16) * 책 수
+  절 목록    : 책 번호(u8) * 절 수, 장(u16) * 절 수, 절(u16) * 절 수
+  bigram     : 두 글자 코드((앞 << 32) | 뒤, u64, 정렬됨) * bigram 수, 시작 위치(u32) * (bigram 수 + 1)
+  위치 목록  : 절 번호(u32) 목록 (bigram별로 이어붙임)
+"""
+import os
+import sys
+import math
+import struct
+from array import array
+from bisect import bisect_left
+
+from core.reference import DEFAULT_VERSION
+
+SEARCH_INDEX_PATH = os.path.join("data", "cache", "search_index.bin")
+
+MAGIC = b"B2PS"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHqIII")
+_U16 = struct.Struct("<H")
+
+# 검색어 bigram 중 이 비율 이상이 들어 있는 구절은 부분 일치로 보여준다
+PARTIAL_MATCH_RATIO = 0.6
+
+
+def normalize(text):
+    """비교용 문자열: 공백/문장부호를 빼고 소문자로"""
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+def _bigram_codes(norm):
+    return {(ord(norm[i]) << 32) | ord(norm[i + 1]) for i in range(len(norm) - 1)}
+
+
+def _le_bytes(arr):
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _le_array(typecode, raw):
+    arr = array(typecode)
+    arr.frombytes(raw)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _pack_str(s):
+    encoded = s.encode("utf-8")
+    return _U16.pack(len(encoded)) + encoded
+
+
+def build_search_index(store, path=SEARCH_INDEX_PATH, version=DEFAULT_VERSION):
+    """성경 저장소의 한 역본으로 검색 색인 파일을 만든다"""
+    books = list(store.books(version))
+    ref_book, ref_chapter, ref_verse = array("B"), array("H"), array("H")
+    postings = {}  # bigram 코드 -> [절 번호, ...]
+    for book_no, book in enumerate(books):
+        for chapter in store.chapters(version, book):
+            for verse in store.verse_numbers(version, book, chapter):
+                verse_id = len(ref_verse)
+                ref_book.append(book_no)
+                ref_chapter.append(chapter)
+                ref_verse.append(verse)
+                for code in _bigram_codes(normalize(store.get_text(version, book, chapter, verse) or "")):
+                    postings.setdefault(code, []).append(verse_id)
+
+    keys = array("Q", sorted(postings))
+    starts = array("I", [0])
+    flat = array("I")
+    for code in keys:
+        flat.extend(postings[code])
+        starts.append(len(flat))
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, store.source_mtime_ns, len(ref_verse), len(keys), len(flat))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(_pack_str(version))
+        f.write(_U16.pack(len(books)))
+        for book in books:
+            f.write(_pack_str(book))
+        for arr in (ref_book, ref_chapter, ref_verse, keys, starts, flat):
+            f.write(_le_bytes(arr))
+    os.replace(tmp_path, path)
+
+
+class VerseSearchIndex:
+    """검색 색인 파일을 읽어 둔 것. search()로 구절을 찾는다."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            raw = f.read()
+        magic, fmt, self.source_mtime_ns, n_verses, n_keys, n_postings = _HEADER.unpack_from(raw, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"검색 색인 형식이 올바르지 않습니다: {path}")
+        pos = _HEADER.size
+        self.version, pos = self._read_str(raw, pos)
+        n_books = _U16.unpack_from(raw, pos)[0]
+        pos += _U16.size
+        self.books = []
+        for _ in range(n_books):
+            name, pos = self._read_str(raw, pos)
+            self.books.append(name)
+
+        def take(typecode, count):
+            nonlocal pos
+            size = array(typecode).itemsize * count
+            arr = _le_array(typecode, raw[pos:pos + size])
+            pos += size
+            return arr
+
+        self._ref_book = take("B", n_verses)
+        self._ref_chapter = take("H", n_verses)
+        self._ref_verse = take("H", n_verses)
+        self._keys = take("Q", n_keys)
+        self._starts = take("I", n_keys + 1)
+        self._postings = take("I", n_postings)
+        self.verse_count = n_verses
+
+    @staticmethod
+    def _read_str(raw, pos):
+        length = _U16.unpack_from(raw, pos)[0]
+        pos += _U16.size
+        return raw[pos:pos + length].decode("utf-8"), pos + length
+
+    def _posting(self, code):
+        i = bisect_left(self._keys, code)
+        if i == len(self._keys) or self._keys[i] != code:
+            return None
+        return self._postings[self._starts[i]:self._starts[i + 1]]
+
+    def reference(self, verse_id):
+        """절 번호 -> (책, 장, 절)"""
+        return (self.books[self._ref_book[verse_id]], self._ref_chapter[verse_id], self._ref_verse[verse_id])
+
+    def search(self, query, store, limit=50):
+        """
+        검색어가 들어 있는 구절을 순위대로 [(책, 장, 절, 본문), ...] 로 반환.
+        공백/문장부호를 무시하고 검색어가 그대로 들어 있는 구절(성경 순서)이 먼저 오고,
+        모자라면 검색어의 글자 쌍 대부분이 들어 있는 구절(부분 일치)을 드문 글자 쌍 점수 순으로 채운다.
+        """
+        norm = normalize(query)
+        if len(norm) < 2:
+            return []
+        codes = _bigram_codes(norm)
+        found = [posting for posting in map(self._posting, codes) if posting is not None]
+        found.sort(key=len)
+
+        results = []
+        seen = set()
+        if len(found) == len(codes):
+            # 모든 글자 쌍이 들어 있는 구절 중에서 실제로 이어져 있는 것만 (limit개까지만 확인)
+            candidates = set(found[0])
+            for posting in found[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    break
+            for verse_id in sorted(candidates):
+                book, chapter, verse = self.reference(verse_id)
+                text = store.get_text(self.version, book, chapter, verse) or ""
+                if norm in normalize(text):
+                    results.append((book, chapter, verse, text))
+                    seen.add(verse_id)
+                    if len(results) >= limit:
+                        return results
+
+        # 부분 일치: 글자 쌍 needed개 이상이 든 구절은 가장 드문 (len - needed + 1)개 중 하나는 반드시 포함한다
+        needed = max(2, math.ceil(len(codes) * PARTIAL_MATCH_RATIO))
+        if len(found) < needed:
+            return results
+        candidates = set()
+        for posting in found[:len(found) - needed + 1]:
+            candidates.update(posting)
+        candidates.difference_update(seen)
+        weighted = [(math.log(self.verse_count / len(posting)) + 1.0, posting) for posting in found]
+        scored = []
+        for verse_id in candidates:
+            score, count = 0.0, 0
+            for weight, posting in weighted:
+                i = bisect_left(posting, verse_id)
+                if i < len(posting) and posting[i] == verse_id:
+                    score += weight
+                    count += 1
+            if count >= needed:
+                scored.append((-score, verse_id))
+        scored.sort()
+        for _, verse_id in scored[:limit - len(results)]:
+            book, chapter, verse = self.reference(verse_id)
+            results.append((book, chapter, verse, store.get_text(self.version, book, chapter, verse) or ""))
+        return results
+
+
+def open_search_index(store, path=SEARCH_INDEX_PATH, version=DEFAULT_VERSION):
+    """색인 파일을 연다. 없거나 성경 데이터가 바뀌었으면 먼저 다시 만든다."""
+    index = None
+    if os.path.exists(path):
+        try:
+            index = VerseSearchIndex(path)
+        except (ValueError, struct.error):
+            index = None
+        if index is not None and (index.source_mtime_ns != store.source_mtime_ns or index.version != version):
+            index = None
+    if index is None:
+        build_search_index(store, path, version)
+        index = VerseSearchIndex(path)
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+    from core.bible_store import load_bible_data
+
+    parser = argparse.ArgumentParser(description="본문 검색 색인을 만들고 구절을 찾습니다.")
+    parser.add_argument("query", nargs="?", help="찾을 내용 (없으면 색인만 만듦)")
+    parser.add_argument("--rebuild", action="store_true", help="색인을 처음부터 다시 만들기")
+    args = parser.parse_args()
+    bible_store = load_bible_data()
+    if args.rebuild:
+        build_search_index(bible_store)
+    search_index = open_search_index(bible_store)
+    print(f"검색 색인: {SEARCH_INDEX_PATH} (구절 {search_index.verse_count}개)")
+    if args.query:
+        for hit_book, hit_chapter, hit_verse, hit_text in search_index.search(args.query, bible_store):
+            print(f"{hit_book} {hit_chapter}:{hit_verse}  {hit_text}")
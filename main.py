@@ -1,4 +1,12 @@
+import time
+
+# 시작 시간 측정(--startup-timing) 기준점: 무거운 모듈을 불러오기 전
+_START_TIME = time.perf_counter()
+
 from ui.gui import main
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import multiprocessing
+    # PyInstaller 실행 파일에서 내보내기 그리기 프로세스가 GUI를 다시 띄우지 않도록
+    multiprocessing.freeze_support()
+    main(start_time=_START_TIME)
\ No newline at end of file
@@ -0,0 +1,49 @@
+import os
+import threading
+
+from PIL import Image
+
+from core import background
+from core.background import optimized_background
+
+SLIDE = (12192000, 6858000)  # 16:9 슬라이드 (EMU)
+
+
+def _photo(path):
+    Image.effect_noise((800, 600), 60).convert("RGB").save(path, quality=100)
+    return str(path)
+
+
+def test_failed_save_leaves_no_temp_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(background, "BG_CACHE_DIR", str(tmp_path / "backgrounds"))
+    src = _photo(tmp_path / "photo.jpg")
+
+    def broken_save(image, path, **kwargs):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        raise OSError("디스크가 꽉 찼습니다")
+
+    monkeypatch.setattr(Image.Image, "save", broken_save)
+
+    assert optimized_background(src, *SLIDE, dpi=50) == src
+    assert os.listdir(tmp_path / "backgrounds") == []
+
+
+def test_temp_file_names_differ_between_threads(tmp_path):
+    path = str(tmp_path / "key.jpg")
+    names = []
+    thread = threading.Thread(target=lambda: names.append(background._tmp_path(path)))
+    thread.start()
+    thread.join()
+
+    assert names[0] != background._tmp_path(path)
+
+
+def test_optimized_background_is_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(background, "BG_CACHE_DIR", str(tmp_path / "backgrounds"))
+    src = _photo(tmp_path / "photo.jpg")
+
+    cached = optimized_background(src, *SLIDE, dpi=50)
+
+    assert cached != src and os.listdir(tmp_path / "backgrounds") == [os.path.basename(cached)]
+    assert optimized_background(src, *SLIDE, dpi=50) == cached
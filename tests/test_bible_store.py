@@ -0,0 +1,122 @@
+import os
+import json
+
+import pytest
+
+from core import bible_store
+from core.bible_store import BibleStore, build_bible_store, is_store_stale, open_bible_store
+from core.ppt_generator import iter_verses
+
+BIBLE = {
+    "개역개정": {
+        "창세기": {"1": {"1": "태초에 하나님이 천지를 창조하시니라", "2": "땅이 혼돈하고 공허하며", "3": "빛이 있으라"}},
+        "요한복음": {"3": {"16": "하나님이 세상을 이처럼 사랑하사", "18": "그를 믿는 자는 심판을 받지 아니하는 것이요"}},
+    },
+}
+KJV = {"KJV": {"창세기": {"1": {"1": "In the beginning God created the heaven and the earth."}}}}
+
+
+@pytest.fixture(autouse=True)
+def fresh_stores(monkeypatch):
+    monkeypatch.setattr(bible_store, "_open_stores", {})
+
+
+def _write_json(path, data, mtime_ns=None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_round_trip_lookups(tmp_path):
+    json_path, bin_path = str(tmp_path / "bible.json"), str(tmp_path / "bible.bin")
+    translations = tmp_path / "translations"
+    translations.mkdir()
+    _write_json(json_path, BIBLE)
+    _write_json(str(translations / "kjv.json"), KJV)
+
+    assert build_bible_store(bible_store.source_files(json_path, str(translations)), bin_path) == bin_path
+
+    with BibleStore(bin_path) as store:
+        assert store.versions() == ["개역개정", "KJV"]
+        assert store.books("개역개정") == ["창세기", "요한복음"]
+        assert store.chapters("개역개정", "요한복음") == [3]
+        assert store.verse_numbers("개역개정", "요한복음", 3) == [16, 18]
+        assert store.get_text("개역개정", "창세기", 1, 2) == "땅이 혼돈하고 공허하며"
+        assert store.get_text("개역개정", "요한복음", "3", "18") == "그를 믿는 자는 심판을 받지 아니하는 것이요"
+        assert store.get_text("개역개정", "요한복음", 3, 17) is None
+        assert store.get_text("없는역본", "창세기", 1, 1) is None
+        assert store.get_parallel(["개역개정", "KJV"], "창세기", 1, [1, 2]) == [
+            ("태초에 하나님이 천지를 창조하시니라", "In the beginning God created the heaven and the earth."),
+            ("땅이 혼돈하고 공허하며", None),
+        ]
+    assert not is_store_stale(json_path, bin_path, str(translations))
+    assert sorted(os.listdir(tmp_path)) == ["bible.bin", "bible.json", "translations"]
+
+
+def test_stale_rebuild_keeps_old_store_readable(tmp_path):
+    json_path, bin_path = str(tmp_path / "bible.json"), str(tmp_path / "bible.bin")
+    _write_json(json_path, BIBLE, mtime_ns=1_000_000_000)
+    old = open_bible_store(json_path, bin_path)
+    record = next(iter(iter_verses(old, "개역개정", [("창세기", 1, [1])])))
+    assert open_bible_store(json_path, bin_path) is old
+
+    changed = json.loads(json.dumps(BIBLE))
+    changed["개역개정"]["창세기"]["1"]["1"] = "태초에 (고친 본문)"
+    _write_json(json_path, changed, mtime_ns=2_000_000_000)
+    assert is_store_stale(json_path, bin_path)
+
+    new = open_bible_store(json_path, bin_path)
+
+    assert new is not old and not old.closed
+    assert new.get_text("개역개정", "창세기", 1, 1) == "태초에 (고친 본문)"
+    assert record.text == "태초에 하나님이 천지를 창조하시니라"  # 예전 저장소를 쓰던 곳은 그대로 읽힌다
+    assert not is_store_stale(json_path, bin_path)
+    assert sorted(os.listdir(tmp_path)) == ["bible.bin", "bible.json"]
+
+
+def test_rebuild_opens_side_file_when_old_file_is_locked(tmp_path, monkeypatch):
+    json_path, bin_path = str(tmp_path / "bible.json"), str(tmp_path / "bible.bin")
+    _write_json(json_path, BIBLE, mtime_ns=1_000_000_000)
+    old = open_bible_store(json_path, bin_path)
+    _write_json(json_path, KJV, mtime_ns=2_000_000_000)
+    replace = os.replace
+
+    def locked(src, dst):  # Windows: mmap으로 열린 파일은 교체할 수 없다
+        if dst == bin_path:
+            raise PermissionError(dst)
+        replace(src, dst)
+
+    monkeypatch.setattr(bible_store.os, "replace", locked)
+    new = open_bible_store(json_path, bin_path)
+
+    assert new.path != bin_path and new.versions() == ["KJV"]
+    assert open_bible_store(json_path, bin_path) is new  # 다시 만들지 않는다
+    assert old.versions() == ["개역개정"]
+
+    monkeypatch.setattr(bible_store.os, "replace", replace)
+    bible_store._open_stores.clear()
+    new.close()
+    old.close()
+    reopened = open_bible_store(json_path, bin_path)  # 다음 실행: 교체하고 남은 파일을 지운다
+    assert reopened.path == bin_path and reopened.versions() == ["KJV"]
+    assert sorted(os.listdir(tmp_path)) == ["bible.bin", "bible.json"]
+
+
+def test_build_uses_unique_temp_files(tmp_path, monkeypatch):
+    json_path, bin_path = str(tmp_path / "bible.json"), str(tmp_path / "bible.bin")
+    _write_json(json_path, BIBLE)
+    temp_paths = []
+    new_store_file = bible_store._new_store_file
+
+    def recording(path):
+        temp_paths.append(new_store_file(path))
+        return temp_paths[-1]
+
+    monkeypatch.setattr(bible_store, "_new_store_file", recording)
+    build_bible_store(json_path, bin_path)
+    build_bible_store(json_path, bin_path)
+
+    assert len(set(temp_paths)) == 2
+    assert all(os.path.dirname(path) == str(tmp_path) for path in temp_paths)
+    assert sorted(os.listdir(tmp_path)) == ["bible.bin", "bible.json"]
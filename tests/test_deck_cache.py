@@ -0,0 +1,61 @@
+import os
+import json
+
+from core import deck_cache
+from core.bible_store import BibleStore, build_bible_store
+from core.deck_cache import deck_key
+from core.ppt_generator import VerseSelection, create_ppt
+
+TEMPLATE = os.path.abspath(os.path.join("templates", "base_template1.pptx"))
+VERSES = [("시편", 23, verse, f"{verse}절 본문") for verse in range(1, 4)]
+
+
+def test_create_ppt_does_not_cache_by_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(deck_cache, "DECK_CACHE_DIR", str(tmp_path / "decks"))
+
+    result = create_ppt(VERSES, "시23.pptx", TEMPLATE, max_chars=100)
+
+    assert result == {"slides": 3, "cached": False}
+    assert sorted(os.listdir(tmp_path)) == ["시23.pptx"]
+
+
+def test_cache_dir_is_anchored_to_program_folder():
+    assert deck_cache.DECK_CACHE_DIR == os.path.join(deck_cache.APP_DIR, "data", "cache", "decks")
+    assert os.path.exists(os.path.join(deck_cache.APP_DIR, "main.py"))
+
+
+def test_deck_key_changes_with_measured_font(tmp_path):
+    font_a, font_b = tmp_path / "a.ttf", tmp_path / "b.ttf"
+    font_a.write_bytes(b"font a")
+    font_b.write_bytes(b"font b")
+    options = {"fit_mode": True}
+
+    key_a = deck_key(VERSES, TEMPLATE, None, 100, options, [str(font_a)])
+    key_b = deck_key(VERSES, TEMPLATE, None, 100, options, [str(font_b)])
+
+    assert key_a != key_b
+    assert key_a == deck_key(VERSES, TEMPLATE, None, 100, options, [str(font_a)])
+    assert key_a != deck_key(VERSES, TEMPLATE, None, 100, options, [None])
+
+
+def test_cached_build_iterates_selection_without_collecting(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(deck_cache, "DECK_CACHE_DIR", str(tmp_path / "decks"))
+    with open("bible.json", "w", encoding="utf-8") as f:
+        json.dump({"개역개정": {"시편": {"23": {str(v): f"{v}절 본문" for v in range(1, 4)}}}}, f, ensure_ascii=False)
+    counts = []
+    count = VerseSelection.__len__
+    monkeypatch.setattr(VerseSelection, "__len__", lambda self: counts.append(1) or count(self))
+
+    with BibleStore(build_bible_store("bible.json", "bible.bin")) as store:
+        verses = VerseSelection(store, "개역개정", [("시편", 23, range(1, 4))])
+        assert create_ppt(verses, "a.pptx", TEMPLATE, max_chars=100, use_cache=True)["cached"] is False
+        assert counts == []  # 진행률을 받지 않으면 세지 않는다
+
+        progress = []
+        built = create_ppt(verses, "b.pptx", TEMPLATE, max_chars=100, use_cache=True,
+                           progress_callback=lambda done, total: progress.append((done, total)))
+
+    assert built == {"slides": 3, "cached": True}
+    assert progress[-1] == (3, 3)
@@ -0,0 +1,61 @@
+import os
+import threading
+
+import pytest
+
+from core import incremental
+from core.export import export_deck, png_page_path, png_page_paths
+from core.ppt_generator import GenerationCancelled
+
+TEMPLATE = os.path.join("templates", "base_template1.pptx")
+VERSES = [("시편", 23, verse, f"{verse}절 본문") for verse in range(1, 6)]
+
+
+@pytest.fixture(autouse=True)
+def build_records(tmp_path, monkeypatch):
+    """PNG 파일 목록 기록을 저장소 밖(임시 폴더)에 쓰도록"""
+    monkeypatch.setattr(incremental, "BUILD_CACHE_DIR", str(tmp_path / "builds"))
+
+
+def _names(paths):
+    return sorted(os.path.basename(path) for path in paths)
+
+
+def test_png_export_removes_only_pages_it_wrote(tmp_path):
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    output = str(out_dir / "시23.png")
+    unrelated = ["시23_표지.png", "시23_2023.png", "시23_999.png"]
+    for name in unrelated:
+        (out_dir / name).write_bytes(b"")
+
+    first = export_deck(VERSES, output, TEMPLATE, max_chars=100, workers=1, width=320)
+    second = export_deck(VERSES[:3], output, TEMPLATE, max_chars=100, workers=1, width=320)
+
+    assert (first["slides"], second["slides"]) == (5, 3)
+    pages = [png_page_path(output, n, 3) for n in range(1, 4)]
+    assert _names(png_page_paths(output)) == _names(pages)
+    assert sorted(os.listdir(out_dir)) == sorted(unrelated + _names(pages))
+
+
+def test_png_export_streams_verse_generator(tmp_path):
+    output = str(tmp_path / "시23.png")
+    progress = []
+
+    result = export_deck(iter(VERSES), output, TEMPLATE, max_chars=100, workers=1, width=320,
+                         progress_callback=lambda done, total: progress.append((done, total)))
+
+    assert result["slides"] == 5
+    assert _names(png_page_paths(output)) == _names(png_page_path(output, n, 5) for n in range(1, 6))
+    assert progress == []  # 구절 수를 모르는 생성기는 진행률을 알리지 않는다
+
+
+def test_cancelled_png_export_leaves_no_pages(tmp_path):
+    output = str(tmp_path / "시23.png")
+    cancel = threading.Event()
+
+    with pytest.raises(GenerationCancelled):
+        export_deck(VERSES, output, TEMPLATE, max_chars=100, workers=1, width=320, cancel_event=cancel,
+                    progress_callback=lambda done, total: cancel.set())
+
+    assert os.listdir(tmp_path) == []
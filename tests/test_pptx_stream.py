@@ -0,0 +1,77 @@
+import os
+import zipfile
+
+import pytest
+
+from core import incremental, pptx_stream
+from core.instrument import collect
+from core.ppt_generator import create_ppt
+
+TEMPLATE = os.path.join("templates", "base_template1.pptx")
+
+
+def _verses(numbers):
+    return [("시편", 23, verse, f"{verse}절 본문 " + "여호와는 나의 목자시니 " * (verse % 3)) for verse in numbers]
+
+
+@pytest.fixture(autouse=True)
+def build_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(incremental, "BUILD_CACHE_DIR", str(tmp_path / "builds"))
+
+
+def _slide_parts(path):
+    """슬라이드 XML과 관계 파일 {이름: 내용}"""
+    with zipfile.ZipFile(path) as z:
+        assert z.testzip() is None
+        return {name: z.read(name) for name in z.namelist()
+                if name.startswith("ppt/slides/") or name == "ppt/presentation.xml"}
+
+
+def _build(verses, path, **options):
+    with collect() as report:
+        result = create_ppt(verses, str(path), TEMPLATE, max_chars=40, **options)
+    return result, report.info
+
+
+def test_streaming_writer_matches_full_save(tmp_path):
+    verses = _verses(range(1, 7))
+    _build(verses, tmp_path / "full.pptx")
+    _build(verses, tmp_path / "stream.pptx", streaming=True)
+
+    assert _slide_parts(tmp_path / "stream.pptx") == _slide_parts(tmp_path / "full.pptx")
+
+
+@pytest.mark.parametrize("raw_copy", [True, False])
+def test_incremental_rebuild_matches_full_build(tmp_path, monkeypatch, raw_copy):
+    raw_reads = []
+    read_raw = pptx_stream._read_raw
+    monkeypatch.setattr(pptx_stream, "_read_raw", lambda *args: raw_reads.append(read_raw(*args)) or raw_reads[-1])
+    if not raw_copy:
+        monkeypatch.setattr(pptx_stream, "_raw_copy_supported", lambda dst_zip: False)
+    output = tmp_path / "시23.pptx"
+    _build(_verses([1, 2, 3, 4, 5, 6]), output, incremental=True)
+
+    # 7절 끼워 넣기, 5절과 2절 순서 바꾸기, 4절 빼기
+    changed = _verses([1, 5, 3, 7, 2, 6])
+    result, info = _build(changed, output, incremental=True)
+    _build(changed, tmp_path / "full.pptx")
+
+    assert info["reused_slides"] > 0
+    assert info["reused_slides"] < result["slides"]
+    assert bool(raw_reads) == raw_copy and None not in raw_reads
+    assert _slide_parts(output) == _slide_parts(tmp_path / "full.pptx")
+
+
+def test_copy_zip_member_falls_back_for_unverified_zipfile(tmp_path, monkeypatch):
+    src_path, dst_path = tmp_path / "src.zip", tmp_path / "dst.zip"
+    with zipfile.ZipFile(src_path, "w", compression=zipfile.ZIP_DEFLATED) as src:
+        src.writestr("a.xml", "<a>" + "본문" * 100 + "</a>")
+    monkeypatch.setattr(pptx_stream, "_RAW_COPY_VERSIONS", ((2, 0), (2, 7)))
+
+    with zipfile.ZipFile(src_path) as src, zipfile.ZipFile(dst_path, "w") as dst:
+        pptx_stream.copy_zip_member(src, src.getinfo("a.xml"), dst, "b.xml")
+
+    with zipfile.ZipFile(dst_path) as dst:
+        assert dst.testzip() is None
+        assert dst.read("b.xml").decode("utf-8") == "<a>" + "본문" * 100 + "</a>"
+        assert dst.getinfo("b.xml").compress_type == zipfile.ZIP_DEFLATED
@@ -0,0 +1,71 @@
+import pytest
+
+from core.book_resolver import get_book_resolver
+from core.reference import SelectionError, VerseIndex, parse_references
+
+
+@pytest.fixture(scope="module")
+def index():
+    return VerseIndex({book: {1: [1, 2, 3]} for book in get_book_resolver().books})
+
+
+@pytest.mark.parametrize("name, book", [
+    ("갈라디", "갈라디아서"),
+    ("빌레", "빌레몬서"),
+    ("요한계", "요한계시록"),
+])
+def test_unique_prefix_wins_over_typo_correction(index, name, book):
+    assert parse_references(f"{name}1:1", index) == [(book, 1, range(1, 2))]
+
+
+def test_typo_is_corrected_when_no_prefix_matches(index):
+    assert parse_references("요한볶음1:1", index)[0][0] == "요한복음"
+
+
+def test_ambiguous_prefix_lists_candidates(index):
+    with pytest.raises(SelectionError, match="고린도전서, 고린도후서"):
+        parse_references("고린1:1", index)
+
+
+@pytest.fixture(scope="module")
+def bible_index():
+    return VerseIndex({
+        "창세기": {1: list(range(1, 32)), 2: list(range(1, 26))},
+        "요한복음": {3: list(range(1, 37))},
+        "시편": {23: list(range(1, 7)), 24: list(range(1, 11))},
+        "로마서": {8: [1, 2, 4, 5]},  # 빠진 절이 있는 장
+    })
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("창1:26-2:3", [("창세기", 1, range(26, 32)), ("창세기", 2, range(1, 4))]),
+    ("창1:29-", [("창세기", 1, range(29, 32))]),
+    ("요3:16,18-19", [("요한복음", 3, range(16, 17)), ("요한복음", 3, range(18, 20))]),
+    ("창1:1-3,2:1-2", [("창세기", 1, range(1, 4)), ("창세기", 2, range(1, 3))]),
+    ("창1:31-2:1,3", [("창세기", 1, range(31, 32)), ("창세기", 2, range(1, 2)), ("창세기", 2, range(3, 4))]),
+    ("시23", [("시편", 23, range(1, 7))]),
+    ("시23-", [("시편", 23, range(1, 7)), ("시편", 24, range(1, 11))]),
+    ("시23-24:2", [("시편", 23, range(1, 7)), ("시편", 24, range(1, 3))]),
+    ("창1:1; 요3:16,", [("창세기", 1, range(1, 2)), ("요한복음", 3, range(16, 17))]),
+    ("롬8:1-5", [("로마서", 8, [1, 2, 4, 5])]),
+])
+def test_parses_ranges(bible_index, text, expected):
+    assert parse_references(text, bible_index) == expected
+
+
+@pytest.mark.parametrize("text, position, message", [
+    ("창4:1", 1, "창세기에 4장이 없습니다"),
+    ("창1:32", 3, "창세기 1장에 32절이 없습니다"),
+    ("롬8:3", 3, "로마서 8장에 3절이 없습니다"),
+    ("창1:5-2:26", 7, "창세기 2장에 26절이 없습니다"),
+    ("창1:3-1", 5, "범위의 끝이 시작보다 앞에 있습니다"),
+    ("창1:", 3, "절 번호가 필요합니다"),
+    ("창1:1 요3:16", 5, "';' 또는 ','가 필요합니다"),
+    ("요3:16,18, 시23", 10, "장 또는 절 번호가 필요합니다"),
+    ("출1:1", 0, "알 수 없는 성경 이름입니다: 출"),
+])
+def test_error_reports_position(bible_index, text, position, message):
+    with pytest.raises(SelectionError, match=message) as error:
+        parse_references(text, bible_index)
+    assert error.value.position == position
+    assert error.value.selection_str == text
@@ -0,0 +1,59 @@
+import json
+import asyncio
+import http.client
+
+import pytest
+
+from core.cli import check_job
+from core.server import DeckServer
+
+
+class _NoDataServer(DeckServer):
+    """성경 데이터/템플릿 준비 없이 요청 해석만 확인하는 서버"""
+
+    def _warm_up(self):
+        pass
+
+
+def _post(port, body):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request("POST", "/decks", json.dumps(body).encode("utf-8"), {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read().decode("utf-8"))
+    finally:
+        conn.close()
+
+
+def _post_all(bodies):
+    async def run():
+        server = _NoDataServer(port=0, bible_data=object())
+        await server.start()
+        try:
+            loop = asyncio.get_running_loop()
+            return [await loop.run_in_executor(None, _post, server.port, body) for body in bodies]
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+def test_malformed_job_gets_400():
+    responses = _post_all([
+        {"selection": "시23", "max_chars": "abc"},
+        {"selection": "시23", "bg_dpi": "x"},
+        {"selection": "시23", "fit": "false"},
+        {"selection": "시23", "cache": 1},
+    ])
+    for status, body in responses:
+        assert status == 400
+        assert body["error"]
+
+
+def test_check_job_coerces_numbers_and_keeps_bools():
+    job = check_job({"selection": "시23", "output": "a.pptx", "max_chars": "120", "bg_dpi": 96, "pack": False})
+    assert job["max_chars"] == 120 and job["bg_dpi"] == 96 and job["pack"] is False
+    with pytest.raises(ValueError):
+        check_job({"selection": "시23", "output": "a.pptx", "pack": "false"})
+    with pytest.raises(ValueError):
+        check_job({"selection": "시23", "output": "a.pptx", "bg_dpi": 5000})
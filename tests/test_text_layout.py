@@ -0,0 +1,39 @@
+from core.text_layout import EMU_PER_PT, TextBoxMetrics, split_text
+
+_NO_INSETS = {"lIns": 0, "rIns": 0, "tIns": 0, "bIns": 0}
+
+
+def _box(width_pt, lines):
+    font_size = 20
+    height = int(font_size * 1.2 * lines * EMU_PER_PT) + 1
+    return TextBoxMetrics(0, 0, int(width_pt * EMU_PER_PT), height, font_size, insets=_NO_INSETS)
+
+
+def test_split_text_keeps_words():
+    assert split_text("가나 다라 마바", 5) == ["가나 다라", "마바"]
+
+
+def test_long_word_split_without_inserted_spaces():
+    word = "가" * 60
+    box = _box(100, 2)
+    chunks = box.split(word)
+    assert len(chunks) > 1
+    assert all(" " not in chunk for chunk in chunks)
+    assert "".join(chunks) == word
+
+
+def test_long_word_between_words_keeps_original_text():
+    text = "처음 " + "나" * 30 + " 끝"
+    box = _box(100, 50)
+    assert box.split(text) == [text]
+
+
+def test_long_word_split_caches_only_single_characters():
+    word = "".join(chr(0xAC00 + i) for i in range(200))
+    box = _box(100, 50)
+    before = set(box._measurer._cache)
+
+    chunks = box.split(word)
+
+    assert "".join(chunks) == word
+    assert all(len(text) == 1 for text in set(box._measurer._cache) - before - {word})
@@ -1,55 +1,314 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
+import re
+import sys
 import platform
 import subprocess
-from core.ppt_generator import load_bible_data, parse_selection, get_verses, create_ppt, BIBLE_BOOK_ABBR
-import json
+# core.ppt_generator(python-pptx, lxml)는 창을 먼저 띄우기 위해 처음 생성할 때 불러온다
+from core.bible_store import load_bible_data
+from core.book_resolver import get_book_resolver
+from core.verse_search import open_search_index
+from core.instrument import collect, write_report_log
+from core.settings import SettingsStore
+from core.background import DEFAULT_BG_DPI
+from core.export import export_format, png_page_path
+from core.reference import DEFAULT_VERSION
+import queue
 import threading
 import time
+from collections import OrderedDict
+
+PREVIEW_IMAGE_WIDTH = 400  # 미리보기 이미지 폭(px)
+PREVIEW_PREFETCH = 5  # 현재 슬라이드 뒤로 미리 그려 둘 장수
+PREVIEW_DELAY_MS = 300  # 입력이 멈추고 이만큼 지나면 미리보기 갱신
+PRESENTER_PREFETCH = 3  # 발표 화면에서 현재 슬라이드 뒤로 미리 그려 둘 장수
+PRESENTER_FRAMES = 8  # 발표 화면에 바로 띄울 수 있게 보관할 화면용 이미지(PhotoImage) 수
+PRESENTER_CACHE_BYTES = 192 * 1024 * 1024  # 발표 화면 크기로 그린 슬라이드 캐시 최대 크기
+
+# 배경 해상도 선택지 (표시 이름 -> DPI, 0은 원본 그대로)
+BG_DPI_CHOICES = {"96 (작게)": 96, "150 (보통)": 150, "220 (선명)": 220, "원본 그대로": 0}
+NO_PARALLEL = "(사용 안 함)"  # 나란히 표시 역본 선택지의 '없음'
+BOOK_SUGGEST_ROWS = 6  # 책 이름 자동 완성 목록 높이(줄)
+# 구절 범위 입력란에서 커서 바로 앞의 책 이름 (숫자/구분자/공백이 아닌 글자들)
+BOOK_WORD_RE = re.compile(r"[^\d\s:;,\-]+$")
+
+
+class StartupTimer:
+    """--startup-timing: 프로그램 시작부터 단계별 경과 시간을 출력"""
+
+    def __init__(self, start_time=None):
+        self.start_time = time.perf_counter() if start_time is None else start_time
+
+    def mark(self, label):
+        print(f"[시작 시간] {label}: {time.perf_counter() - self.start_time:.3f}초", flush=True)
+
+
+class PresenterWindow:
+    """
+    전체 화면 발표 창. PPT 파일을 만들지 않고 미리보기 렌더러로 슬라이드를 화면 크기로 그려서 보여준다.
+    현재 슬라이드 뒤 몇 장(과 바로 앞 장)은 백그라운드 스레드가 미리 그려 두고, 화면용 이미지(PhotoImage)로
+    바꾼 것도 PRESENTER_FRAMES장까지 보관하므로 넘길 때 기다리지 않는다.
+
+    →/Space/PageDown/클릭: 다음, ←/BackSpace/PageUp/오른쪽 클릭: 이전, Home/End: 처음/끝,
+    숫자(16 또는 3:16) 입력 후 Enter: 해당 절로 이동, F: 전체 화면 전환, Esc: 입력 취소 또는 닫기
+    """
+
+    def __init__(self, root, renderer, pages, index=0, on_close=None):
+        self.renderer = renderer
+        self.pages = pages
+        self.index = min(max(index, 0), len(pages) - 1)
+        self.on_close = on_close
+        self.photos = OrderedDict()  # 슬라이드 번호 -> PhotoImage
+        self.ready = queue.Queue()  # 백그라운드에서 다 그린 슬라이드 번호
+        self.wake = threading.Event()
+        self.closed = False
+        self.jump_text = ""
+
+        self.window = tk.Toplevel(root)
+        self.window.title("발표 - Bible2PPT")
+        self.window.configure(bg="black", cursor="none")
+        self.window.attributes("-fullscreen", True)
+        self.label = tk.Label(self.window, bg="black", bd=0)
+        self.label.pack(fill="both", expand=True)
+        self.jump_var = tk.StringVar()
+        self.jump_label = tk.Label(self.window, textvariable=self.jump_var, bg="black", fg="white",
+                                   font=("맑은 고딕", 16))
+
+        for sequences, command in (
+                (("<Right>", "<space>", "<Next>", "<Down>", "<Button-1>"), lambda e: self.step(1)),
+                (("<Left>", "<BackSpace>", "<Prior>", "<Up>", "<Button-3>"), lambda e: self.step(-1)),
+                (("<Home>",), lambda e: self.show(0)),
+                (("<End>",), lambda e: self.show(len(self.pages) - 1)),
+                (("<Return>", "<KP_Enter>"), self.jump),
+                (("<Escape>",), self.escape),
+                (("<f>", "<F>", "<F11>"), self.toggle_fullscreen),
+                (("<Key>",), self.type_jump)):
+            for sequence in sequences:
+                self.window.bind(sequence, command)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.window.focus_force()
+
+        threading.Thread(target=self._prefetch_loop, daemon=True).start()
+        self.show(self.index)
+        self.window.after(30, self._poll_ready)
+
+    def show(self, index):
+        """index번째 슬라이드 표시 (미리 준비된 이미지가 없으면 바로 그린다)"""
+        self.index = min(max(index, 0), len(self.pages) - 1)
+        photo = self.photos.get(self.index)
+        if photo is None:
+            photo = self._photo(self.index)
+        self.label.config(image=photo)
+        self.wake.set()  # 새 위치 기준으로 미리 그리기
+
+    def step(self, delta):
+        self.show(self.index + delta)
+
+    def _nearby(self, index):
+        """미리 그려 둘 슬라이드 번호 (뒤로 PRESENTER_PREFETCH장, 그다음 바로 앞 장)"""
+        ahead = list(range(index + 1, min(index + 1 + PRESENTER_PREFETCH, len(self.pages))))
+        return ahead + ([index - 1] if index > 0 else [])
+
+    def _photo(self, index):
+        from PIL import ImageTk
+
+        photo = ImageTk.PhotoImage(self.renderer.render(*self.pages[index]), master=self.window)
+        self.photos[index] = photo
+        # 현재 위치에서 먼 것부터 버린다 (현재 슬라이드는 거리 0이라 남는다)
+        while len(self.photos) > PRESENTER_FRAMES:
+            del self.photos[max(self.photos, key=lambda i: abs(i - self.index))]
+        return photo
+
+    def _prefetch_loop(self):
+        """위치가 바뀔 때마다 주변 슬라이드를 그려서 캐시에 넣는다 (도중에 위치가 바뀌면 새 위치부터 다시)"""
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            if self.closed:
+                return
+            target = self.index
+            for index in self._nearby(target):
+                if self.closed or self.index != target:
+                    break
+                try:
+                    self.renderer.render(*self.pages[index])
+                except Exception as e:
+                    print(f"경고: 발표 슬라이드를 미리 그리지 못했습니다: {e}")
+                    break
+                self.ready.put(index)
+
+    def _poll_ready(self):
+        """미리 그린 슬라이드를 화면용 이미지로 바꿔 둔다 (키 입력이 밀리지 않도록 한 번에 한 장)"""
+        if self.closed:
+            return
+        try:
+            while True:
+                index = self.ready.get_nowait()
+                if index not in self.photos and index in self._nearby(self.index):
+                    self._photo(index)
+                    break
+        except queue.Empty:
+            pass
+        self.window.after(30, self._poll_ready)
+
+    def type_jump(self, event):
+        if event.char and (event.char.isdigit() or event.char == ":"):
+            self.jump_text += event.char
+            self.jump_var.set(self.jump_text)
+            self.jump_label.place(relx=1.0, rely=1.0, anchor="se", x=-20, y=-20)
+
+    def _clear_jump(self):
+        text, self.jump_text = self.jump_text, ""
+        self.jump_label.place_forget()
+        return text
+
+    def jump(self, event=None):
+        """입력한 '절' 또는 '장:절'이 들어 있는 슬라이드로 이동 ('절'만 입력하면 지금 장에서 먼저 찾는다)"""
+        from core.preview import find_page
+
+        chapter_text, _, verse_text = self._clear_jump().rpartition(":")
+        try:
+            verse = int(verse_text)
+            chapter = int(chapter_text) if chapter_text else None
+        except ValueError:
+            return
+        index = None
+        if chapter is None:
+            index = find_page(self.pages, self.pages[self.index][1], verse)
+        if index is None:
+            index = find_page(self.pages, chapter, verse)
+        if index is not None:
+            self.show(index)
+
+    def escape(self, event=None):
+        if self.jump_text:
+            self._clear_jump()
+        else:
+            self.close()
+
+    def toggle_fullscreen(self, event=None):
+        """전체 화면을 풀고 창을 프로젝터 화면으로 옮긴 뒤 다시 전체 화면으로 만들 수 있다"""
+        fullscreen = not self.window.attributes("-fullscreen")
+        self.window.attributes("-fullscreen", fullscreen)
+        self.window.configure(cursor="none" if fullscreen else "")
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.wake.set()  # 미리 그리는 스레드 종료
+        self.window.destroy()
+        self.photos.clear()
+        if self.on_close is not None:
+            self.on_close()
+
 
 class Bible2PPTApp:
-    def __init__(self, root):
+    def __init__(self, root, startup_timer=None, exit_when_ready=False):
         self.root = root
+        self.startup_timer = startup_timer
+        self.exit_when_ready = exit_when_ready  # 시작 시간 측정용: 성경 데이터 준비 후 바로 종료
         self.root.title("Bible2PPT for IlKwang - 성경 PPT 생성기")
         self.bible_data_path = os.path.join("data", "cache", "bible_data.json")
         self.bible_data = None
-        self.bg_image_path_map = self.load_bg_image_paths()
-        self.config_data = self.load_config()
+        self.search_index = None
+        self.search_results = []
+        self.preview_renderer = None
+        self.preview_pages = []
+        self.preview_index = 0
+        self.preview_photo = None
+        self.preview_request = 0  # 가장 최근 미리보기 요청 번호 (늦게 도착한 이전 결과는 버린다)
+        self.preview_after_id = None
+        self.preview_polling = False
+        self.preview_queue = queue.Queue()
+        self.presenter = None
+        self.presenter_cache = None  # 발표 화면용 ImageCache (처음 발표할 때 만든다)
+        self.presenter_queue = queue.Queue()
+        self.generation_thread = None
+        self.cancel_event = threading.Event()
+        self.generation_queue = queue.Queue()
+        self.bible_load_queue = queue.Queue()
+        # 설정은 data/settings.json 하나에 모아서 저장 (변경은 잠시 모았다가 한 번에 씀)
+        self.settings = SettingsStore()
+        self.config_data = self.settings.data
+        self.bg_image_path_map = self.config_data["bg_images"]
         self.setup_main_ui()
 
-    def load_config(self):
-        config_path = os.path.join("data", "config.json")
-        if os.path.exists(config_path):
-            with open(config_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {
-            "template_names": {"1": "템플릿 1", "2": "템플릿 2", "3": "템플릿 3"},
-            "max_chars_per_slide": {"1": 500, "2": 400, "3": 600}
-        }
-
     def save_config(self):
-        config_path = os.path.join("data", "config.json")
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(self.config_data, f, ensure_ascii=False, indent=2)
+        self.settings.save()
 
     def setup_main_ui(self):
         for widget in self.root.winfo_children():
             widget.destroy()
-        self.bible_data = load_bible_data()
         self.setup_ui()
+        if self.startup_timer is not None:
+            self.root.after_idle(self.startup_timer.mark, "창 표시")
+        if self.bible_data is None:
+            self.start_bible_loading()
+        elif self.exit_when_ready:
+            self.root.after_idle(self.root.destroy)
 
-    def load_bg_image_paths(self):
-        bg_json = os.path.join("data", "bg_images.json")
-        if os.path.exists(bg_json):
-            with open(bg_json, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {"1": "", "2": "", "3": ""}
+    def start_bible_loading(self):
+        """성경 데이터는 창을 띄운 뒤 백그라운드에서 불러오고, 준비되면 PPT 생성 버튼을 켠다"""
+        self.ppt_btn.config(state="disabled", text="성경 데이터 준비 중...")
+        threading.Thread(target=self._load_bible_worker, daemon=True).start()
+        self.root.after(50, self._poll_bible_loading)
+
+    def _load_bible_worker(self):
+        try:
+            store = load_bible_data()
+        except Exception as e:
+            self.bible_load_queue.put(("error", e))
+            return
+        self.bible_load_queue.put(("ready", store))
+        if self.exit_when_ready:
+            return
+        # 첫 생성이 기다리지 않도록 남는 시간에 PPT 모듈도 미리 불러 둔다
+        try:
+            import core.ppt_generator  # noqa: F401
+        except Exception:
+            pass  # 실제 생성 때 다시 시도하면서 오류를 보여준다
+        # 본문 검색 색인 (처음 한 번은 만드는 데 몇 초 걸린다)
+        try:
+            self.bible_load_queue.put(("search_ready", open_search_index(store)))
+        except Exception as e:
+            self.bible_load_queue.put(("search_error", e))
+
+    def _poll_bible_loading(self):
+        try:
+            while True:
+                msg = self.bible_load_queue.get_nowait()
+                if msg[0] == "ready":
+                    self.bible_data = msg[1]
+                    self.ppt_btn.config(state="normal", text="PPT 생성")
+                    self.update_version_choices()
+                    self.schedule_preview()
+                    if self.startup_timer is not None:
+                        self.startup_timer.mark("성경 데이터 준비")
+                    if self.exit_when_ready:
+                        self.root.destroy()
+                        return
+                elif msg[0] == "error":
+                    self.ppt_btn.config(text="PPT 생성")
+                    self.status_var.set(f"오류: 성경 데이터를 불러오지 못했습니다. {msg[1]}")
+                    messagebox.showerror("오류", f"성경 데이터를 불러오지 못했습니다.\n{msg[1]}")
+                    if self.exit_when_ready:
+                        self.root.destroy()
+                    return
+                elif msg[0] == "search_ready":
+                    self.search_index = msg[1]
+                    self.update_verse_search()
+                    return
+                else:
+                    self.verse_search_status_var.set(f"본문 검색을 사용할 수 없습니다: {msg[1]}")
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(50, self._poll_bible_loading)
 
     def save_bg_image_paths(self):
-        bg_json = os.path.join("data", "bg_images.json")
-        with open(bg_json, "w", encoding="utf-8") as f:
-            json.dump(self.bg_image_path_map, f, ensure_ascii=False, indent=2)
+        self.settings.save()
 
     def setup_ui(self):
         for widget in self.root.winfo_children():
@@ -57,7 +316,7 @@ class Bible2PPTApp:
 
         # 전체를 감싸는 메인 프레임
         main_frame = tk.Frame(self.root)
-        main_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        main_frame.grid(row=0, column=0, columnspan=2, sticky="nsew", padx=10, pady=10)
         self.root.grid_rowconfigure(0, weight=1)
         self.root.grid_columnconfigure(0, weight=1)
         main_frame.grid_rowconfigure(0, weight=1)
@@ -80,6 +339,23 @@ class Bible2PPTApp:
 
         # ENTER 키 이벤트 바인딩
         self.selection_entry.bind('<Return>', lambda event: self.generate_ppt())
+        self.selection_entry.bind('<KeyRelease>', self.on_selection_key)
+
+        # 책 이름 자동 완성 목록: 입력란 바로 아래에 띄우고, ↓로 목록에 들어가거나 Tab으로 첫 후보 선택
+        self.book_resolver = get_book_resolver()
+        self.book_suggest_books = []
+        self.book_suggest_span = None  # 후보를 고르면 바꿀 입력란 위치 (시작, 끝), 목록이 없으면 None
+        self.book_suggest_listbox = tk.Listbox(self.root, height=BOOK_SUGGEST_ROWS, font=("맑은 고딕", 11))
+        self.selection_entry.bind('<Down>', self.focus_book_suggestions)
+        self.selection_entry.bind('<Tab>', self.accept_first_book_suggestion)
+        self.selection_entry.bind('<Escape>', lambda event: self.hide_book_suggestions())
+        self.selection_entry.bind('<FocusOut>', lambda event: self.root.after(150, self._hide_unfocused_suggestions))
+        self.book_suggest_listbox.bind('<Return>', self.accept_book_suggestion)
+        self.book_suggest_listbox.bind('<Double-Button-1>', self.accept_book_suggestion)
+        self.book_suggest_listbox.bind('<Escape>', lambda event: (self.hide_book_suggestions(),
+                                                                  self.selection_entry.focus_set()))
+        self.book_suggest_listbox.bind('<FocusOut>',
+                                       lambda event: self.root.after(150, self._hide_unfocused_suggestions))
 
         # 출력 폴더 (작고 통일)
         tk.Label(left_frame, text="출력 폴더:").grid(row=1, column=0, sticky="e", pady=(5, 5))
@@ -95,6 +371,21 @@ class Bible2PPTApp:
         self.output_entry.insert(0, "output.pptx")
         self.output_entry.grid(row=2, column=1, sticky="ew", pady=(5, 10), columnspan=2)
 
+        # 역본 / 나란히 표시할 두 번째 역본 (목록은 성경 데이터를 불러온 뒤 채움)
+        tk.Label(left_frame, text="역본:").grid(row=3, column=0, sticky="e", pady=(0, 5))
+        self.version_var = tk.StringVar(value=self.config_data.get("bible_version", DEFAULT_VERSION))
+        self.version_combo = ttk.Combobox(left_frame, textvariable=self.version_var, values=[self.version_var.get()],
+                                          state="readonly", width=15, font=("맑은 고딕", 11))
+        self.version_combo.grid(row=3, column=1, sticky="w", pady=(0, 5))
+        self.version_combo.bind("<<ComboboxSelected>>", self.save_versions)
+        tk.Label(left_frame, text="나란히 표시:").grid(row=4, column=0, sticky="e", pady=(0, 10))
+        self.parallel_version_var = tk.StringVar(value=self.config_data.get("parallel_version") or NO_PARALLEL)
+        self.parallel_version_combo = ttk.Combobox(left_frame, textvariable=self.parallel_version_var,
+                                                   values=[NO_PARALLEL], state="readonly", width=15,
+                                                   font=("맑은 고딕", 11))
+        self.parallel_version_combo.grid(row=4, column=1, sticky="w", pady=(0, 10))
+        self.parallel_version_combo.bind("<<ComboboxSelected>>", self.save_versions)
+
         # 우측 템플릿/배경 영역
         right_frame = tk.LabelFrame(main_frame, text="템플릿 및 배경", padx=10, pady=10)
         right_frame.grid(row=0, column=1, sticky="nsew")
@@ -137,31 +428,64 @@ class Bible2PPTApp:
         max_chars_entry.grid(row=3, column=1, sticky="w", pady=(5, 5), padx=(5, 0))
         max_chars_entry.bind('<KeyRelease>', self.save_max_chars)
 
+        # 생성 옵션 (상자 크기에 맞춤 / 짧은 구절 묶기 / 바뀐 슬라이드만 다시 만들기)
+        self.fit_to_box_var = tk.BooleanVar(value=self.config_data.get("fit_to_box", False))
+        self.pack_verses_var = tk.BooleanVar(value=self.config_data.get("pack_verses", False))
+        self.incremental_var = tk.BooleanVar(value=self.config_data.get("incremental", False))
+        tk.Checkbutton(right_frame, text="본문 상자 크기에 맞춰 나누기", variable=self.fit_to_box_var,
+                       command=self.save_layout_options, font=("맑은 고딕", 9)).grid(row=4, column=0, columnspan=2, sticky="w")
+        tk.Checkbutton(right_frame, text="짧은 구절 한 슬라이드에 묶기", variable=self.pack_verses_var,
+                       command=self.save_layout_options, font=("맑은 고딕", 9)).grid(row=5, column=0, columnspan=2, sticky="w")
+        tk.Checkbutton(right_frame, text="같은 파일은 바뀐 슬라이드만 다시 만들기", variable=self.incremental_var,
+                       command=self.save_layout_options, font=("맑은 고딕", 9)).grid(row=6, column=0, columnspan=2, sticky="w")
+
+        # 배경 이미지 해상도 (큰 사진은 이 해상도로 줄여서 넣음)
+        tk.Label(right_frame, text="배경 해상도:", font=("맑은 고딕", 9)).grid(row=7, column=0, sticky="w", pady=(5, 0))
+        self.bg_dpi_var = tk.StringVar()
+        bg_dpi_combo = ttk.Combobox(right_frame, textvariable=self.bg_dpi_var, values=list(BG_DPI_CHOICES),
+                                    state="readonly", width=12, font=("맑은 고딕", 9))
+        bg_dpi_combo.grid(row=7, column=1, sticky="w", pady=(5, 0), padx=(5, 0))
+        current_dpi = self.config_data.get("bg_image_dpi", DEFAULT_BG_DPI)
+        bg_dpi_combo.set(next((label for label, dpi in BG_DPI_CHOICES.items() if dpi == current_dpi),
+                              f"{current_dpi} DPI"))
+        bg_dpi_combo.bind("<<ComboboxSelected>>", self.save_bg_dpi)
+
         # 템플릿 편집 버튼
         edit_btn = tk.Button(right_frame, text="템플릿 편집", command=self.edit_template, width=18, height=2, font=("맑은 고딕", 11))
-        edit_btn.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(10, 5))
+        edit_btn.grid(row=8, column=0, columnspan=2, sticky="ew", pady=(10, 5))
 
         # 템플릿 이름 수정 버튼 (우하단에 작게)
         name_edit_btn = tk.Button(right_frame, text="템플릿 이름 수정", command=self.edit_template_names, 
                                  width=15, height=1, font=("맑은 고딕", 8))
-        name_edit_btn.grid(row=5, column=0, columnspan=2, sticky="se", pady=(5, 0))
+        name_edit_btn.grid(row=9, column=0, columnspan=2, sticky="se", pady=(5, 0))
 
         # 중앙 하단 PPT 생성 버튼 (width=20, 중앙 정렬, 양쪽 여백)
-        ppt_btn = tk.Button(main_frame, text="PPT 생성", command=self.generate_ppt, width=20, height=2, bg="#4A90E2", fg="white", font=("맑은 고딕", 12, "bold"))
-        ppt_btn.grid(row=1, column=0, columnspan=2, pady=(20, 5), sticky="")
+        self.ppt_btn = tk.Button(main_frame, text="PPT 생성", command=self.generate_ppt, width=20, height=2, bg="#4A90E2", fg="white", font=("맑은 고딕", 12, "bold"))
+        self.ppt_btn.grid(row=1, column=0, columnspan=2, pady=(20, 5), sticky="")
         main_frame.grid_rowconfigure(1, minsize=60)
         main_frame.grid_columnconfigure(0, minsize=60)
         main_frame.grid_columnconfigure(1, minsize=60)
 
+        # 진행 상황 표시줄 + 취소 버튼
+        progress_frame = tk.Frame(main_frame)
+        progress_frame.grid(row=2, column=0, columnspan=2, sticky="ew", padx=20)
+        progress_frame.grid_columnconfigure(0, weight=1)
+        self.progress_bar = ttk.Progressbar(progress_frame, orient="horizontal", mode="determinate")
+        self.progress_bar.grid(row=0, column=0, sticky="ew")
+        self.cancel_btn = tk.Button(progress_frame, text="취소", command=self.cancel_generation, width=8,
+                                    font=("맑은 고딕", 9), state="disabled")
+        self.cancel_btn.grid(row=0, column=1, padx=(5, 0))
+
         # 상태 메시지 (하단 전체)
         self.status_var = tk.StringVar()
         tk.Label(main_frame, textvariable=self.status_var, fg="blue", font=("맑은 고딕", 11)).grid(row=3, column=0, columnspan=2, pady=(5, 10), sticky="ew")
 
         # 성경 66권 fullname:약어 사전 (가장 하단)
         dict_frame = tk.LabelFrame(self.root, text="성경 66권 책이름/약어 사전", padx=5, pady=5)
-        dict_frame.grid(row=10, column=0, columnspan=2, sticky="nsew", padx=10, pady=(10, 10))
+        dict_frame.grid(row=10, column=0, sticky="nsew", padx=(10, 5), pady=(10, 10))
         self.root.grid_rowconfigure(10, weight=1)
         self.root.grid_columnconfigure(0, weight=1)
+        self.root.grid_columnconfigure(1, weight=2)
 
         tk.Label(dict_frame, text="책이름 검색:").pack(anchor="w")
         self.bible_search_var = tk.StringVar()
@@ -177,20 +501,169 @@ class Bible2PPTApp:
         scrollbar.pack(side="right", fill="y")
         self.bible_dict_listbox.config(yscrollcommand=scrollbar.set)
 
-        self.fullname_to_abbr = {v: k for k, v in BIBLE_BOOK_ABBR.items()}
-        self.bible_fullnames = [
-            "창세기", "출애굽기", "레위기", "민수기", "신명기", "여호수아", "사사기", "룻기", "사무엘상", "사무엘하", "열왕기상", "열왕기하", "역대상", "역대하", "에스라", "느헤미야", "에스더", "욥기", "시편", "잠언", "전도서", "아가", "이사야", "예레미야", "예레미야애가", "에스겔", "다니엘", "호세아", "요엘", "아모스", "오바댜", "요나", "미가", "나훔", "하박국", "스바냐", "학개", "스가랴", "말라기", "마태복음", "마가복음", "누가복음", "요한복음", "사도행전", "로마서", "고린도전서", "고린도후서", "갈라디아서", "에베소서", "빌립보서", "골로새서", "데살로니가전서", "데살로니가후서", "디모데전서", "디모데후서", "디도서", "빌레몬서", "히브리서", "야고보서", "베드로전서", "베드로후서", "요한1서", "요한2서", "요한3서", "유다서", "요한계시록"
-        ]
+        self.fullname_to_abbr = self.book_resolver.abbr_of
+        self.bible_dict_books = None  # 지금 사전 목록에 보이는 책들
         self.update_bible_dict_list()
+
+        # 본문 검색 (사전 오른쪽): 구절 내용 일부로 찾아서 구절 범위에 추가
+        search_frame = tk.LabelFrame(self.root, text="본문 검색 (구절 내용으로 찾기)", padx=5, pady=5)
+        search_frame.grid(row=10, column=1, sticky="nsew", padx=(5, 10), pady=(10, 10))
+
+        search_top = tk.Frame(search_frame)
+        search_top.pack(anchor="w", fill="x")
+        self.verse_search_var = tk.StringVar()
+        self.verse_search_var.trace_add('write', self.update_verse_search)
+        tk.Entry(search_top, textvariable=self.verse_search_var, width=30).pack(side="left", fill="x", expand=True)
+        tk.Button(search_top, text="구절 범위에 추가", command=self.add_search_hit_to_selection,
+                  font=("맑은 고딕", 9)).pack(side="right", padx=(5, 0))
+        self.verse_search_status_var = tk.StringVar(
+            value="본문 검색 준비 중..." if self.search_index is None else "")
+        tk.Label(search_frame, textvariable=self.verse_search_status_var, fg="gray",
+                 font=("맑은 고딕", 9)).pack(anchor="w")
+
+        result_frame = tk.Frame(search_frame)
+        result_frame.pack(fill="both", expand=True)
+        self.verse_search_listbox = tk.Listbox(result_frame, height=10)
+        self.verse_search_listbox.pack(side="left", fill="both", expand=True)
+        result_scrollbar = tk.Scrollbar(result_frame, orient="vertical", command=self.verse_search_listbox.yview)
+        result_scrollbar.pack(side="right", fill="y")
+        self.verse_search_listbox.config(yscrollcommand=result_scrollbar.set)
+        self.verse_search_listbox.bind('<Double-Button-1>', self.add_search_hit_to_selection)
+
+        # 슬라이드 미리보기 (오른쪽 전체): PowerPoint 없이 템플릿을 그려서 보여준다
+        preview_frame = tk.LabelFrame(self.root, text="미리보기", padx=5, pady=5)
+        preview_frame.grid(row=0, column=2, rowspan=11, sticky="nsew", padx=(0, 10), pady=10)
+        # 이미지가 없을 때도 미리보기 크기(px)를 유지하도록 빈 이미지를 넣어 둔다
+        self.preview_blank = tk.PhotoImage(width=PREVIEW_IMAGE_WIDTH, height=PREVIEW_IMAGE_WIDTH * 3 // 4)
+        self.preview_label = tk.Label(preview_frame, bg="black", image=self.preview_blank)
+        self.preview_label.pack(fill="both", expand=True)
+        self.preview_label.bind('<MouseWheel>', lambda event: self.preview_step(-1 if event.delta > 0 else 1))
+        self.preview_label.bind('<Button-4>', lambda event: self.preview_step(-1))  # 리눅스 휠
+        self.preview_label.bind('<Button-5>', lambda event: self.preview_step(1))
+
+        preview_nav = tk.Frame(preview_frame)
+        preview_nav.pack(fill="x", pady=(5, 0))
+        tk.Button(preview_nav, text="◀ 이전", command=lambda: self.preview_step(-1), width=8,
+                  font=("맑은 고딕", 9)).pack(side="left")
+        tk.Button(preview_nav, text="다음 ▶", command=lambda: self.preview_step(1), width=8,
+                  font=("맑은 고딕", 9)).pack(side="right")
+        self.preview_pos_var = tk.StringVar(value="0 / 0")
+        tk.Label(preview_nav, textvariable=self.preview_pos_var, font=("맑은 고딕", 10)).pack()
+        self.preview_status_var = tk.StringVar()
+        tk.Label(preview_frame, textvariable=self.preview_status_var, fg="gray", font=("맑은 고딕", 9),
+                 wraplength=PREVIEW_IMAGE_WIDTH, justify="left").pack(anchor="w")
+        # PPT를 만들지 않고 바로 전체 화면으로 띄우기 (지금 미리보기 중인 슬라이드부터)
+        self.present_btn = tk.Button(preview_frame, text="발표 시작 (전체 화면)", command=self.start_presentation,
+                                     font=("맑은 고딕", 10))
+        self.present_btn.pack(fill="x", pady=(5, 0))
+
         self.update_template_info()
 
     def update_bible_dict_list(self, *args):
-        search = self.bible_search_var.get().strip()
+        """책 이름 검색: 앞부분(입력 중인 글자, 약칭, 다른 이름 포함)이 맞는 책 먼저, 그다음 이름 중간에 든 책"""
+        books = self.book_resolver.search(self.bible_search_var.get())
+        if books == self.bible_dict_books:
+            return  # 결과가 같으면 목록을 다시 만들지 않는다
+        self.bible_dict_books = books
         self.bible_dict_listbox.delete(0, tk.END)
-        for fullname in self.bible_fullnames:
-            abbr = self.fullname_to_abbr.get(fullname, "-")
-            if not search or search in fullname:
-                self.bible_dict_listbox.insert(tk.END, f"{fullname} : {abbr}")
+        for fullname in books:
+            self.bible_dict_listbox.insert(tk.END, f"{fullname} : {self.fullname_to_abbr.get(fullname, '-')}")
+
+    def on_selection_key(self, event=None):
+        if event is None or event.keysym not in ("Down", "Up", "Tab", "Escape", "Return"):
+            self.update_book_suggestions()
+        self.schedule_preview(event)
+
+    def update_book_suggestions(self):
+        """커서 바로 앞의 책 이름(입력 중인 글자 포함)으로 시작하는 책들을 입력란 아래에 보여준다"""
+        cursor = self.selection_entry.index(tk.INSERT)
+        match = BOOK_WORD_RE.search(self.selection_entry.get()[:cursor])
+        books = self.book_resolver.complete(match.group()) if match else []
+        if not books or books == [self.book_resolver.resolve(match.group())]:
+            self.hide_book_suggestions()  # 후보가 없거나 이미 다 입력함
+            return
+        self.book_suggest_span = (match.start(), cursor)
+        if books != self.book_suggest_books:
+            self.book_suggest_books = books
+            self.book_suggest_listbox.delete(0, tk.END)
+            for book in books:
+                self.book_suggest_listbox.insert(tk.END, f"{book} ({self.fullname_to_abbr.get(book, book)})")
+        self.book_suggest_listbox.config(height=min(len(books), BOOK_SUGGEST_ROWS))
+        self.book_suggest_listbox.place(in_=self.selection_entry, relx=0, rely=1.0, relwidth=1.0)
+        self.book_suggest_listbox.lift()
+
+    def focus_book_suggestions(self, event=None):
+        if self.book_suggest_span is None:
+            return None
+        self.book_suggest_listbox.focus_set()
+        self.book_suggest_listbox.selection_clear(0, tk.END)
+        self.book_suggest_listbox.selection_set(0)
+        self.book_suggest_listbox.activate(0)
+        return "break"
+
+    def accept_first_book_suggestion(self, event=None):
+        if self.book_suggest_span is None:
+            return None  # 목록이 없으면 원래 Tab (다음 입력란으로)
+        return self.accept_book_suggestion(index=0)
+
+    def accept_book_suggestion(self, event=None, index=None):
+        """고른 책의 약칭으로 입력 중인 이름을 바꾼다"""
+        if self.book_suggest_span is None:
+            return None
+        if index is None:
+            selected = self.book_suggest_listbox.curselection()
+            index = selected[0] if selected else 0
+        abbr = self.fullname_to_abbr.get(self.book_suggest_books[index], self.book_suggest_books[index])
+        start, end = self.book_suggest_span
+        self.selection_entry.delete(start, end)
+        self.selection_entry.insert(start, abbr)
+        self.selection_entry.icursor(start + len(abbr))
+        self.selection_entry.focus_set()
+        self.hide_book_suggestions()
+        self.schedule_preview()
+        return "break"
+
+    def hide_book_suggestions(self):
+        self.book_suggest_span = None
+        self.book_suggest_books = []
+        self.book_suggest_listbox.place_forget()
+
+    def _hide_unfocused_suggestions(self):
+        if self.root.focus_get() not in (self.selection_entry, self.book_suggest_listbox):
+            self.hide_book_suggestions()
+
+    def update_verse_search(self, *args):
+        """입력할 때마다 본문 검색 결과 갱신"""
+        if self.search_index is None:
+            return
+        query = self.verse_search_var.get().strip()
+        self.verse_search_listbox.delete(0, tk.END)
+        if len(query.replace(" ", "")) < 2:
+            self.search_results = []
+            self.verse_search_status_var.set("찾을 내용을 두 글자 이상 입력하세요.")
+            return
+        start = time.perf_counter()
+        self.search_results = self.search_index.search(query, self.bible_data)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for book, chapter, verse, text in self.search_results:
+            ref = f"{self.fullname_to_abbr.get(book, book)}{chapter}:{verse}"
+            self.verse_search_listbox.insert(tk.END, f"{ref}  {text[:60]}")
+        self.verse_search_status_var.set(f"{len(self.search_results)}건 ({elapsed_ms:.1f}ms)"
+                                         + (" - 더블클릭하면 구절 범위에 추가됩니다." if self.search_results else ""))
+
+    def add_search_hit_to_selection(self, event=None):
+        """선택한 검색 결과를 구절 범위 입력란 끝에 ';'로 이어 붙인다"""
+        selected = self.verse_search_listbox.curselection()
+        if not selected:
+            return
+        book, chapter, verse, _ = self.search_results[selected[0]]
+        ref = f"{self.fullname_to_abbr.get(book, book)}{chapter}:{verse}"
+        current = self.selection_entry.get().strip()
+        if current:
+            current += " " if current.endswith(";") else "; "
+        self.selection_entry.delete(0, tk.END)
+        self.selection_entry.insert(0, current + ref)
+        self.schedule_preview()
 
     def browse_file(self):
         file_path = filedialog.asksaveasfilename(defaultextension=".pptx", filetypes=[("PPTX files", "*.pptx")])
@@ -231,6 +704,7 @@ class Bible2PPTApp:
             self.bg_image_path_map[template_num] = file_path
             self.save_bg_image_paths()
             self.update_bg_image_label()
+            self.schedule_preview()
 
     def delete_bg_image(self):
         """현재 템플릿의 배경 이미지 삭제"""
@@ -240,6 +714,7 @@ class Bible2PPTApp:
             del self.bg_image_path_map[template_num]
             self.save_bg_image_paths()
             self.update_bg_image_label()
+            self.schedule_preview()
             messagebox.showinfo("완료", "배경 이미지가 삭제되었습니다.")
 
     def save_max_chars(self, event=None):
@@ -251,9 +726,49 @@ class Bible2PPTApp:
             if max_chars > 0:
                 self.config_data["max_chars_per_slide"][template_num] = max_chars
                 self.save_config()
+                self.schedule_preview()
         except ValueError:
             pass  # 숫자가 아닌 경우 무시
 
+    def save_layout_options(self):
+        """본문 나누기 옵션 저장"""
+        self.config_data["fit_to_box"] = self.fit_to_box_var.get()
+        self.config_data["pack_verses"] = self.pack_verses_var.get()
+        self.config_data["incremental"] = self.incremental_var.get()
+        self.save_config()
+        self.schedule_preview()
+
+    def update_version_choices(self):
+        """성경 데이터에 있는 역본으로 역본 선택 목록을 채운다"""
+        versions = self.bible_data.versions()
+        self.version_combo.config(values=versions)
+        self.parallel_version_combo.config(values=[NO_PARALLEL] + versions)
+
+    def save_versions(self, event=None):
+        """역본 설정 저장"""
+        parallel_version = self.parallel_version_var.get()
+        if parallel_version == self.version_var.get():
+            parallel_version = NO_PARALLEL
+            self.parallel_version_var.set(NO_PARALLEL)
+        self.config_data["bible_version"] = self.version_var.get()
+        self.config_data["parallel_version"] = "" if parallel_version == NO_PARALLEL else parallel_version
+        self.save_config()
+        self.schedule_preview()
+
+    def selected_versions(self):
+        """생성할 역본: 역본 이름 하나, 나란히 표시를 고르면 [역본, 두 번째 역본]"""
+        version = self.config_data.get("bible_version") or DEFAULT_VERSION
+        parallel_version = self.config_data.get("parallel_version")
+        return [version, parallel_version] if parallel_version else version
+
+    def save_bg_dpi(self, event=None):
+        """배경 해상도 설정 저장"""
+        dpi = BG_DPI_CHOICES.get(self.bg_dpi_var.get())
+        if dpi is not None:
+            self.config_data["bg_image_dpi"] = dpi
+            self.save_config()
+            self.schedule_preview()
+
     def edit_template(self):
         # 템플릿 번호 추출
         template_num = self.get_template_number()
@@ -261,6 +776,10 @@ class Bible2PPTApp:
         if not os.path.exists(template_path):
             messagebox.showerror("오류", f"템플릿 파일이 없습니다: {template_path}")
             return
+        # 편집 후에는 새로 준비하도록 캐시를 비운다 (저장 시 수정시각으로도 감지됨)
+        generator = sys.modules.get("core.ppt_generator")
+        if generator is not None:  # 아직 생성 전이면 캐시도 없다
+            generator.clear_template_cache(template_path)
         try:
             if platform.system() == "Windows":
                 os.startfile(template_path)
@@ -315,6 +834,163 @@ class Bible2PPTApp:
         template_num = self.get_template_number()
         self.update_bg_image_label()
         self.max_chars_var.set(str(self.config_data["max_chars_per_slide"][template_num]))
+        self.schedule_preview()
+
+    def schedule_preview(self, event=None):
+        """입력이 잠시 멈추면 미리보기 갱신 (타자 칠 때마다 다시 계산하지 않도록)"""
+        if self.preview_after_id is not None:
+            self.root.after_cancel(self.preview_after_id)
+        self.preview_after_id = self.root.after(PREVIEW_DELAY_MS, self.refresh_preview)
+
+    def refresh_preview(self):
+        """구절 범위 해석, 슬라이드 나누기, 앞쪽 몇 장 그리기는 백그라운드에서 (그린 슬라이드는 캐시됨)"""
+        self.preview_after_id = None
+        if self.bible_data is None:
+            return
+        template_num = self.get_template_number()
+        self.preview_request += 1
+        threading.Thread(
+            target=self._preview_worker,
+            args=(self.preview_request, self.selection_entry.get(),
+                  os.path.abspath(os.path.join("templates", f"base_template{template_num}.pptx")),
+                  self.bg_image_path_map.get(template_num, ""),
+                  self.config_data["max_chars_per_slide"][template_num],
+                  self.config_data.get("fit_to_box", False), self.config_data.get("pack_verses", False),
+                  self.preview_index, self.config_data.get("bg_image_dpi", DEFAULT_BG_DPI),
+                  self.selected_versions()),
+            daemon=True,
+        ).start()
+        if not self.preview_polling:
+            self.preview_polling = True
+            self.root.after(50, self._poll_preview)
+
+    def _preview_worker(self, request, selection_str, template_path, bg_image_path, max_chars, fit_mode,
+                        pack_verses, index, bg_dpi=DEFAULT_BG_DPI, version=DEFAULT_VERSION):
+        try:
+            from core.ppt_generator import parse_selection, VerseSelection
+            from core.preview import get_preview_renderer
+            selections = parse_selection(selection_str, self.bible_data, version)
+            verses = VerseSelection(self.bible_data, version, selections) if selections else []
+            renderer = get_preview_renderer(template_path, bg_image_path, PREVIEW_IMAGE_WIDTH, bg_dpi,
+                                            parallel=not isinstance(version, str))
+            pages = renderer.paginate(verses, max_chars, fit_mode, pack_verses)
+            index = min(index, max(len(pages) - 1, 0))
+            for page in pages[index:index + PREVIEW_PREFETCH]:
+                renderer.render(*page)
+        except Exception as e:
+            self.preview_queue.put(("error", request, e))
+            return
+        self.preview_queue.put(("pages", request, renderer, pages))
+
+    def _poll_preview(self):
+        try:
+            while True:
+                msg = self.preview_queue.get_nowait()
+                if msg[1] != self.preview_request:
+                    continue  # 그 사이에 입력이 바뀜
+                if msg[0] == "pages":
+                    _, _, self.preview_renderer, self.preview_pages = msg
+                    self.preview_index = min(self.preview_index, max(len(self.preview_pages) - 1, 0))
+                    self.show_preview_page()
+                else:
+                    self.preview_status_var.set(f"미리보기: {msg[2]}")
+                self.preview_polling = False
+                return
+        except queue.Empty:
+            pass
+        self.root.after(50, self._poll_preview)
+
+    def preview_step(self, delta):
+        if not self.preview_pages:
+            return
+        index = min(max(self.preview_index + delta, 0), len(self.preview_pages) - 1)
+        if index != self.preview_index:
+            self.preview_index = index
+            self.show_preview_page()
+
+    def show_preview_page(self):
+        """현재 슬라이드를 표시하고, 뒤의 몇 장은 백그라운드에서 미리 그려 둔다"""
+        from PIL import ImageTk
+
+        total = len(self.preview_pages)
+        self.preview_pos_var.set(f"{self.preview_index + 1 if total else 0} / {total}")
+        if not total:
+            self.preview_photo = None
+            self.preview_label.config(image=self.preview_blank)
+            self.preview_status_var.set("표시할 슬라이드가 없습니다.")
+            return
+        renderer, pages, index = self.preview_renderer, self.preview_pages, self.preview_index
+        self.preview_photo = ImageTk.PhotoImage(renderer.render(*pages[index]))
+        self.preview_label.config(image=self.preview_photo)
+        book, chapter, verse, _ = pages[index]
+        self.preview_status_var.set(f"{book} {chapter}장 {verse}절")
+        ahead = pages[index + 1:index + 1 + PREVIEW_PREFETCH]
+        threading.Thread(target=lambda: [renderer.render(*page) for page in ahead], daemon=True).start()
+
+    def start_presentation(self):
+        """발표 창 열기. 구절 해석과 화면 크기 렌더러 준비는 백그라운드에서 한다"""
+        if self.presenter is not None:
+            self.presenter.window.lift()
+            self.presenter.window.focus_force()
+            return
+        if self.bible_data is None:
+            self.status_var.set("성경 데이터를 준비하는 중입니다. 잠시 후 다시 시도해주세요.")
+            return
+        template_num = self.get_template_number()
+        self.present_btn.config(state="disabled")
+        self.status_var.set("발표 화면 준비 중...")
+        threading.Thread(
+            target=self._presenter_worker,
+            args=(self.selection_entry.get(),
+                  os.path.abspath(os.path.join("templates", f"base_template{template_num}.pptx")),
+                  self.bg_image_path_map.get(template_num, ""),
+                  self.config_data["max_chars_per_slide"][template_num],
+                  self.config_data.get("fit_to_box", False), self.config_data.get("pack_verses", False),
+                  self.root.winfo_screenwidth(), self.root.winfo_screenheight(),
+                  self.config_data.get("bg_image_dpi", DEFAULT_BG_DPI), self.selected_versions()),
+            daemon=True,
+        ).start()
+        self.root.after(50, self._poll_presenter)
+
+    def _presenter_worker(self, selection_str, template_path, bg_image_path, max_chars, fit_mode, pack_verses,
+                          screen_width, screen_height, bg_dpi=DEFAULT_BG_DPI, version=DEFAULT_VERSION):
+        try:
+            from core.ppt_generator import parse_selection, VerseSelection
+            from core.preview import ImageCache, get_preview_renderer
+            if self.presenter_cache is None:
+                self.presenter_cache = ImageCache(PRESENTER_CACHE_BYTES)
+            selections = parse_selection(selection_str, self.bible_data, version)
+            verses = VerseSelection(self.bible_data, version, selections) if selections else []
+            renderer = get_preview_renderer(template_path, bg_image_path, screen_width, bg_dpi,
+                                            parallel=not isinstance(version, str), max_height=screen_height,
+                                            cache=self.presenter_cache)
+            pages = renderer.paginate(verses, max_chars, fit_mode, pack_verses)
+            if not pages:
+                raise ValueError("표시할 슬라이드가 없습니다.")
+            renderer.render(*pages[min(self.preview_index, len(pages) - 1)])
+        except Exception as e:
+            self.presenter_queue.put(("error", e))
+            return
+        self.presenter_queue.put(("ready", renderer, pages))
+
+    def _poll_presenter(self):
+        try:
+            msg = self.presenter_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._poll_presenter)
+            return
+        self.present_btn.config(state="normal")
+        if msg[0] == "error":
+            self.status_var.set(f"발표 화면을 열지 못했습니다: {msg[1]}")
+            return
+        _, renderer, pages = msg
+        self.presenter = PresenterWindow(self.root, renderer, pages, self.preview_index,
+                                         on_close=self._presenter_closed)
+        self.status_var.set(f"발표 중: 슬라이드 {len(pages)}장 (Esc로 닫기)")
+
+    def _presenter_closed(self):
+        self.presenter = None
+        self.status_var.set("발표를 마쳤습니다.")
 
     def update_template_combo(self):
         """템플릿 이름이 변경될 때 콤보박스 업데이트"""
@@ -348,12 +1024,17 @@ class Bible2PPTApp:
                 self.template_var.set(template_names[0])
 
     def generate_ppt(self):
-        version = "개역개정"  # 항상 개역개정만 사용
+        if self.generation_thread is not None:
+            return  # 이미 생성 중
+        if self.bible_data is None:
+            self.status_var.set("성경 데이터를 준비하는 중입니다. 잠시 후 다시 시도해주세요.")
+            return
+        version = self.selected_versions()
         selection_str = self.selection_entry.get()
         output_dir = self.output_dir_var.get()
         output_filename = self.output_entry.get()
-        # 확장자 자동 추가
-        if not output_filename.lower().endswith('.pptx'):
+        # 확장자 자동 추가 (.pdf/.png/.html이면 PPT 대신 그 형식으로 내보낸다)
+        if not output_filename.lower().endswith('.pptx') and not export_format(output_filename):
             output_filename += '.pptx'
         
         # 템플릿 번호 추출
@@ -362,6 +1043,12 @@ class Bible2PPTApp:
         template_path = os.path.abspath(os.path.join("templates", f"base_template{template_num}.pptx"))
         bg_image_path = self.bg_image_path_map.get(template_num, "")
         max_chars = self.config_data["max_chars_per_slide"][template_num]
+        fit_mode = self.config_data.get("fit_to_box", False)
+        pack_verses = self.config_data.get("pack_verses", False)
+        incremental = self.config_data.get("incremental", False)
+        build_report = self.config_data.get("build_report", False)
+        bg_dpi = self.config_data.get("bg_image_dpi", DEFAULT_BG_DPI)
+        use_cache = self.config_data["deck_cache"]
 
         if not version or not selection_str or not output_dir or not output_filename:
             messagebox.showerror("입력 오류", "모든 입력란을 채워주세요.")
@@ -369,34 +1056,166 @@ class Bible2PPTApp:
 
         output_path = os.path.join(output_dir, output_filename)
 
-        # 파일명 중복 체크 및 경고
-        if os.path.exists(output_path):
-            if not messagebox.askyesno("파일 덮어쓰기 경고", f"이미 같은 이름의 파일이 존재합니다.\n덮어쓰시겠습니까?\n\n{output_path}"):
+        # 파일명 중복 체크 및 경고 (PNG는 첫 슬라이드 파일로 확인)
+        existing_path = png_page_path(output_path, 1, 1) if export_format(output_path) == "png" else output_path
+        if os.path.exists(existing_path):
+            if not messagebox.askyesno("파일 덮어쓰기 경고", f"이미 같은 이름의 파일이 존재합니다.\n덮어쓰시겠습니까?\n\n{existing_path}"):
                 self.status_var.set("PPT 생성이 취소되었습니다.")
                 return
 
+        # 생성은 백그라운드 스레드에서 진행하고, 결과는 큐를 통해 메인 스레드에서 처리
+        self.cancel_event.clear()
+        self.progress_bar.config(value=0, maximum=1)
+        self.ppt_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
+        server_url = self.config_data.get("server_url", "")
+        if server_url and not export_format(output_path):
+            # 생성 서버에 보내고 결과 파일만 받는다 (템플릿은 서버 PC의 같은 번호 템플릿 사용, 내보내기는 이 PC에서)
+            versions = [version] if isinstance(version, str) else version
+            job = {"selection": selection_str, "template": int(template_num), "max_chars": max_chars,
+                   "fit": fit_mode, "pack": pack_verses, "bg_dpi": bg_dpi, "cache": use_cache,
+                   "version": versions[0], "parallel": versions[1] if len(versions) > 1 else ""}
+            self.status_var.set(f"생성 서버에서 PPT 생성 중... ({server_url})")
+            target, args = self._remote_generate_worker, (server_url, job, output_path, bg_image_path)
+        else:
+            self.status_var.set("PPT 생성 중...")
+            target = self._generate_worker
+            args = (selection_str, version, output_path, template_path, bg_image_path, max_chars, fit_mode,
+                    pack_verses, incremental, build_report, bg_dpi, use_cache)
+        self.generation_thread = threading.Thread(target=target, args=args, daemon=True)
+        self.generation_thread.start()
+        self.root.after(100, self._poll_generation)
+
+    def _generate_worker(self, selection_str, version, output_path, template_path, bg_image_path, max_chars,
+                         fit_mode, pack_verses, incremental=False, build_report=False, bg_dpi=DEFAULT_BG_DPI,
+                         use_cache=False):
+        """백그라운드 스레드: build_report면 단계별 소요 시간을 data/logs/build_report.log에 남긴다"""
+        if not build_report:
+            self._generate(selection_str, version, output_path, template_path, bg_image_path, max_chars,
+                           fit_mode, pack_verses, incremental, bg_dpi, use_cache)
+            return
+        with collect(os.path.basename(output_path)) as report:
+            report.note("selection", selection_str)
+            report.note("template", os.path.basename(template_path))
+            report.note("result", self._generate(selection_str, version, output_path, template_path,
+                                                 bg_image_path, max_chars, fit_mode, pack_verses, incremental,
+                                                 bg_dpi, use_cache))
+        try:
+            write_report_log(report)
+        except OSError:
+            pass  # 로그를 못 남겨도 생성 결과에는 영향 없음
+
+    def _remote_generate_worker(self, server_url, job, output_path, bg_image_path):
+        """백그라운드 스레드: 생성 서버(core.server)에 작업을 보내고 받은 PPT를 저장"""
+        try:
+            from core.server import submit_deck
+            from core.ppt_generator import GenerationCancelled
+        except ImportError as e:
+            self.generation_queue.put(("error", e))
+            return
+        try:
+            built = submit_deck(server_url, job, output_path, bg_image_path, cancel_event=self.cancel_event)
+            self.generation_queue.put(("progress", built["slides"], built["slides"]))
+            self.generation_queue.put(("done", output_path, built["cached"]))
+        except GenerationCancelled:
+            self.generation_queue.put(("cancelled",))
+        except OSError as e:
+            self.generation_queue.put(("error", Exception(f"생성 서버({server_url})에 연결하지 못했습니다: {e}")))
+        except Exception as e:
+            self.generation_queue.put(("error", e))
+
+    def _generate(self, selection_str, version, output_path, template_path, bg_image_path, max_chars,
+                  fit_mode, pack_verses, incremental=False, bg_dpi=DEFAULT_BG_DPI, use_cache=False):
+        """Tk 위젯은 건드리지 않고 큐에만 결과를 넣는다. 반환: 'done' / 'cancelled' / 'error'"""
+        def on_progress(done, total):
+            self.generation_queue.put(("progress", done, total))
+
+        try:
+            from core.ppt_generator import parse_selection, VerseSelection, create_ppt, GenerationCancelled
+            from core.export import export_deck
+        except ImportError as e:
+            self.generation_queue.put(("error", e))
+            return "error"
         try:
             selections = parse_selection(selection_str, self.bible_data, version)
             if not selections:
                 raise ValueError("구절 범위 해석 실패")
-            verses = get_verses(self.bible_data, version, selections)
+            verses = VerseSelection(self.bible_data, version, selections)  # 목록으로 모으지 않고 만들면서 훑는다
             if not verses:
                 raise ValueError("해당 구절을 찾을 수 없습니다.")
-            create_ppt(verses, output_path, template_path, bg_image_path, max_chars)
-            self.status_var.set(f"PPT 파일이 생성되었습니다: {output_path}")
-            messagebox.showinfo("완료", f"PPT 파일이 생성되었습니다:\n{output_path}")
+            if export_format(output_path):
+                built = export_deck(verses, output_path, template_path, bg_image_path, max_chars,
+                                    progress_callback=on_progress, cancel_event=self.cancel_event,
+                                    fit_mode=fit_mode, pack_verses=pack_verses, bg_dpi=bg_dpi)
+            else:
+                built = create_ppt(verses, output_path, template_path, bg_image_path, max_chars,
+                                   progress_callback=on_progress, cancel_event=self.cancel_event,
+                                   fit_mode=fit_mode, pack_verses=pack_verses, incremental=incremental,
+                                   bg_dpi=bg_dpi, use_cache=use_cache)
+            self.generation_queue.put(("done", output_path, built["cached"]))
+            return "done"
+        except GenerationCancelled:
+            self.generation_queue.put(("cancelled",))
+            return "cancelled"
         except Exception as e:
+            self.generation_queue.put(("error", e))
+            return "error"
+
+    def _poll_generation(self):
+        """작업 스레드가 보낸 진행 상황을 UI에 반영"""
+        finished = None
+        try:
+            while True:
+                msg = self.generation_queue.get_nowait()
+                if msg[0] == "progress":
+                    _, done, total = msg
+                    self.progress_bar.config(value=done, maximum=max(total, 1))
+                    self.status_var.set(f"PPT 생성 중... ({done}/{total})")
+                else:
+                    finished = msg
+        except queue.Empty:
+            pass
+
+        if finished is None:
+            self.root.after(100, self._poll_generation)
+            return
+
+        self.generation_thread = None
+        self.ppt_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+        if finished[0] == "done":
+            output_path = finished[1]
+            cached = " (전에 만든 같은 PPT를 복사함)" if finished[2] else ""
+            self.status_var.set(f"PPT 파일이 생성되었습니다: {output_path}{cached}")
+            messagebox.showinfo("완료", f"PPT 파일이 생성되었습니다:\n{output_path}")
+        elif finished[0] == "cancelled":
+            self.progress_bar.config(value=0)
+            self.status_var.set("PPT 생성이 취소되었습니다.")
+        else:
+            e = finished[1]
             self.status_var.set(f"오류: {e}")
             messagebox.showerror("오류", str(e))
 
-if __name__ == "__main__":
-    import sys, os
-    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    def cancel_generation(self):
+        """진행 중인 PPT 생성 취소 요청"""
+        if self.generation_thread is not None:
+            self.cancel_event.set()
+            self.cancel_btn.config(state="disabled")
+            self.status_var.set("취소하는 중...")
+
+def main(argv=None, start_time=None):
+    """
+    --startup-timing : 창 표시, 성경 데이터 준비까지 걸린 시간 출력
+    --exit-when-ready: 성경 데이터 준비 후 바로 종료 (시작 시간 측정용)
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    timer = StartupTimer(start_time) if "--startup-timing" in argv else None
+    if timer is not None:
+        timer.mark("모듈 로드")
     root = tk.Tk()
-    app = Bible2PPTApp(root)
+    app = Bible2PPTApp(root, startup_timer=timer, exit_when_ready="--exit-when-ready" in argv)
     root.mainloop()
+    app.settings.flush()  # 저장 대기 중인 설정 변경
 
-def main():
-    root = tk.Tk()
-    app = Bible2PPTApp(root)
-    root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    main()